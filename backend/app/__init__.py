@@ -0,0 +1,4 @@
+from dotenv import load_dotenv
+
+# Loaded once, before any module reads its settings at import time
+load_dotenv()
@@ -0,0 +1,140 @@
+from fastapi import Depends
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.database import AsyncDatabase
+from app.repositories.analytics_repository import AnalyticsRepository
+from app.repositories.search_repository import SearchRepository
+from app.repositories.session_repository import SessionRepository
+from app.repositories.summary_repository import SummaryRepository
+from app.repositories.user_repository import UserRepository
+from app.services.lease import Lease
+from app.services.registry import services
+from app.utils.logger import logger
+from app.utils.telemetry import MongoCommandListener
+from datetime import datetime, timezone
+import os
+
+MONGODB_URI = os.getenv("MONGODB_URI")
+DATABASE_NAME = os.getenv("MONGODB_DATABASE", "interview_ai")
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "50"))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "10"))
+
+
+def _create_client() -> AsyncMongoClient:
+    # No I/O here: the driver connects in the background on first operation
+    return AsyncMongoClient(
+        MONGODB_URI,
+        serverSelectionTimeoutMS=5000,
+        maxPoolSize=MONGODB_MAX_POOL_SIZE,
+        minPoolSize=MONGODB_MIN_POOL_SIZE,
+        event_listeners=[MongoCommandListener()],
+    )
+
+
+SCHEMA_LEASE_SECONDS = int(os.getenv("SCHEMA_LEASE_SECONDS", "600"))
+
+
+async def ensure_indexes(db: AsyncDatabase):
+    await UserRepository(db).ensure_indexes()
+    await SessionRepository(db).ensure_indexes()
+    await AnalyticsRepository(db).ensure_indexes()
+    await SearchRepository(db).ensure_indexes()
+    await db.jobs.create_index([("status", 1), ("available_at", 1)])
+    await db.jobs.create_index([("status", 1), ("heartbeat_at", 1)])
+    await db.jobs.create_index([("status", 1), ("updated_at", 1)])
+    await db.question_cache.create_index("expires_at", expireAfterSeconds=0)
+    await db.model_quotas.create_index("expires_at", expireAfterSeconds=0)
+
+
+async def _set_session_states(db: AsyncDatabase):
+    # Sessions stored before the upload state machine
+    await db.sessions.update_many(
+        {"state": None, "analytics": {"$ne": None}}, {"$set": {"state": "done"}}
+    )
+    await db.sessions.update_many({"state": None}, {"$set": {"state": "created"}})
+
+
+async def _set_analyzed_at(db: AsyncDatabase):
+    # Sessions analyzed before the analysis time was stored; their last update is the closest
+    await db.sessions.update_many(
+        {"analytics": {"$ne": None}, "analyzed_at": None},
+        [{"$set": {"analyzed_at": {"$ifNull": ["$updated_at", {"$toDate": "$_id"}]}}}],
+    )
+
+
+async def _build_user_summaries(db: AsyncDatabase):
+    # Summaries were only built from new events, so older sessions were missing
+    await SummaryRepository(db).rebuild(db.sessions)
+
+
+# Bump SCHEMA_VERSION when indexes change or a migration is added under the new number
+SCHEMA_VERSION = 5
+MIGRATIONS = {2: _set_session_states, 4: _build_user_summaries, 5: _set_analyzed_at}
+
+
+async def setup_schema(db: AsyncDatabase) -> bool:
+    """Create indexes and run pending migrations, once per schema version.
+
+    With several workers starting together, one takes the schema lease and
+    the others skip; returns whether this process did the work.
+    """
+    current = (await db.app_meta.find_one({"_id": "schema"}) or {}).get("version", 0)
+    if current >= SCHEMA_VERSION:
+        return False
+    lease = Lease(db.leases, "schema", SCHEMA_LEASE_SECONDS)
+    if not await lease.acquire():
+        logger.info("Schema setup is running on another worker")
+        return False
+    try:
+        await ensure_indexes(db)
+        for version in range(current + 1, SCHEMA_VERSION + 1):
+            if version in MIGRATIONS:
+                await MIGRATIONS[version](db)
+                logger.info(f"Applied migration {version}")
+        await db.app_meta.update_one(
+            {"_id": "schema"},
+            {"$set": {"version": SCHEMA_VERSION, "updated_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+        logger.info(f"Schema at version {SCHEMA_VERSION}")
+        return True
+    finally:
+        await lease.release()
+
+
+async def _check(client: AsyncMongoClient):
+    await client.admin.command("ping")
+    logger.info("Connected to MongoDB Atlas")
+
+
+# Built on the event loop: the async client binds to the loop that first uses it
+services.register("mongodb", _create_client, check=_check, blocking=False)
+
+
+async def close():
+    client = services.pop("mongodb")
+    if client is not None:
+        await client.close()
+
+
+def get_database() -> AsyncDatabase:
+    return services.get("mongodb")[DATABASE_NAME]
+
+
+async def get_db() -> AsyncDatabase:
+    return get_database()
+
+
+async def get_user_repository(db: AsyncDatabase = Depends(get_db)) -> UserRepository:
+    return UserRepository(db)
+
+
+async def get_session_repository(db: AsyncDatabase = Depends(get_db)) -> SessionRepository:
+    return SessionRepository(db)
+
+
+async def get_summary_repository(db: AsyncDatabase = Depends(get_db)) -> SummaryRepository:
+    return SummaryRepository(db)
+
+
+async def get_search_repository(db: AsyncDatabase = Depends(get_db)) -> SearchRepository:
+    return SearchRepository(db)
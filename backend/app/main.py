@@ -1,15 +1,110 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import auth, interview
-from app.utils.logger import logger
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from app import database
+from app.routes import admin, auth, interview
+from app.services import media_service
+from app.services.job_service import worker_pool
+from app.services.progress_service import progress_broker
+from app.services.rate_limiter import model_limiter
+from app.services.registry import services
+from app.utils import telemetry
+from app.utils.logger import logger, request_id_var
+import asyncio
 import os
+import signal
+import threading
+import time
+import uuid
 
-from dotenv import load_dotenv
-load_dotenv()
+SERVICE_WARMUP_TIMEOUT_SECONDS = float(os.getenv("SERVICE_WARMUP_TIMEOUT_SECONDS", "10"))
+
+
+async def _warm_up(only_unready: bool = False):
+    start = time.perf_counter()
+    await services.warm_up(SERVICE_WARMUP_TIMEOUT_SECONDS, only_unready=only_unready)
+    state = "ready" if services.ready else "degraded"
+    logger.info(f"Service warm-up finished in {time.perf_counter() - start:.2f}s ({state})")
+
+
+async def _setup_schema():
+    try:
+        await database.setup_schema(database.get_database())
+    except Exception as e:
+        # Retried on the next start; serving does not depend on it
+        logger.error(f"Schema setup failed: {str(e)}")
+
+
+def _begin_shutdown(app: FastAPI):
+    """End progress streams and start draining jobs as soon as the stop signal arrives.
+
+    The server only runs the lifespan shutdown once open connections have
+    closed, and SSE streams never close by themselves; without this the
+    drain would start after gunicorn's graceful_timeout had been spent.
+    """
+    if app.state.draining is None:
+        logger.info("Shutting down: closing progress streams and draining jobs")
+        progress_broker.close()
+        app.state.draining = asyncio.create_task(worker_pool.stop())
+
+
+def _chain_stop_signals(app: FastAPI):
+    # Signal handlers can only be set from the main thread (not under TestClient)
+    if threading.current_thread() is not threading.main_thread():
+        return
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+
+        def handler(signum, frame, previous=previous):
+            loop.call_soon_threadsafe(_begin_shutdown, app)
+            if callable(previous):
+                previous(signum, frame)
+
+        signal.signal(sig, handler)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info(f"Application startup (pid {os.getpid()})")
+    # Clients are built and checked in the background so the app starts serving
+    # (and answering liveness probes) even when a provider is slow or down
+    app.state.warmup = asyncio.create_task(_warm_up())
+    schema = asyncio.create_task(_setup_schema())
+    await worker_pool.start()
+    app.state.draining = None
+    _chain_stop_signals(app)
+    monitor = asyncio.create_task(
+        telemetry.monitor(worker_pool.queue.depth, lambda: model_limiter.waiting)
+    )
+    yield
+    logger.info("Application shutdown")
+    monitor.cancel()
+    app.state.warmup.cancel()
+    schema.cancel()
+    # Running jobs get a grace period, then are handed back to the queue
+    _begin_shutdown(app)
+    await app.state.draining
+    media_service.shutdown()
+    await database.close()
+    await logger.complete()
+
+
+telemetry.configure_tracing()
+app = FastAPI(title="AI Mock Interview Platform", version="1.0.0", lifespan=lifespan)
+telemetry.instrument(app)
+
+
+@app.middleware("http")
+async def bind_request_id(request: Request, call_next):
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    request_id_var.set(request_id)
+    response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
+    return response
 
-app = FastAPI(title="AI Mock Interview Platform", version="1.0.0")
 
 # CORS Middleware
 app.add_middleware(
@@ -20,38 +115,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# MongoDB Connection
-try:
-    client = MongoClient(
-        os.getenv("MONGODB_URI"),
-        serverSelectionTimeoutMS=5000,
-        maxPoolSize=50,
-        minPoolSize=10,
-    )
-    print(os.getenv("MONGODB_URI"))
-    client.admin.command('ping')  # Health check
-    db = client["interview_ai"]  # Automatically uses the database specified in MONGODB_URI
-    logger.info("Connected to MongoDB Atlas")
-except ConnectionFailure as e:
-    logger.error(f"Failed to connect to MongoDB Atlas: {str(e)}")
-    raise Exception("MongoDB connection failed")
-
 # Include Routes
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(interview.router, prefix="/interview", tags=["interview"])
-
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Application startup")
-    # Ensure MongoDB indexes
-    db.users.create_index("email", unique=True)
-    db.sessions.create_index("user_id")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("Application shutdown")
-    client.close()
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
 
 @app.get("/")
 async def root():
-    return {"message": "AI Mock Interview Platform"}
\ No newline at end of file
+    return {"message": "AI Mock Interview Platform"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(telemetry.metrics_payload(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/health/live", tags=["health"])
+async def liveness():
+    return {"status": "ok"}
+
+
+@app.get("/health/ready", tags=["health"])
+async def readiness():
+    warmup: asyncio.Task = app.state.warmup
+    if warmup.done() and not services.ready:
+        # Retry only the services that failed, once per probe at most
+        app.state.warmup = warmup = asyncio.create_task(_warm_up(only_unready=True))
+        await asyncio.wait({warmup}, timeout=SERVICE_WARMUP_TIMEOUT_SECONDS)
+    if not warmup.done():
+        return JSONResponse(
+            status_code=503, content={"status": "starting", "services": services.status()}
+        )
+    if not services.ready:
+        return JSONResponse(
+            status_code=503, content={"status": "unavailable", "services": services.status()}
+        )
+    return {"status": "ready", "services": services.status()}
@@ -1,11 +1,69 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
-class InterviewRequest(BaseModel):
+class RoleRequest(BaseModel):
     job_description: str
     difficulty: str = Field(..., pattern="^(easy|medium|hard)$")
+
+
+class InterviewRequest(RoleRequest):
     num_questions: int = Field(..., ge=1, le=10)
 
+
+class QuestionPoolRequest(RoleRequest):
+    pool_size: int = Field(50, ge=10, le=200, description="Questions to request from the model")
+
+
+class QuestionPoolBatch(BaseModel):
+    items: List[QuestionPoolRequest] = Field(..., min_length=1, max_length=100)
+
+# Bump when the stored analytics shape changes
+ANALYTICS_VERSION = 1
+
+
+class QuestionResult(BaseModel):
+    question: str = Field(..., description="The question text")
+    answer: str = Field("", description="Transcribed answer, empty if unanswered")
+    score: float = Field(0, ge=0, le=100)
+    body_language: str = Field("", description="Posture, gestures, eye contact")
+    communication: str = Field("", description="Tone, fluency, confidence")
+    time_consumed_seconds: Optional[float] = Field(
+        None, ge=0, description="Time taken to answer, 0 if unanswered"
+    )
+
+
+class SupportingQuote(BaseModel):
+    quote: str
+    analysis: str = ""
+    type: str = Field("", description="strength or improvement_area")
+
+
+class CommunicationAnalysis(BaseModel):
+    score: float = Field(0, ge=0, le=10)
+    overallFeedback: str = Field("", description="2-3 sentence summary")
+    supportingQuotes: List[SupportingQuote] = []
+    strengths: List[str] = []
+    improvementAreas: List[str] = []
+
+
+class VideoAnalytics(BaseModel):
+    questions: List[QuestionResult]
+    overall_score: float = Field(
+        ..., ge=0, le=100, description="Weighted by answered questions"
+    )
+    insights: List[str] = Field([], description="3 insights, 25 words or less each")
+    communication: CommunicationAnalysis = CommunicationAnalysis()
+
+
+class SessionFeedback(BaseModel):
+    insights: List[str] = Field([], description="3 insights, 25 words or less each")
+    communication: CommunicationAnalysis = CommunicationAnalysis()
+
+
+class StoredAnalytics(VideoAnalytics):
+    version: int = ANALYTICS_VERSION
+
+
 class InterviewSession(BaseModel):
     user_id: str
     job_description: str
@@ -13,4 +71,24 @@ class InterviewSession(BaseModel):
     num_questions: int
     questions: List[str]
     video_url: Optional[str] = None
-    analytics: Optional[dict] = None
\ No newline at end of file
+    analytics: Optional[StoredAnalytics] = None
+
+
+class DirectUploadRequest(BaseModel):
+    session_id: str
+    parts: int = Field(1, ge=1, le=10000)
+
+
+class UploadedPart(BaseModel):
+    part_number: int = Field(..., ge=1, le=10000)
+    etag: str
+
+
+class DirectUploadComplete(BaseModel):
+    session_id: str
+    key: str
+    size: int = Field(..., ge=1, description="Bytes uploaded, checked against the stored object")
+    upload_id: Optional[str] = None
+    parts: List[UploadedPart] = []
+    etag: Optional[str] = Field(None, description="ETag of a single-part upload, checked when given")
+    question_timestamps: Optional[List[float]] = None
@@ -6,4 +6,8 @@ class User(BaseModel):
 
 class Token(BaseModel):
     access_token: str
-    token_type: str
\ No newline at end of file
+    token_type: str
+
+class UserPrincipal(BaseModel):
+    user_id: str
+    email: EmailStr
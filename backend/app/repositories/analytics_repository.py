@@ -0,0 +1,156 @@
+from datetime import datetime
+from pymongo import ReplaceOne
+from pymongo.asynchronous.database import AsyncDatabase
+from typing import Optional
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def cohort_of(when: datetime) -> str:
+    """Cohorts are calendar months of analysis, e.g. "2025-06"."""
+    return when.strftime("%Y-%m")
+
+
+class AnalyticsRepository:
+    """Analysis results flattened for cross-session reporting.
+
+    ``session_results`` holds one document per analyzed session and
+    ``question_results`` one per question. Both are keyed by session, so
+    recording the same analysis again overwrites instead of double counting.
+    """
+
+    def __init__(self, db: AsyncDatabase):
+        self.sessions = db.session_results
+        self.questions = db.question_results
+
+    async def ensure_indexes(self):
+        for collection in (self.sessions, self.questions):
+            await collection.create_index([("role", 1), ("difficulty", 1), ("cohort", 1)])
+            await collection.create_index([("cohort", 1), ("difficulty", 1)])
+        await self.questions.create_index([("role", 1), ("question_key", 1)])
+
+    async def record(
+        self,
+        session_id: str,
+        user_id: str,
+        job_description: str,
+        difficulty: Optional[str],
+        analytics: dict,
+        analyzed_at: datetime,
+    ):
+        common = {
+            "session_id": session_id,
+            "user_id": user_id,
+            "role": normalize_text(job_description),
+            "difficulty": difficulty,
+            "cohort": cohort_of(analyzed_at),
+            "analyzed_at": analyzed_at,
+        }
+        communication = analytics.get("communication") or {}
+        questions = analytics.get("questions") or []
+        await self.sessions.replace_one(
+            {"_id": session_id},
+            {
+                **common,
+                "overall_score": analytics.get("overall_score") or 0,
+                "communication_score": communication.get("score"),
+                "improvement_areas": sorted(
+                    {normalize_text(area) for area in communication.get("improvementAreas") or []}
+                ),
+                "answered": sum(1 for q in questions if q.get("answer")),
+            },
+            upsert=True,
+        )
+        if questions:
+            await self.questions.bulk_write(
+                [
+                    ReplaceOne(
+                        {"_id": f"{session_id}:{index}"},
+                        {
+                            **common,
+                            "index": index,
+                            "question": q.get("question", ""),
+                            "question_key": normalize_text(q.get("question", "")),
+                            "score": q.get("score") or 0,
+                            "time_consumed_seconds": q.get("time_consumed_seconds"),
+                            "answered": bool(q.get("answer")),
+                        },
+                        upsert=True,
+                    )
+                    for index, q in enumerate(questions)
+                ],
+                ordered=False,
+            )
+
+    async def session_report(self, match: dict, areas_limit: int) -> dict:
+        """Totals, a 1-point overall score histogram and top improvement areas in one scan."""
+        pipeline = [
+            {"$match": match},
+            {
+                "$facet": {
+                    "totals": [
+                        {
+                            "$group": {
+                                "_id": None,
+                                "sessions": {"$sum": 1},
+                                "average_overall_score": {"$avg": "$overall_score"},
+                                "average_communication_score": {"$avg": "$communication_score"},
+                                "average_answered": {"$avg": "$answered"},
+                            }
+                        }
+                    ],
+                    "histogram": [
+                        {
+                            "$group": {
+                                "_id": {"$min": [100, {"$max": [0, {"$floor": "$overall_score"}]}]},
+                                "count": {"$sum": 1},
+                            }
+                        }
+                    ],
+                    "improvement_areas": [
+                        {"$unwind": "$improvement_areas"},
+                        {"$group": {"_id": "$improvement_areas", "count": {"$sum": 1}}},
+                        {"$sort": {"count": -1, "_id": 1}},
+                        {"$limit": areas_limit},
+                    ],
+                }
+            },
+        ]
+        cursor = await self.sessions.aggregate(pipeline)
+        return (await cursor.to_list(None))[0]
+
+    async def question_stats(self, match: dict, limit: int) -> list[dict]:
+        pipeline = [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": "$question_key",
+                    "question": {"$first": "$question"},
+                    "count": {"$sum": 1},
+                    "answered": {"$sum": {"$cond": ["$answered", 1, 0]}},
+                    "average_score": {"$avg": "$score"},
+                    "average_time_consumed_seconds": {"$avg": "$time_consumed_seconds"},
+                }
+            },
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": limit},
+        ]
+        cursor = await self.questions.aggregate(pipeline)
+        return await cursor.to_list(None)
+
+    async def roles(self, limit: int) -> list[dict]:
+        pipeline = [
+            {
+                "$group": {
+                    "_id": {"role": "$role", "difficulty": "$difficulty"},
+                    "sessions": {"$sum": 1},
+                    "last_analyzed_at": {"$max": "$analyzed_at"},
+                }
+            },
+            {"$sort": {"sessions": -1}},
+            {"$limit": limit},
+        ]
+        cursor = await self.sessions.aggregate(pipeline)
+        return await cursor.to_list(None)
@@ -0,0 +1,125 @@
+from datetime import datetime
+from pymongo import DeleteMany, ReplaceOne
+from pymongo.asynchronous.database import AsyncDatabase
+from typing import Optional
+from app.repositories.analytics_repository import normalize_text
+
+ANSWER = "answer"
+FEEDBACK = "feedback"
+
+
+def _join(*parts) -> str:
+    return " ".join(part for part in parts if part)
+
+
+class SearchRepository:
+    """Full-text search over transcribed answers and feedback.
+
+    ``search_entries`` holds one entry per answered question (the answer,
+    plus body language and communication notes as feedback) and one per
+    session for session-level feedback (insights, summary and supporting
+    quotes). The text index is prefixed by ``user_id``, so a search only
+    reads the index entries of the user it runs for, however large the
+    collection grows. Entries are keyed by session like the analytics
+    collections, so recording an analysis again overwrites them.
+    """
+
+    def __init__(self, db: AsyncDatabase):
+        self.entries = db.search_entries
+
+    async def ensure_indexes(self):
+        await self.entries.create_index(
+            [("user_id", 1), ("answer", "text"), ("question", "text"), ("feedback", "text")],
+            weights={"answer": 3, "question": 2, "feedback": 1},
+            name="user_text",
+        )
+
+    async def record(
+        self,
+        session_id: str,
+        user_id: str,
+        job_description: str,
+        difficulty: Optional[str],
+        analytics: dict,
+        analyzed_at: datetime,
+    ):
+        common = {
+            "session_id": session_id,
+            "user_id": user_id,
+            "role": normalize_text(job_description),
+            "difficulty": difficulty,
+            "analyzed_at": analyzed_at,
+        }
+        entries = {
+            f"{session_id}:{index}": {
+                **common,
+                "kind": ANSWER,
+                "index": index,
+                "question": q.get("question", ""),
+                "answer": q["answer"],
+                "feedback": _join(q.get("body_language"), q.get("communication")),
+                "score": q.get("score") or 0,
+            }
+            for index, q in enumerate(analytics.get("questions") or [])
+            if q.get("answer")
+        }
+        communication = analytics.get("communication") or {}
+        quotes = communication.get("supportingQuotes") or []
+        entries[f"{session_id}:feedback"] = {
+            **common,
+            "kind": FEEDBACK,
+            "question": "",
+            # Quotes are the candidate's own words, so they are searched as answers
+            "answer": _join(*(quote.get("quote") for quote in quotes)),
+            "feedback": _join(
+                *(analytics.get("insights") or []),
+                communication.get("overallFeedback"),
+                *(quote.get("analysis") for quote in quotes),
+                *(communication.get("strengths") or []),
+                *(communication.get("improvementAreas") or []),
+            ),
+            "score": analytics.get("overall_score") or 0,
+        }
+        # Answers a re-analysis no longer has are dropped in the same write
+        await self.entries.bulk_write(
+            [
+                *(ReplaceOne({"_id": _id}, entry, upsert=True) for _id, entry in entries.items()),
+                DeleteMany({"session_id": session_id, "_id": {"$nin": list(entries)}}),
+            ],
+            ordered=False,
+        )
+
+    async def search(
+        self,
+        user_id: str,
+        query: str,
+        role: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        kind: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> list[dict]:
+        """Entries matching ``query`` (MongoDB text search syntax), best match first."""
+        match = {"user_id": user_id, "$text": {"$search": query}}
+        if role:
+            match["role"] = normalize_text(role)
+        if difficulty:
+            match["difficulty"] = difficulty
+        if kind:
+            match["kind"] = kind
+        if min_score is not None or max_score is not None:
+            match["score"] = {}
+            if min_score is not None:
+                match["score"]["$gte"] = min_score
+            if max_score is not None:
+                match["score"]["$lte"] = max_score
+        relevance = {"$meta": "textScore"}
+        return (
+            await self.entries.find(match, {"relevance": relevance, "user_id": 0})
+            .sort([("relevance", relevance), ("_id", 1)])
+            .skip(offset)
+            .limit(limit)
+            .to_list(None)
+        )
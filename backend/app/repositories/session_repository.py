@@ -0,0 +1,195 @@
+from bson import ObjectId
+from datetime import datetime, timedelta, timezone
+from pymongo import ReturnDocument
+from pymongo.asynchronous.database import AsyncDatabase
+from app.models.interview import InterviewSession, StoredAnalytics
+from typing import Iterable, Optional
+import os
+import uuid
+
+# Session lifecycle: created -> uploading -> uploaded -> analyzing -> done | failed
+CREATED = "created"
+UPLOADING = "uploading"
+UPLOADED = "uploaded"
+ANALYZING = "analyzing"
+DONE = "done"
+FAILED = "failed"
+SESSION_STATES = (CREATED, UPLOADING, UPLOADED, ANALYZING, DONE, FAILED)
+IN_FLIGHT_STATES = (UPLOADING, UPLOADED, ANALYZING)
+
+# In-flight sessions untouched for this long (e.g. lost with a restarted worker) can be resumed
+SESSION_STALE_SECONDS = int(os.getenv("SESSION_STALE_SECONDS", "1800"))
+
+# Compact dashboard view: skip question lists and the analytics blob
+LIST_PROJECTION = {
+    "job_description": 1,
+    "difficulty": 1,
+    "num_questions": 1,
+    "video_url": 1,
+    "state": 1,
+    "analytics.overall_score": 1,
+}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def session_state(session: dict) -> str:
+    # Sessions stored before the state machine have no state field
+    if session.get("state"):
+        return session["state"]
+    return DONE if session.get("analytics") else CREATED
+
+
+def analysis_time(session: dict) -> datetime:
+    # Sessions analyzed before analyzed_at was stored fall back to their last update
+    return session.get("analyzed_at") or session.get("updated_at") or session["_id"].generation_time
+
+
+class SessionRepository:
+    def __init__(self, db: AsyncDatabase):
+        self.collection = db.sessions
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("user_id", 1), ("_id", -1)])
+        await self.collection.create_index([("user_id", 1), ("state", 1), ("_id", -1)])
+        await self.collection.create_index(
+            [("user_id", 1), ("idempotency_key", 1)],
+            unique=True,
+            partialFilterExpression={"idempotency_key": {"$type": "string"}},
+        )
+
+    async def create(self, session: InterviewSession) -> str:
+        result = await self.collection.insert_one(
+            {**session.model_dump(), "state": CREATED, "updated_at": _now()}
+        )
+        return str(result.inserted_id)
+
+    async def find_for_user(self, session_id: str, user_id: str) -> Optional[dict]:
+        return await self.collection.find_one(
+            {"_id": ObjectId(session_id), "user_id": user_id}
+        )
+
+    async def find_by_idempotency_key(self, user_id: str, key: str) -> Optional[dict]:
+        return await self.collection.find_one({"user_id": user_id, "idempotency_key": key})
+
+    async def claim_upload(
+        self, session_id: str, user_id: str, idempotency_key: Optional[str]
+    ) -> Optional[dict]:
+        """Move a created, failed or stale session to uploading.
+
+        Returns the session as it was before the claim, or None if it is not
+        claimable (already analyzed, or another request got there first).
+        Its ``upload_claim`` is the new claim's token: passed to ``set_state``,
+        it keeps a request whose stale claim was taken over from writing.
+        Raises DuplicateKeyError if the key belongs to another session.
+        """
+        stale = _now() - timedelta(seconds=SESSION_STALE_SECONDS)
+        claim = uuid.uuid4().hex
+        session = await self.collection.find_one_and_update(
+            {
+                "_id": ObjectId(session_id),
+                "user_id": user_id,
+                "analytics": None,
+                "$or": [
+                    {"state": {"$in": [CREATED, FAILED, None]}},
+                    {"state": {"$in": list(IN_FLIGHT_STATES)}, "updated_at": {"$lt": stale}},
+                ],
+            },
+            {
+                "$set": {
+                    "state": UPLOADING,
+                    "idempotency_key": idempotency_key,
+                    "upload_claim": claim,
+                    "error": None,
+                    "updated_at": _now(),
+                }
+            },
+            return_document=ReturnDocument.BEFORE,
+        )
+        if session:
+            session["upload_claim"] = claim
+        return session
+
+    async def set_state(
+        self,
+        session_id: str,
+        state: str,
+        expected: Optional[Iterable[str]] = None,
+        claim: Optional[str] = None,
+        **fields,
+    ) -> bool:
+        query = {"_id": ObjectId(session_id)}
+        if expected is not None:
+            query["state"] = {"$in": list(expected)}
+        if claim is not None:
+            query["upload_claim"] = claim
+        result = await self.collection.update_one(
+            query, {"$set": {"state": state, "updated_at": _now(), **fields}}
+        )
+        return result.modified_count == 1
+
+    async def list_page(
+        self,
+        user_id: str,
+        limit: int,
+        before: Optional[str] = None,
+        state: Optional[str] = None,
+    ) -> list[dict]:
+        query = {"user_id": user_id}
+        if state:
+            query["state"] = state
+        if before:
+            query["_id"] = {"$lt": ObjectId(before)}
+        cursor = self.collection.find(query, LIST_PROJECTION).sort("_id", -1).limit(limit)
+        return await cursor.to_list(None)
+
+    async def find_progress(self, session_id: str, user_id: str) -> Optional[dict]:
+        return await self.collection.find_one(
+            {"_id": ObjectId(session_id), "user_id": user_id},
+            {"analysis_progress": 1, "analytics": 1, "video_url": 1, "state": 1},
+        )
+
+    async def start_analysis(self, session_id: str, job_id: str):
+        # Per-question results from an earlier attempt are kept for the resumed job
+        await self.update_progress(session_id, job_id=job_id, status="queued", stage=None, error=None)
+
+    async def update_progress(self, session_id: str, **fields):
+        # Progress counts as activity, so long analyses are not treated as stale
+        await self.collection.update_one(
+            {"_id": ObjectId(session_id)},
+            {
+                "$set": {
+                    **{f"analysis_progress.{k}": v for k, v in fields.items()},
+                    "updated_at": _now(),
+                }
+            },
+        )
+
+    async def save_partial_result(self, session_id: str, index: int, result: dict):
+        await self.update_progress(session_id, **{f"questions.{index}": result})
+
+    async def set_analysis(self, session_id: str, video_url: str, analytics: dict) -> bool:
+        """Store the analysis once; returns False if the session already had one.
+
+        ``analyzed_at`` is only set here, so the session's reporting cohort is
+        fixed by the first stored analysis, not by later retries or backfills.
+        """
+        stored = StoredAnalytics.model_validate(analytics).model_dump(exclude_none=True)
+        now = _now()
+        result = await self.collection.update_one(
+            {"_id": ObjectId(session_id), "analytics": None},
+            {
+                "$set": {
+                    "video_url": video_url,
+                    "analytics": stored,
+                    "state": DONE,
+                    "analyzed_at": now,
+                    "updated_at": now,
+                    "analysis_progress.status": "completed",
+                    "analysis_progress.stage": "completed",
+                }
+            },
+        )
+        return result.modified_count == 1
@@ -0,0 +1,129 @@
+from datetime import datetime, timezone
+from pymongo import ReplaceOne
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import DuplicateKeyError
+from app.repositories.session_repository import analysis_time
+
+RECENT_SESSIONS = 20
+REBUILD_BATCH_SIZE = 500
+REBUILD_PROJECTION = {
+    "user_id": 1,
+    "analyzed_at": 1,
+    "updated_at": 1,
+    "analytics.overall_score": 1,
+    "analytics.communication.score": 1,
+}
+
+
+def _recent_entry(session_id: str, analytics: dict, analyzed_at: datetime) -> dict:
+    return {
+        "session_id": session_id,
+        "overall_score": analytics.get("overall_score") or 0,
+        "communication_score": (analytics.get("communication") or {}).get("score"),
+        "analyzed_at": analyzed_at,
+    }
+
+
+class SummaryRepository:
+    """Per-user dashboard header stats, maintained incrementally.
+
+    ``analyzed_sessions`` lists the sessions already counted, so recording
+    the same analysis again (e.g. from a retried job) is a no-op.
+    """
+
+    def __init__(self, db: AsyncDatabase):
+        self.collection = db.user_summaries
+
+    async def record_session(self, user_id: str):
+        await self.collection.update_one(
+            {"_id": user_id},
+            {"$inc": {"session_count": 1}, "$set": {"updated_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+
+    async def record_analysis(
+        self, user_id: str, session_id: str, analytics: dict, analyzed_at: datetime
+    ) -> bool:
+        """Count an analysis once; returns False if the session was already counted."""
+        entry = _recent_entry(session_id, analytics, analyzed_at)
+        try:
+            await self.collection.update_one(
+                {"_id": user_id, "analyzed_sessions": {"$ne": session_id}},
+                {
+                    "$inc": {"analyzed_count": 1, "score_total": entry["overall_score"]},
+                    "$push": {"recent": {"$each": [entry], "$slice": -RECENT_SESSIONS}},
+                    "$addToSet": {"analyzed_sessions": session_id},
+                    "$set": {"updated_at": datetime.now(timezone.utc)},
+                },
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            # Already counted: the filter missed and the upsert hit the existing _id
+            return False
+
+    async def rebuild(self, sessions: AsyncCollection):
+        """Recompute every user's summary from their stored sessions.
+
+        Summaries are otherwise only built from new events, so this fills
+        them in for sessions created before they existed. Reads one user's
+        sessions at a time, newest first, as the (user_id, _id) index serves.
+        """
+        cursor = sessions.find({}, REBUILD_PROJECTION).sort([("user_id", 1), ("_id", -1)])
+        now = datetime.now(timezone.utc)
+        writes = []
+        summary = None
+        async for session in cursor:
+            if summary is None or summary["_id"] != session["user_id"]:
+                if summary is not None:
+                    writes.append(ReplaceOne({"_id": summary["_id"]}, summary, upsert=True))
+                summary = {
+                    "_id": session["user_id"],
+                    "session_count": 0,
+                    "analyzed_count": 0,
+                    "score_total": 0,
+                    "recent": [],
+                    "analyzed_sessions": [],
+                    "updated_at": now,
+                }
+            summary["session_count"] += 1
+            if session.get("analytics"):
+                entry = _recent_entry(str(session["_id"]), session["analytics"], analysis_time(session))
+                summary["analyzed_count"] += 1
+                summary["score_total"] += entry["overall_score"]
+                summary["analyzed_sessions"].append(entry["session_id"])
+                if len(summary["recent"]) < RECENT_SESSIONS:
+                    summary["recent"].insert(0, entry)
+            if len(writes) >= REBUILD_BATCH_SIZE:
+                await self.collection.bulk_write(writes, ordered=False)
+                writes = []
+        if summary is not None:
+            writes.append(ReplaceOne({"_id": summary["_id"]}, summary, upsert=True))
+        if writes:
+            await self.collection.bulk_write(writes, ordered=False)
+
+    async def get(self, user_id: str) -> dict:
+        doc = await self.collection.find_one({"_id": user_id}, {"analyzed_sessions": 0}) or {}
+        analyzed_count = doc.get("analyzed_count", 0)
+        recent = doc.get("recent", [])
+        return {
+            "session_count": doc.get("session_count", 0),
+            "analyzed_count": analyzed_count,
+            "average_overall_score": (
+                round(doc.get("score_total", 0) / analyzed_count, 2) if analyzed_count else None
+            ),
+            "rolling_average_overall_score": (
+                round(sum(r["overall_score"] for r in recent) / len(recent), 2)
+                if recent
+                else None
+            ),
+            "communication_trend": [
+                {
+                    "session_id": r["session_id"],
+                    "score": r.get("communication_score"),
+                    "analyzed_at": r["analyzed_at"].isoformat(),
+                }
+                for r in recent
+            ],
+        }
@@ -0,0 +1,24 @@
+from pymongo.asynchronous.database import AsyncDatabase
+from typing import Optional
+
+
+class UserRepository:
+    def __init__(self, db: AsyncDatabase):
+        self.collection = db.users
+
+    async def ensure_indexes(self):
+        await self.collection.create_index("email", unique=True)
+
+    async def find_by_email(self, email: str) -> Optional[dict]:
+        return await self.collection.find_one({"email": email})
+
+    async def create(self, email: str, password_hash: str) -> str:
+        result = await self.collection.insert_one(
+            {"email": email, "password": password_hash}
+        )
+        return str(result.inserted_id)
+
+    async def update_password(self, email: str, password_hash: str):
+        await self.collection.update_one(
+            {"email": email}, {"$set": {"password": password_hash}}
+        )
@@ -0,0 +1,105 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.models.interview import QuestionPoolBatch
+from app.services.analytics_service import AnalyticsReports
+from app.services.gemini_service import generate_questions
+from app.services.job_service import worker_pool
+from app.services.question_cache import question_cache
+from app.services.question_pool import question_pools
+from app.services.rate_limiter import BATCH, model_caller, model_limiter
+from app.utils.auth import get_current_admin
+from app.utils.logger import logger
+from app.utils.model_usage import usage_report
+from typing import Optional
+import asyncio
+import os
+
+router = APIRouter()
+
+QUESTION_POOL_JOB = "question_pool"
+QUESTION_POOL_CONCURRENCY = int(os.getenv("QUESTION_POOL_CONCURRENCY", "4"))
+
+analytics_reports = AnalyticsReports()
+
+
+async def build_question_pools(job: dict, progress) -> dict:
+    items = job["payload"]["items"]
+    # Pools finished by an earlier attempt are not regenerated on retry
+    done = job.get("result", {}).get("pools", {})
+    limit = asyncio.Semaphore(QUESTION_POOL_CONCURRENCY)
+
+    async def run(index: int, item: dict):
+        if str(index) in done:
+            return
+        async with limit:
+            result = await question_pools.build(
+                item["job_description"], item["difficulty"], item["pool_size"], generate_questions
+            )
+        await progress("generating", {f"pools.{index}": {**item, **result}})
+
+    with model_caller(job["user_id"], BATCH):
+        await asyncio.gather(*(run(i, item) for i, item in enumerate(items)))
+    logger.info(f"Question pools built for {len(items)} roles")
+
+
+worker_pool.register(QUESTION_POOL_JOB, build_question_pools)
+
+
+@router.post("/question-pools", status_code=202)
+async def create_question_pools(
+    batch: QuestionPoolBatch, current_admin: str = Depends(get_current_admin)
+):
+    try:
+        job_id = await worker_pool.submit(
+            QUESTION_POOL_JOB,
+            current_admin,
+            {"items": [item.model_dump() for item in batch.items]},
+        )
+        return {"job_id": job_id, "status": "queued", "roles": len(batch.items)}
+    except Exception as e:
+        logger.error(f"Question pool batch error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to queue question pool generation")
+
+
+@router.get("/question-pools")
+async def list_question_pools(current_admin: str = Depends(get_current_admin)):
+    try:
+        return {"pools": await question_pools.list()}
+    except Exception as e:
+        logger.error(f"Question pool list error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to list question pools")
+
+
+@router.get("/model-usage")
+async def get_model_usage(current_admin: str = Depends(get_current_admin)):
+    return {
+        "call_sites": usage_report(),
+        "today": await model_limiter.global_usage_today(),
+    }
+
+
+@router.get("/question-cache/stats")
+async def get_question_cache_stats(current_admin: str = Depends(get_current_admin)):
+    return question_cache.stats()
+
+
+@router.get("/analytics/roles")
+async def list_analytics_roles(current_admin: str = Depends(get_current_admin)):
+    try:
+        return {"roles": await analytics_reports.roles()}
+    except Exception as e:
+        logger.error(f"Analytics roles error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to list analytics roles")
+
+
+@router.get("/analytics/report")
+async def get_analytics_report(
+    role: Optional[str] = None,
+    difficulty: Optional[str] = Query(None, pattern="^(easy|medium|hard)$"),
+    cohort: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$", description="Month, e.g. 2025-06"),
+    current_admin: str = Depends(get_current_admin),
+):
+    try:
+        return await analytics_reports.get(role, difficulty, cohort)
+    except Exception as e:
+        logger.error(f"Analytics report error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to build analytics report")
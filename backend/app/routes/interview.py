@@ -1,29 +1,279 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from app.models.interview import InterviewRequest, InterviewSession
-from app.utils.auth import get_current_user
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
+from app.database import (
+    get_database,
+    get_search_repository,
+    get_session_repository,
+    get_summary_repository,
+)
+from app.models.interview import (
+    DirectUploadComplete,
+    DirectUploadRequest,
+    InterviewRequest,
+    InterviewSession,
+)
+from app.repositories.analytics_repository import AnalyticsRepository
+from app.repositories.session_repository import (
+    ANALYZING,
+    DONE,
+    FAILED as SESSION_FAILED,
+    IN_FLIGHT_STATES,
+    SESSION_STATES,
+    UPLOADED,
+    UPLOADING,
+    SessionRepository,
+    analysis_time,
+    session_state,
+)
+from app.repositories.search_repository import SearchRepository
+from app.repositories.summary_repository import SummaryRepository
+from app.utils.auth import get_current_user, get_current_user_from_query
 from app.services.gemini_service import generate_questions
-from app.services.s3_service import upload_video
-from app.services.vertex_service import analyze_video
+from app.services.s3_service import (
+    complete_direct_upload,
+    create_direct_upload,
+    upload_video,
+    upload_video_stream,
+)
+from app.services.vertex_service import analyze_video_segments
+from app.services.media_service import prepare_upload
+from app.services.segmentation_service import plan_segments
+from app.services.question_cache import question_cache
+from app.services.question_pool import question_pools
+from app.services.progress_service import analysis_events, progress_broker
+from app.services.rate_limiter import model_caller, model_limiter
+from app.services.job_service import (
+    COMPLETED,
+    FAILED,
+    NODE_NAME,
+    worker_pool,
+)
 from app.utils.logger import logger
-from pymongo import MongoClient
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from typing import Awaitable, Callable, Optional
+import asyncio
+import json
 import os
-
-from dotenv import load_dotenv
-load_dotenv()
+import shutil
+import tempfile
+import time
 
 router = APIRouter()
-client = MongoClient(os.getenv("MONGODB_URI"))
-db = client["interview_ai"]
+
+VIDEO_ANALYSIS_JOB = "video_analysis"
+VIDEO_ANALYSIS_CONCURRENCY = int(os.getenv("VIDEO_ANALYSIS_CONCURRENCY", "2"))
+JOB_SPOOL_DIR = os.getenv("JOB_SPOOL_DIR", tempfile.gettempdir())
+# Set when JOB_SPOOL_DIR is on storage every node can read, so uploads need no pinning
+JOB_SPOOL_SHARED = os.getenv("JOB_SPOOL_SHARED", "false").lower() == "true"
+SEARCH_SNIPPET_CHARS = int(os.getenv("SEARCH_SNIPPET_CHARS", "240"))
+
+
+def _spool_upload(source) -> str:
+    with tempfile.NamedTemporaryFile(
+        dir=JOB_SPOOL_DIR, prefix="interview_", suffix=".mp4", delete=False
+    ) as spool:
+        shutil.copyfileobj(source, spool)
+        return spool.name
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except OSError as e:
+        logger.warning(f"Failed to remove spooled upload: {str(e)}")
+
+
+async def _upload_recording(file_path: str, user_id: str) -> dict:
+    """Preprocess (when enabled) and upload a spooled recording and its audio track."""
+    try:
+        media = await prepare_upload(file_path)
+    except HTTPException:
+        # Rejected as corrupt; a retry would not help
+        _remove(file_path)
+        raise
+    try:
+        start = time.perf_counter()
+        with open(media["video_path"], "rb") as f:
+            video_url = await upload_video(f, user_id, media["mime_type"])
+        upload_seconds = time.perf_counter() - start
+        audio_url = None
+        if media["audio_path"]:
+            with open(media["audio_path"], "rb") as f:
+                audio_url = await upload_video(f, user_id, "audio/mp4")
+    finally:
+        for derived in (media["video_path"], media["audio_path"]):
+            if derived and derived != file_path:
+                _remove(derived)
+    _remove(file_path)
+
+    report = media["report"]
+    if report:
+        # Assumes upload throughput would have been the same for the original
+        ratio = report["original_bytes"] / max(report["processed_bytes"], 1)
+        report["upload_seconds"] = round(upload_seconds, 3)
+        report["estimated_upload_seconds_saved"] = round(upload_seconds * (ratio - 1), 3)
+    return {
+        "video_url": video_url,
+        "mime_type": media["mime_type"],
+        "audio_url": audio_url,
+        "media": report,
+    }
+
+
+async def _plan_segments(payload: dict, source: str) -> list:
+    segments = await plan_segments(
+        source, len(payload["questions"]), payload.get("question_timestamps")
+    )
+    # Empty records that the recording could not be split, so it is not re-scanned
+    return [list(segment) for segment in segments or []]
+
+
+async def _record_analysis(session_id: str, user_id: str, payload: dict, session: dict):
+    # Each write is idempotent per session, so a retry after a failure here counts it once.
+    # The stored analysis time keeps a retried recording in the session's original cohort.
+    db = get_database()
+    analytics = session["analytics"]
+    analyzed_at = analysis_time(session)
+    await SummaryRepository(db).record_analysis(user_id, session_id, analytics, analyzed_at)
+    for repository in (AnalyticsRepository, SearchRepository):
+        await repository(db).record(
+            session_id,
+            user_id,
+            payload["job_description"],
+            payload.get("difficulty"),
+            analytics,
+            analyzed_at,
+        )
+    progress_broker.publish(session_id)
+
+
+async def process_video_job(job: dict, progress) -> dict:
+    payload = job["payload"]
+    session_id = payload["session_id"]
+    sessions = SessionRepository(get_database())
+    # A retry of a job whose analysis was already stored only finishes the recording
+    session = await sessions.find_for_user(session_id, job["user_id"])
+    if session and session.get("analytics"):
+        await _record_analysis(session_id, job["user_id"], payload, session)
+        return {"analytics": session["analytics"]}
+    stored_upload = {
+        key: job.get("result", {}).get(key) or payload.get(key)
+        for key in ("video_url", "mime_type", "audio_url")
+    }
+    video_url = stored_upload["video_url"]
+    segment_plan = job.get("result", {}).get("segment_plan")
+
+    # Mirror job progress onto the session so streaming clients can follow it
+    async def report(stage: str, result: Optional[dict] = None):
+        await progress(stage, result)
+        await sessions.update_progress(session_id, status="running", stage=stage)
+        progress_broker.publish(session_id)
+
+    # A retried job reuses the upload from the previous attempt
+    if not video_url:
+        await report("uploading")
+        # Find the question boundaries on the spooled file, not over the network
+        if segment_plan is None:
+            segment_plan = await _plan_segments(payload, payload["file_path"])
+        stored_upload = await _upload_recording(payload["file_path"], job["user_id"])
+        video_url = stored_upload["video_url"]
+        await report("uploaded", {**stored_upload, "segment_plan": segment_plan})
+        await sessions.set_state(session_id, UPLOADED, expected=IN_FLIGHT_STATES, **stored_upload)
+
+    if segment_plan is None:
+        segment_plan = await _plan_segments(payload, stored_upload["audio_url"] or video_url)
+    # A retry of a job whose analysis was already stored must not reopen the session
+    await sessions.set_state(session_id, ANALYZING, expected=IN_FLIGHT_STATES)
+    await report("analyzing", {"segment_plan": segment_plan})
+    # Results from a resumed session's earlier job, then from this job's earlier attempts
+    completed = {
+        int(index): result
+        for source in (payload.get("completed"), job.get("result", {}).get("segments"))
+        for index, result in (source or {}).items()
+    }
+
+    # Checkpoint each question's result so a retry only redoes the missing ones
+    async def on_result(index: int, result: dict):
+        await progress("analyzing", {f"segments.{index}": result})
+        await sessions.save_partial_result(session_id, index, result)
+        progress_broker.publish(session_id)
+
+    with model_caller(job["user_id"]):
+        analytics = await analyze_video_segments(
+            video_url=video_url,
+            job_description=payload["job_description"],
+            questions=payload["questions"],
+            segments=segment_plan,
+            completed=completed,
+            on_result=on_result,
+            mime_type=stored_upload["mime_type"] or "video/mp4",
+        )
+
+    # If another attempt stored its analysis first, that one is recorded
+    await sessions.set_analysis(session_id, video_url, analytics)
+    session = await sessions.find_for_user(session_id, job["user_id"])
+    analytics = session["analytics"]
+    await _record_analysis(session_id, job["user_id"], payload, session)
+    logger.info(
+        f"Video uploaded and analyzed for user: {job['user_id']}, session_id: {payload['session_id']}"
+    )
+    return {"analytics": analytics}
+
+
+async def fail_video_job(job: dict, error: str):
+    session_id = job["payload"]["session_id"]
+    # No further attempt will read the spooled upload
+    file_path = job["payload"].get("file_path")
+    if file_path and os.path.exists(file_path):
+        _remove(file_path)
+    sessions = SessionRepository(get_database())
+    # A session whose analysis was stored by an earlier attempt stays done
+    if await sessions.set_state(session_id, SESSION_FAILED, expected=IN_FLIGHT_STATES, error=error):
+        await sessions.update_progress(session_id, status="failed", error=error)
+    progress_broker.publish(session_id)
+
+
+worker_pool.register(
+    VIDEO_ANALYSIS_JOB,
+    process_video_job,
+    concurrency=VIDEO_ANALYSIS_CONCURRENCY,
+    on_failure=fail_video_job,
+)
 
 
 @router.post("/generate-questions")
 async def generate_questions_endpoint(
-    request: InterviewRequest, current_user: str = Depends(get_current_user)
+    request: InterviewRequest,
+    current_user: str = Depends(get_current_user),
+    sessions: SessionRepository = Depends(get_session_repository),
+    summaries: SummaryRepository = Depends(get_summary_repository),
 ):
     try:
-        questions = await generate_questions(
+        # Roles with a pre-generated pool are served without a model call
+        questions = await question_pools.sample(
             request.job_description, request.difficulty, request.num_questions
         )
+        if questions is None:
+            with model_caller(current_user):
+                questions = await question_cache.get_or_generate(
+                    request.job_description,
+                    request.difficulty,
+                    request.num_questions,
+                    generate_questions,
+                )
         session = InterviewSession(
             user_id=current_user,
             job_description=request.job_description,
@@ -31,52 +281,184 @@ async def generate_questions_endpoint(
             num_questions=request.num_questions,
             questions=questions,
         )
-        result = db.sessions.insert_one(session.dict())
-        session_id = str(result.inserted_id)
+        session_id = await sessions.create(session)
+        await summaries.record_session(current_user)
         logger.info(
             f"Interview session created for user: {current_user}, session_id: {session_id}"
         )
         return {"questions": questions, "session_id": session_id}
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Generate questions error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to generate questions")
 
 
-@router.post("/upload-video")
-async def upload_video_endpoint(
-    file: UploadFile = File(...), current_user: str = Depends(get_current_user)
-):
+def _parse_timestamps(raw: Optional[str]) -> Optional[list[float]]:
+    if not raw:
+        return None
     try:
-        video_url = await upload_video(file.file, current_user)
-        session = db.sessions.find_one(
-            {"user_id": current_user, "video_url": None}, sort=[("_id", -1)]
-        )
-        if not session:
-            raise HTTPException(
-                status_code=400, detail="No pending interview session found"
-            )
+        return [float(t) for t in raw.split(",")]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid question_timestamps")
 
-        questions = session.get("questions", [])
-        job_description = session.get("job_description", "Unknown Role")
 
-        if not questions:
-            raise HTTPException(status_code=400, detail="No questions found in session")
+async def _get_session(sessions: SessionRepository, current_user: str, session_id: str) -> dict:
+    if not ObjectId.is_valid(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    session = await sessions.find_for_user(session_id, current_user)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if not session.get("questions"):
+        raise HTTPException(status_code=400, detail="No questions found in session")
+    return session
+
+
+def _upload_response(session: dict, state: str) -> dict:
+    return {
+        "job_id": (session.get("analysis_progress") or {}).get("job_id"),
+        "session_id": str(session["_id"]),
+        "status": state,
+    }
+
+
+async def _claim_upload(
+    sessions: SessionRepository,
+    current_user: str,
+    session_id: str,
+    idempotency_key: Optional[str],
+) -> tuple[dict, Optional[dict]]:
+    """Move the session to uploading, or return the response already given for this key.
+
+    A repeated request with the same Idempotency-Key gets the original
+    response while that upload is in flight or done; once it has failed, the
+    repeat resumes it instead.
+    """
+    if idempotency_key:
+        previous = await sessions.find_by_idempotency_key(current_user, idempotency_key)
+        if previous and str(previous["_id"]) != session_id:
+            raise HTTPException(status_code=409, detail="Idempotency key used for another session")
+        if previous and session_state(previous) != SESSION_FAILED:
+            return previous, _upload_response(previous, session_state(previous))
+
+    session = await _get_session(sessions, current_user, session_id)
+    try:
+        claimed = await sessions.claim_upload(session_id, current_user, idempotency_key)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Idempotency key used for another session")
+    if not claimed:
+        if session_state(session) == DONE:
+            raise HTTPException(status_code=409, detail="Session already analyzed")
+        raise HTTPException(status_code=409, detail="Session upload already in progress")
+    return claimed, None
+
+
+Upload = Callable[[], Awaitable[dict]]
 
-        analytics = await analyze_video(
-            video_url=video_url,
-            job_description=job_description,
-            questions=questions,
-        )
 
-        db.sessions.update_one(
-            {"_id": session["_id"]},
-            {"$set": {"video_url": video_url, "analytics": analytics}},
+class _ClaimLost(Exception):
+    """The session was reclaimed as stale by another request mid-upload."""
+
+
+async def _start_upload(
+    sessions: SessionRepository,
+    current_user: str,
+    session_id: str,
+    idempotency_key: Optional[str],
+    question_timestamps: Optional[list[float]],
+    upload: Upload,
+) -> dict:
+    session, replay = await _claim_upload(sessions, current_user, session_id, idempotency_key)
+    if replay:
+        logger.info(f"Upload replayed for session: {session_id}")
+        return replay
+    try:
+        if session.get("video_url"):
+            # Resuming: the stored upload and finished questions are reused
+            logger.info(f"Resuming analysis for session: {session_id}")
+            uploaded = {
+                key: session[key]
+                for key in ("video_url", "mime_type", "audio_url")
+                if session.get(key)
+            }
+        else:
+            uploaded = await upload()
+        if uploaded.get("video_url") and not await sessions.set_state(
+            session_id,
+            UPLOADED,
+            expected=[UPLOADING],
+            claim=session["upload_claim"],
+            video_url=uploaded["video_url"],
+            mime_type=uploaded.get("mime_type"),
+        ):
+            raise _ClaimLost()
+        return await _submit_analysis(
+            sessions,
+            current_user,
+            session,
+            question_timestamps=question_timestamps,
+            completed=(session.get("analysis_progress") or {}).get("questions") or {},
+            **uploaded,
         )
+    except _ClaimLost:
+        # The other request owns the session now; submitting here would analyze it twice
+        logger.warning(f"Upload claim lost for session: {session_id}")
+        raise HTTPException(status_code=409, detail="Session upload was taken over by another request")
+    except Exception as e:
+        error = e.detail if isinstance(e, HTTPException) else str(e)
+        await sessions.set_state(
+            session_id,
+            SESSION_FAILED,
+            expected=[UPLOADING, UPLOADED],
+            claim=session["upload_claim"],
+            error=error,
+        )
+        raise
 
-        logger.info(
-            f"Video uploaded and analyzed for user: {current_user}, session_id: {str(session['_id'])}"
+
+async def _submit_analysis(
+    sessions: SessionRepository, current_user: str, session: dict, **payload
+) -> dict:
+    job_id = await worker_pool.submit(
+        VIDEO_ANALYSIS_JOB,
+        current_user,
+        {
+            **payload,
+            "session_id": str(session["_id"]),
+            "job_description": session.get("job_description", "Unknown Role"),
+            "difficulty": session.get("difficulty"),
+            "questions": session["questions"],
+        },
+        # A spooled file is only readable on this node (unless JOB_SPOOL_DIR is shared)
+        node=NODE_NAME if payload.get("file_path") and not JOB_SPOOL_SHARED else None,
+    )
+    await sessions.start_analysis(str(session["_id"]), job_id)
+    state = UPLOADED if payload.get("video_url") else UPLOADING
+    return {"job_id": job_id, "session_id": str(session["_id"]), "status": state}
+
+
+@router.get("/model-usage")
+async def get_model_usage(current_user: str = Depends(get_current_user)):
+    return {"today": await model_limiter.usage_today(current_user)}
+
+
+@router.post("/upload-video", status_code=202)
+async def upload_video_endpoint(
+    file: UploadFile = File(...),
+    session_id: str = Form(...),
+    question_timestamps: Optional[str] = Form(None),
+    idempotency_key: Optional[str] = Header(None),
+    current_user: str = Depends(get_current_user),
+    sessions: SessionRepository = Depends(get_session_repository),
+):
+    async def spool() -> dict:
+        return {"file_path": await asyncio.to_thread(_spool_upload, file.file)}
+
+    try:
+        timestamps = _parse_timestamps(question_timestamps)
+        return await _start_upload(
+            sessions, current_user, session_id, idempotency_key, timestamps, spool
         )
-        return {"video_url": video_url, "analytics": analytics}
     except HTTPException as e:
         logger.error(f"Upload video error: {str(e)}")
         raise e
@@ -85,34 +467,288 @@ async def upload_video_endpoint(
         raise HTTPException(status_code=500, detail="Failed to upload video")
 
 
+@router.post("/upload-video/stream", status_code=202)
+async def stream_video_endpoint(
+    request: Request,
+    session_id: str,
+    question_timestamps: Optional[str] = None,
+    idempotency_key: Optional[str] = Header(None),
+    current_user: str = Depends(get_current_user),
+    sessions: SessionRepository = Depends(get_session_repository),
+):
+    """Ingest a raw video request body straight into S3 multipart parts."""
+
+    async def stream() -> dict:
+        return await upload_video_stream(request.stream(), current_user)
+
+    try:
+        timestamps = _parse_timestamps(question_timestamps)
+        return await _start_upload(
+            sessions, current_user, session_id, idempotency_key, timestamps, stream
+        )
+    except HTTPException as e:
+        logger.error(f"Stream video error: {str(e)}")
+        raise e
+    except Exception as e:
+        logger.error(f"Stream video error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to upload video")
+
+
+@router.post("/direct-upload")
+async def create_direct_upload_endpoint(
+    request: DirectUploadRequest,
+    current_user: str = Depends(get_current_user),
+    sessions: SessionRepository = Depends(get_session_repository),
+):
+    await _get_session(sessions, current_user, request.session_id)
+    return await create_direct_upload(current_user, request.parts)
+
+
+@router.post("/direct-upload/complete", status_code=202)
+async def complete_direct_upload_endpoint(
+    request: DirectUploadComplete,
+    idempotency_key: Optional[str] = Header(None),
+    current_user: str = Depends(get_current_user),
+    sessions: SessionRepository = Depends(get_session_repository),
+):
+    if not request.key.startswith(f"interviews/{current_user}_"):
+        raise HTTPException(status_code=403, detail="Upload does not belong to user")
+    if request.upload_id and not request.parts:
+        raise HTTPException(status_code=400, detail="Multipart upload requires parts")
+
+    async def complete() -> dict:
+        return await complete_direct_upload(
+            request.key,
+            request.size,
+            request.upload_id,
+            [part.model_dump() for part in request.parts],
+            request.etag,
+        )
+
+    return await _start_upload(
+        sessions,
+        current_user,
+        request.session_id,
+        idempotency_key,
+        request.question_timestamps,
+        complete,
+    )
+
+
+async def _get_user_job(job_id: str, current_user: str) -> dict:
+    job = await worker_pool.queue.get(job_id)
+    if not job or job["user_id"] != current_user:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str, current_user: str = Depends(get_current_user)):
+    job = await _get_user_job(job_id, current_user)
+    return {
+        "job_id": job["_id"],
+        "session_id": job["payload"].get("session_id"),
+        "status": job["status"],
+        "stage": job["stage"],
+        "attempts": job["attempts"],
+        "segments_completed": len(job["result"].get("segments", {})),
+        "media": job["result"].get("media"),
+        "error": job["error"],
+        "created_at": job["created_at"].isoformat(),
+        "updated_at": job["updated_at"].isoformat(),
+    }
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, current_user: str = Depends(get_current_user)):
+    job = await _get_user_job(job_id, current_user)
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=500, detail=job["error"] or "Analysis failed")
+    if job["status"] != COMPLETED:
+        raise HTTPException(status_code=409, detail="Analysis not completed yet")
+    return {
+        "video_url": job["result"].get("video_url"),
+        "analytics": job["result"].get("analytics"),
+    }
+
+
+def _format_session(session: dict) -> dict:
+    return {
+        "session_id": str(session["_id"]),
+        "job_description": session.get("job_description", "Unknown Role"),
+        "difficulty": session.get("difficulty", "Unknown"),
+        "num_questions": session.get("num_questions", 0),
+        "video_url": session.get("video_url"),
+        "state": session_state(session),
+        "created_at": session["_id"].generation_time.isoformat(),  # MongoDB timestamp
+    }
+
+
 @router.get("/dashboard")
-async def get_dashboard(current_user: str = Depends(get_current_user)):
+async def get_dashboard(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    state: Optional[str] = None,
+    current_user: str = Depends(get_current_user),
+    session_repository: SessionRepository = Depends(get_session_repository),
+    summaries: SummaryRepository = Depends(get_summary_repository),
+):
+    if cursor and not ObjectId.is_valid(cursor):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if state and state not in SESSION_STATES:
+        raise HTTPException(status_code=400, detail="Invalid state")
     try:
-        sessions = list(db.sessions.find({"user_id": current_user}))
-        if not sessions:
+        sessions = await session_repository.list_page(current_user, limit + 1, cursor, state)
+        has_more = len(sessions) > limit
+        sessions = sessions[:limit]
+        summary = await summaries.get(current_user) if not cursor else None
+        if not sessions and not cursor:
             logger.info(f"No sessions found for user: {current_user}")
-            return {"sessions": [], "message": "No interview sessions found"}
+            return {
+                "summary": summary,
+                "sessions": [],
+                "next_cursor": None,
+                "message": "No interview sessions found",
+            }
 
         formatted_sessions = []
         for session in sessions:
-            formatted_session = {
-                "session_id": str(session["_id"]),
-                "job_description": session.get("job_description", "Unknown Role"),
-                "difficulty": session.get("difficulty", "Unknown"),
-                "num_questions": session.get("num_questions", 0),
-                "questions": session.get("questions", []),
-                "video_url": session.get("video_url"),
-                "analytics": session.get("analytics"),
-                "created_at": session.get(
-                    "_id"
-                ).generation_time.isoformat(),  # MongoDB timestamp
-            }
+            formatted_session = _format_session(session)
+            formatted_session["overall_score"] = (session.get("analytics") or {}).get(
+                "overall_score"
+            )
             formatted_sessions.append(formatted_session)
 
         logger.info(
             f"Dashboard data retrieved for user: {current_user}, sessions: {len(formatted_sessions)}"
         )
-        return {"sessions": formatted_sessions}
+        return {
+            "summary": summary,
+            "sessions": formatted_sessions,
+            "next_cursor": formatted_sessions[-1]["session_id"] if has_more else None,
+        }
     except Exception as e:
         logger.error(f"Dashboard error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to retrieve dashboard data")
+
+
+@router.get("/sessions/{session_id}")
+async def get_session_detail(
+    session_id: str,
+    current_user: str = Depends(get_current_user),
+    sessions: SessionRepository = Depends(get_session_repository),
+):
+    if not ObjectId.is_valid(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    session = await sessions.find_for_user(session_id, current_user)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {
+        **_format_session(session),
+        "questions": session.get("questions", []),
+        "analytics": session.get("analytics"),
+        "error": session.get("error"),
+    }
+
+
+def _snippet(text: str, query: str, width: int = SEARCH_SNIPPET_CHARS) -> str:
+    """A window of ``text`` around the first query term it contains."""
+    if len(text) <= width:
+        return text
+    lowered = text.lower()
+    positions = [
+        lowered.find(term)
+        for term in query.lower().replace('"', " ").split()
+        if not term.startswith("-")
+    ]
+    start = max(0, min((p for p in positions if p >= 0), default=0) - width // 4)
+    end = min(len(text), start + width)
+    return f"{'...' if start else ''}{text[start:end].strip()}{'...' if end < len(text) else ''}"
+
+
+@router.get("/search")
+async def search_answers(
+    q: str = Query(..., min_length=2, max_length=200, description="Words, \"phrases\" or -excluded words"),
+    role: Optional[str] = None,
+    difficulty: Optional[str] = Query(None, pattern="^(easy|medium|hard)$"),
+    min_score: Optional[float] = Query(None, ge=0, le=100),
+    max_score: Optional[float] = Query(None, ge=0, le=100),
+    kind: Optional[str] = Query(None, pattern="^(answer|feedback)$"),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=1000),
+    current_user: str = Depends(get_current_user),
+    search: SearchRepository = Depends(get_search_repository),
+):
+    """Search the user's analyzed answers and feedback, best match first."""
+    if min_score is not None and max_score is not None and min_score > max_score:
+        raise HTTPException(status_code=400, detail="min_score is greater than max_score")
+    try:
+        entries = await search.search(
+            current_user, q, role, difficulty, min_score, max_score, kind, limit + 1, offset
+        )
+        has_more = len(entries) > limit
+        results = [
+            {
+                "session_id": entry["session_id"],
+                "kind": entry["kind"],
+                "question_index": entry.get("index"),
+                "question": entry["question"],
+                "answer": _snippet(entry["answer"], q),
+                "feedback": _snippet(entry["feedback"], q),
+                "score": entry["score"],
+                "role": entry["role"],
+                "difficulty": entry["difficulty"],
+                "analyzed_at": entry["analyzed_at"].isoformat(),
+                "relevance": round(entry["relevance"], 3),
+            }
+            for entry in entries[:limit]
+        ]
+        return {"results": results, "next_offset": offset + limit if has_more else None}
+    except Exception as e:
+        logger.error(f"Search error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to search interview answers")
+
+
+@router.get("/sessions/{session_id}/events")
+async def stream_session_events(
+    session_id: str,
+    current_user: str = Depends(get_current_user_from_query),
+    sessions: SessionRepository = Depends(get_session_repository),
+):
+    """Server-sent events with analysis progress and per-question results."""
+    if not ObjectId.is_valid(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    async def events():
+        async for event, data in analysis_events(sessions, session_id, current_user):
+            yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/sessions/{session_id}/ws")
+async def session_events_websocket(
+    websocket: WebSocket,
+    session_id: str,
+    sessions: SessionRepository = Depends(get_session_repository),
+):
+    await websocket.accept()
+    try:
+        current_user = await get_current_user_from_query(websocket.query_params.get("token"))
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    if not ObjectId.is_valid(session_id):
+        await websocket.close(code=1008, reason="Session not found")
+        return
+    try:
+        async for event, data in analysis_events(sessions, session_id, current_user):
+            await websocket.send_text(json.dumps({"event": event, "data": data}, default=str))
+        # 1012 (service restart) tells the client to reconnect to another worker
+        await websocket.close(code=1012 if progress_broker.closing else 1000)
+    except WebSocketDisconnect:
+        logger.info(f"Progress websocket closed for session: {session_id}")
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+from cachetools import LRUCache
+from app.database import get_database
+from app.repositories.analytics_repository import AnalyticsRepository, normalize_text
+from app.utils.logger import logger
+
+ANALYTICS_REPORT_TTL_SECONDS = int(os.getenv("ANALYTICS_REPORT_TTL_SECONDS", "300"))
+ANALYTICS_REPORT_MAXSIZE = int(os.getenv("ANALYTICS_REPORT_MAXSIZE", "256"))
+ANALYTICS_TOP_QUESTIONS = int(os.getenv("ANALYTICS_TOP_QUESTIONS", "50"))
+ANALYTICS_TOP_IMPROVEMENT_AREAS = int(os.getenv("ANALYTICS_TOP_IMPROVEMENT_AREAS", "10"))
+ANALYTICS_MAX_ROLES = int(os.getenv("ANALYTICS_MAX_ROLES", "200"))
+
+PERCENTILES = (10, 25, 50, 75, 90, 95)
+HISTOGRAM_BIN_WIDTH = 10
+
+
+def score_distribution(buckets: list[dict]) -> dict:
+    """Percentiles and a coarse histogram from per-point score counts.
+
+    ``buckets`` are ``{"_id": score, "count": n}`` for integer scores 0-100,
+    as grouped by the database, so no individual scores leave MongoDB.
+    Percentiles use the nearest-rank method at 1-point resolution.
+    """
+    counts = np.zeros(101, dtype=np.int64)
+    for bucket in buckets:
+        counts[int(bucket["_id"])] += bucket["count"]
+    total = int(counts.sum())
+
+    bins = counts[:100].reshape(-1, HISTOGRAM_BIN_WIDTH).sum(axis=1)
+    bins[-1] += counts[100]
+    histogram = [
+        {"from": i * HISTOGRAM_BIN_WIDTH, "to": (i + 1) * HISTOGRAM_BIN_WIDTH, "count": int(n)}
+        for i, n in enumerate(bins)
+    ]
+    if not total:
+        return {"percentiles": {f"p{p}": None for p in PERCENTILES}, "histogram": histogram}
+
+    ranks = np.maximum(np.ceil(np.array(PERCENTILES) / 100 * total), 1)
+    scores = np.searchsorted(np.cumsum(counts), ranks)
+    return {
+        "percentiles": {f"p{p}": int(score) for p, score in zip(PERCENTILES, scores)},
+        "histogram": histogram,
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+class AnalyticsReports:
+    """Cached cross-session reports, keyed by role, difficulty and cohort.
+
+    A report older than ``ttl`` is still served while a single background
+    refresh recomputes it, so only the first request for a filter waits on
+    the aggregation.
+    """
+
+    def __init__(
+        self,
+        ttl: int = ANALYTICS_REPORT_TTL_SECONDS,
+        maxsize: int = ANALYTICS_REPORT_MAXSIZE,
+    ):
+        self._ttl = ttl
+        self._reports: LRUCache = LRUCache(maxsize=maxsize)
+        self._inflight: dict[tuple, asyncio.Task] = {}
+
+    async def get(
+        self,
+        role: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        cohort: Optional[str] = None,
+    ) -> dict:
+        role = normalize_text(role) if role else None
+        return await self._cached(
+            ("report", role, difficulty, cohort), lambda: self._report(role, difficulty, cohort)
+        )
+
+    async def roles(self) -> list[dict]:
+        return await self._cached(("roles",), self._roles)
+
+    async def _cached(self, key: tuple, compute: Callable[[], Awaitable]):
+        cached = self._reports.get(key)
+        if cached is None:
+            return await asyncio.shield(self._refresh(key, compute))
+        computed_at, value = cached
+        if time.monotonic() - computed_at > self._ttl:
+            self._refresh(key, compute)
+        return value
+
+    def _refresh(self, key: tuple, compute: Callable[[], Awaitable]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._store(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        return task
+
+    async def _store(self, key: tuple, compute: Callable[[], Awaitable]):
+        start = time.perf_counter()
+        value = await compute()
+        self._reports[key] = (time.monotonic(), value)
+        logger.info(f"Analytics {key} computed in {time.perf_counter() - start:.2f}s")
+        return value
+
+    def _finished(self, key: tuple, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Analytics {key} failed: {str(task.exception())}")
+
+    async def _report(
+        self, role: Optional[str], difficulty: Optional[str], cohort: Optional[str]
+    ) -> dict:
+        match = {
+            field: value
+            for field, value in (("role", role), ("difficulty", difficulty), ("cohort", cohort))
+            if value
+        }
+        repository = AnalyticsRepository(get_database())
+        sessions, questions = await asyncio.gather(
+            repository.session_report(match, ANALYTICS_TOP_IMPROVEMENT_AREAS),
+            repository.question_stats(match, ANALYTICS_TOP_QUESTIONS),
+        )
+        totals = sessions["totals"][0] if sessions["totals"] else {}
+        return {
+            "filters": {"role": role, "difficulty": difficulty, "cohort": cohort},
+            "sessions": totals.get("sessions", 0),
+            "average_overall_score": _round(totals.get("average_overall_score")),
+            "average_communication_score": _round(totals.get("average_communication_score")),
+            "average_answered": _round(totals.get("average_answered")),
+            "overall_score": score_distribution(sessions["histogram"]),
+            "questions": [
+                {
+                    "question": q["question"],
+                    "count": q["count"],
+                    "answered": q["answered"],
+                    "average_score": _round(q["average_score"]),
+                    "average_time_consumed_seconds": _round(q["average_time_consumed_seconds"]),
+                }
+                for q in questions
+            ],
+            "improvement_areas": [
+                {"area": area["_id"], "count": area["count"]}
+                for area in sessions["improvement_areas"]
+            ],
+            "computed_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    async def _roles(self) -> list[dict]:
+        rows = await AnalyticsRepository(get_database()).roles(ANALYTICS_MAX_ROLES)
+        return [
+            {
+                "role": row["_id"]["role"],
+                "difficulty": row["_id"]["difficulty"],
+                "sessions": row["sessions"],
+                "last_analyzed_at": row["last_analyzed_at"].isoformat(),
+            }
+            for row in rows
+        ]
@@ -1,40 +1,79 @@
 import requests
-import json
 import os
 from fastapi import HTTPException
+from app.services.model_provider import question_provider
+from app.services.response_parser import (
+    JsonArrayStream,
+    ResponseParseError,
+    parse_with_reask,
+)
 from app.utils.logger import logger
-from google import genai
-from dotenv import load_dotenv
+from app.utils.model_usage import record_model_call
+from typing import Any, AsyncIterator, List, Union
 
-load_dotenv()
+QUESTION_MODEL = os.getenv("QUESTION_MODEL", "gemini-2.0-flash")
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+QuestionList = List[Union[str, dict]]
 
-client = genai.Client(api_key=GEMINI_API_KEY)
 
-async def generate_questions(job_description: str, difficulty: str, num_questions: int) -> list:
-    try:
-        prompt = f"""Generate {num_questions} interview questions for a {job_description} role at {difficulty} difficulty.
+def _question_text(item: Any) -> str:
+    # Models sometimes wrap each question in an object
+    if isinstance(item, dict):
+        item = item.get("question") or item.get("text") or next(iter(item.values()), "")
+    return str(item).strip()
+
+
+async def _reask(prompt: str) -> str:
+    response = await question_provider.generate(QUESTION_MODEL, prompt, List[str])
+    record_model_call("generate_questions.reask", prompt, response.usage)
+    return response.text
+
+
+async def stream_questions(
+    job_description: str, difficulty: str, num_questions: int
+) -> AsyncIterator[str]:
+    """Yield questions parsed incrementally from the model's output stream."""
+    prompt = f"""Generate {num_questions} interview questions for a {job_description} role at {difficulty} difficulty.
         Always include a mix of technical and behavioral questions.
         Each question should be clear and concise, suitable for a professional interview setting.
         The questions should be relevant to the job description provided.
-        Format the output as a JSON array of questions and return valid json. Format is:
-        [
-            {"Question text"},
-            {"Question text"}
-        ]
+        Return the questions as a JSON array of strings.
         """
 
-        response = client.models.generate_content(model="gemini-2.0-flash", contents=prompt)
-        print(response.text)
-        if response.text.startswith("```json"):
-            cleaned = response.text.strip("`").strip("json").strip()
-        else:
-            cleaned = response.text
-        parsed_json = json.loads(cleaned)
-        print(parsed_json)
-        logger.info(f"Generated {len(parsed_json)} questions for {job_description}")
-        return parsed_json
-    except requests.RequestException as e:
+    parser = JsonArrayStream()
+    text = ""
+    emitted = set()
+    usage = None
+    async for chunk in question_provider.stream(QUESTION_MODEL, prompt, List[str]):
+        piece = chunk.text
+        text += piece
+        usage = chunk.usage or usage
+        for item in parser.feed(piece):
+            question = _question_text(item)
+            if question and question not in emitted and len(emitted) < num_questions:
+                emitted.add(question)
+                yield question
+
+    record_model_call("generate_questions", prompt, usage)
+
+    # Fall back to a full parse (and a cheap re-ask) if streaming parse fell short
+    if not parser.complete or parser.errors or not emitted:
+        for item in await parse_with_reask(text, QuestionList, _reask):
+            question = _question_text(item)
+            if question and question not in emitted and len(emitted) < num_questions:
+                emitted.add(question)
+                yield question
+
+
+async def generate_questions(job_description: str, difficulty: str, num_questions: int) -> list:
+    # The endpoint returns the whole list together with the session, so the
+    # caller still waits for the full generation
+    try:
+        questions = [
+            q async for q in stream_questions(job_description, difficulty, num_questions)
+        ]
+        logger.info(f"Generated {len(questions)} questions for {job_description}")
+        return questions
+    except (requests.RequestException, ResponseParseError) as e:
         logger.error(f"Gemini API error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to generate questions")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to generate questions")
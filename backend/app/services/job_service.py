@@ -0,0 +1,493 @@
+import asyncio
+import os
+import random
+import socket
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+from app.database import get_database
+from app.services.lease import OWNER
+from app.utils.logger import logger, request_id_var, user_id_var
+from app.utils.telemetry import JOBS_RUNNING, span
+
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "memory")
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF_SECONDS = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "2"))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1"))
+# How long the in-memory queue keeps finished jobs for status polling
+JOB_RESULT_TTL_SECONDS = float(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+# A running job whose heartbeat is older than this is taken over by another worker
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "15"))
+# On shutdown, running jobs get this long to finish before they are requeued
+JOB_DRAIN_SECONDS = float(os.getenv("JOB_DRAIN_SECONDS", "30"))
+# Jobs that read local files (spooled uploads) only run on the node that wrote them
+NODE_NAME = os.getenv("NODE_NAME", socket.gethostname())
+# A job pinned to a node that has not touched it for this long is failed by another node
+JOB_PIN_TIMEOUT_SECONDS = float(os.getenv("JOB_PIN_TIMEOUT_SECONDS", "3600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+Progress = Callable[..., Awaitable[None]]
+Handler = Callable[[dict, Progress], Awaitable[Optional[dict]]]
+FailureHandler = Callable[[dict, str], Awaitable[None]]
+
+
+class LeaseLost(Exception):
+    """Another worker claimed the job after this worker's lease ran out."""
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _claim_token() -> str:
+    # Unique per claim, so a worker can tell its own lease from a later one in the same process
+    return f"{OWNER}:{uuid.uuid4().hex[:8]}"
+
+
+def _apply(doc: dict, fields: dict):
+    # Mirror Mongo's dotted-key $set semantics for the in-memory backend
+    for key, value in fields.items():
+        target = doc
+        *parents, leaf = key.split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = value
+
+
+def new_job(job_type: str, user_id: str, payload: dict, node: Optional[str] = None) -> dict:
+    now = _now()
+    return {
+        "_id": uuid.uuid4().hex,
+        "type": job_type,
+        "user_id": user_id,
+        "payload": payload,
+        "node": node,
+        "worker": None,
+        "heartbeat_at": None,
+        "status": QUEUED,
+        "stage": None,
+        "attempts": 0,
+        "result": {},
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+        "available_at": now,
+    }
+
+
+class JobQueue(ABC):
+    @abstractmethod
+    async def enqueue(self, job: dict) -> str: ...
+
+    @abstractmethod
+    async def claim(self) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def update(self, job_id: str, fields: dict, worker: Optional[str] = None) -> bool:
+        """Set ``fields`` on the job; returns False if it is gone.
+
+        With ``worker`` (the token ``claim`` set), writes only while that
+        claim still holds the job, so a worker whose lease was taken over
+        cannot overwrite the new owner's state.
+        """
+
+    @abstractmethod
+    async def retry(self, job_id: str, delay: float, error: str, worker: Optional[str] = None) -> bool: ...
+
+    @abstractmethod
+    async def release(self, job_id: str, worker: str):
+        """Requeue a job interrupted by shutdown without counting the attempt."""
+
+    async def heartbeat(self, job_id: str, worker: str) -> bool:
+        return await self.update(job_id, {"heartbeat_at": _now()}, worker)
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def depth(self) -> int: ...
+
+
+class InMemoryJobQueue(JobQueue):
+    """Single-process queue; finished jobs are dropped after ``result_ttl`` seconds."""
+
+    def __init__(self, result_ttl: float = JOB_RESULT_TTL_SECONDS):
+        self._jobs: dict[str, dict] = {}
+        self._queued: set[str] = set()
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._result_ttl = result_ttl
+
+    async def enqueue(self, job: dict) -> str:
+        self._jobs[job["_id"]] = job
+        self._queued.add(job["_id"])
+        self._ready.put_nowait(job["_id"])
+        return job["_id"]
+
+    async def claim(self) -> Optional[dict]:
+        job_id = await self._ready.get()
+        job = self._jobs.get(job_id)
+        if not job or job["status"] != QUEUED:
+            return None
+        self._queued.discard(job_id)
+        job["status"] = RUNNING
+        job["worker"] = _claim_token()
+        job["attempts"] += 1
+        job["updated_at"] = _now()
+        return dict(job)
+
+    async def update(self, job_id: str, fields: dict, worker: Optional[str] = None) -> bool:
+        job = self._jobs.get(job_id)
+        if not job or (worker is not None and job["worker"] != worker):
+            return False
+        _apply(job, {**fields, "updated_at": _now()})
+        status = fields.get("status")
+        if status == QUEUED:
+            self._queued.add(job_id)
+        elif status in (COMPLETED, FAILED):
+            self._queued.discard(job_id)
+            asyncio.get_running_loop().call_later(self._result_ttl, self._jobs.pop, job_id, None)
+        return True
+
+    async def retry(self, job_id: str, delay: float, error: str, worker: Optional[str] = None) -> bool:
+        if not await self.update(
+            job_id,
+            {"status": QUEUED, "error": error, "available_at": _now()},
+            worker,
+        ):
+            return False
+        asyncio.get_running_loop().call_later(delay, self._ready.put_nowait, job_id)
+        return True
+
+    async def release(self, job_id: str, worker: str):
+        job = self._jobs.get(job_id)
+        if job and job["status"] == RUNNING and job["worker"] == worker:
+            job["attempts"] -= 1
+            await self.retry(job_id, 0, "Worker stopped")
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def depth(self) -> int:
+        return len(self._queued)
+
+
+class MongoJobQueue(JobQueue):
+    """Job queue shared by every worker process and node.
+
+    Claimed jobs carry a heartbeat; if their worker dies without releasing
+    them, another worker claims them again once the lease runs out. Jobs
+    pinned to a node that has not touched them for ``pin_timeout`` seconds
+    are handed to any node, which fails them (see ``JobWorkerPool._run``).
+    """
+
+    def __init__(
+        self,
+        collection_name: str = "jobs",
+        poll_interval: float = JOB_POLL_INTERVAL_SECONDS,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        pin_timeout: float = JOB_PIN_TIMEOUT_SECONDS,
+    ):
+        self._collection_name = collection_name
+        self._poll_interval = poll_interval
+        self._lease_seconds = lease_seconds
+        self._pin_timeout = pin_timeout
+
+    @property
+    def _collection(self):
+        return get_database()[self._collection_name]
+
+    async def enqueue(self, job: dict) -> str:
+        await self._collection.insert_one(job)
+        return job["_id"]
+
+    async def claim(self) -> Optional[dict]:
+        now = _now()
+        job = await self._collection.find_one_and_update(
+            {
+                "$or": [
+                    {"node": {"$in": [None, NODE_NAME]}, "status": QUEUED, "available_at": {"$lte": now}},
+                    {
+                        "node": {"$in": [None, NODE_NAME]},
+                        "status": RUNNING,
+                        "heartbeat_at": {"$lt": now - timedelta(seconds=self._lease_seconds)},
+                    },
+                    # Heartbeats and progress bump updated_at, so this node is gone
+                    {
+                        "node": {"$nin": [None, NODE_NAME]},
+                        "status": {"$in": [QUEUED, RUNNING]},
+                        "updated_at": {"$lt": now - timedelta(seconds=self._pin_timeout)},
+                    },
+                ],
+            },
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "worker": _claim_token(),
+                    "heartbeat_at": now,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("available_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if not job:
+            await asyncio.sleep(self._poll_interval)
+        return job
+
+    async def update(self, job_id: str, fields: dict, worker: Optional[str] = None) -> bool:
+        query = {"_id": job_id}
+        if worker is not None:
+            query["worker"] = worker
+        result = await self._collection.update_one(
+            query, {"$set": {**fields, "updated_at": _now()}}
+        )
+        return result.matched_count == 1
+
+    async def retry(self, job_id: str, delay: float, error: str, worker: Optional[str] = None) -> bool:
+        return await self.update(
+            job_id,
+            {
+                "status": QUEUED,
+                "error": error,
+                "available_at": datetime.fromtimestamp(
+                    _now().timestamp() + delay, timezone.utc
+                ),
+            },
+            worker,
+        )
+
+    async def release(self, job_id: str, worker: str):
+        now = _now()
+        await self._collection.update_one(
+            {"_id": job_id, "status": RUNNING, "worker": worker},
+            {
+                "$set": {
+                    "status": QUEUED,
+                    "error": "Worker stopped",
+                    "available_at": now,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": -1},
+            },
+        )
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await self._collection.find_one({"_id": job_id})
+
+    async def depth(self) -> int:
+        return await self._collection.count_documents({"status": QUEUED})
+
+
+def create_job_queue() -> JobQueue:
+    if JOB_QUEUE_BACKEND == "mongo":
+        return MongoJobQueue()
+    return InMemoryJobQueue()
+
+
+class JobWorkerPool:
+    """Runs queued jobs on in-process asyncio workers with retry and backoff."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        concurrency: int = JOB_WORKER_CONCURRENCY,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        backoff_seconds: float = JOB_RETRY_BACKOFF_SECONDS,
+    ):
+        self.queue = queue
+        self._concurrency = concurrency
+        self._max_attempts = max_attempts
+        self._backoff_seconds = backoff_seconds
+        self._handlers: dict[str, Handler] = {}
+        self._failure_handlers: dict[str, FailureHandler] = {}
+        self._limits: dict[str, asyncio.Semaphore] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._busy: set[asyncio.Task] = set()
+        self._stopping = False
+
+    def register(
+        self,
+        job_type: str,
+        handler: Handler,
+        concurrency: Optional[int] = None,
+        on_failure: Optional[FailureHandler] = None,
+    ):
+        self._handlers[job_type] = handler
+        if on_failure:
+            self._failure_handlers[job_type] = on_failure
+        if concurrency:
+            self._limits[job_type] = asyncio.Semaphore(concurrency)
+
+    async def submit(
+        self, job_type: str, user_id: str, payload: dict, node: Optional[str] = None
+    ) -> str:
+        if job_type not in self._handlers:
+            raise ValueError(f"No handler registered for job type: {job_type}")
+        job_id = await self.queue.enqueue(new_job(job_type, user_id, payload, node))
+        logger.info(f"Job queued: {job_id} ({job_type}) for user: {user_id}")
+        return job_id
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(n)) for n in range(self._concurrency)
+        ]
+        logger.info(f"Job worker pool started with {self._concurrency} workers")
+
+    async def stop(self, drain_seconds: float = JOB_DRAIN_SECONDS):
+        """Stop claiming jobs and give running ones ``drain_seconds`` to finish.
+
+        Jobs still running after that are cancelled and released back to the
+        queue; their checkpointed progress lets the next worker resume them.
+        """
+        self._stopping = True
+        busy = [task for task in self._tasks if task in self._busy]
+        for task in self._tasks:
+            if task not in self._busy:
+                task.cancel()
+        if busy:
+            logger.info(f"Draining {len(busy)} running jobs for up to {drain_seconds:g}s")
+            _, pending = await asyncio.wait(busy, timeout=drain_seconds)
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning(f"Requeued {len(pending)} jobs still running at shutdown")
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._busy.clear()
+        self._stopping = False
+        logger.info("Job worker pool stopped")
+
+    async def _worker(self, worker_id: int):
+        task = asyncio.current_task()
+        while not self._stopping:
+            try:
+                job = await self.queue.claim()
+                if job:
+                    self._busy.add(task)
+                    try:
+                        await self._run(job)
+                    finally:
+                        self._busy.discard(task)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} error: {str(e)}")
+                await asyncio.sleep(self._backoff_seconds)
+
+    async def _run(self, job: dict):
+        job_id = job["_id"]
+        # Each worker loop runs in its own task, so these stay scoped to it
+        request_id_var.set(f"job:{job_id}")
+        user_id_var.set(job["user_id"])
+        handler = self._handlers.get(job["type"])
+        if not handler:
+            await self.queue.update(
+                job_id, {"status": FAILED, "error": f"Unknown job type: {job['type']}"}, job["worker"]
+            )
+            return
+        # Reclaimed after its worker died on every attempt; running it again would too
+        if job["attempts"] > self._max_attempts:
+            await self._fail(job, f"Worker lost during all {self._max_attempts} attempts")
+            return
+        if job.get("node") not in (None, NODE_NAME):
+            await self._fail(job, f"Node {job['node']} did not come back to run the job")
+            return
+
+        async def progress(stage: str, result: Optional[dict] = None):
+            fields = {"stage": stage}
+            for key, value in (result or {}).items():
+                fields[f"result.{key}"] = value
+                job.setdefault("result", {})[key] = value
+            if not await self.queue.update(job_id, fields, job["worker"]):
+                raise LeaseLost(job_id)
+
+        # The handler runs beside the heartbeat, which ends once the lease is lost
+        work = asyncio.create_task(self._handle(job, handler, progress))
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            await asyncio.wait({work, heartbeat}, return_when=asyncio.FIRST_COMPLETED)
+            if not work.done():
+                raise LeaseLost(job_id)
+            result = work.result()
+            fields = {"status": COMPLETED, "stage": COMPLETED, "error": None}
+            for key, value in (result or {}).items():
+                fields[f"result.{key}"] = value
+            if not await self.queue.update(job_id, fields, job["worker"]):
+                raise LeaseLost(job_id)
+            logger.info(f"Job completed: {job_id} ({job['type']})")
+        except LeaseLost:
+            logger.warning(f"Job {job_id} was claimed by another worker, dropping this attempt")
+        except asyncio.CancelledError:
+            await self.queue.release(job_id, job["worker"])
+            raise
+        except Exception as e:
+            error = e.detail if isinstance(e, HTTPException) else str(e)
+            retryable = not (isinstance(e, HTTPException) and e.status_code < 500)
+            if retryable and job["attempts"] < self._max_attempts:
+                delay = self._backoff_seconds * 2 ** (job["attempts"] - 1)
+                delay *= 1 + random.random() * 0.25
+                if await self.queue.retry(job_id, delay, error, job["worker"]):
+                    logger.warning(
+                        f"Job {job_id} attempt {job['attempts']} failed, retrying in {delay:.1f}s: {error}"
+                    )
+                else:
+                    logger.warning(f"Job {job_id} was claimed by another worker, dropping this attempt")
+            else:
+                await self._fail(job, error)
+        finally:
+            heartbeat.cancel()
+            if not work.done():
+                work.cancel()
+                await asyncio.wait({work})
+
+    async def _handle(self, job: dict, handler: Handler, progress: Progress) -> Optional[dict]:
+        limit = self._limits.get(job["type"])
+        with span(f"job.{job['type']}", job_id=job["_id"], attempt=job["attempts"]):
+            JOBS_RUNNING.labels(job["type"]).inc()
+            try:
+                if limit:
+                    async with limit:
+                        return await handler(job, progress)
+                return await handler(job, progress)
+            finally:
+                JOBS_RUNNING.labels(job["type"]).dec()
+
+    async def _fail(self, job: dict, error: str):
+        job_id = job["_id"]
+        if not await self.queue.update(job_id, {"status": FAILED, "error": error}, job["worker"]):
+            logger.warning(f"Job {job_id} was claimed by another worker, not failing it")
+            return
+        logger.error(f"Job failed: {job_id} ({job['type']}): {error}")
+        on_failure = self._failure_handlers.get(job["type"])
+        if on_failure:
+            try:
+                await on_failure(job, error)
+            except Exception as hook_error:
+                logger.error(f"Job {job_id} failure hook error: {str(hook_error)}")
+
+    async def _heartbeat(self, job: dict):
+        """Renew the job's lease; returns once another worker holds it."""
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+            try:
+                if not await self.queue.heartbeat(job["_id"], job["worker"]):
+                    return
+            except Exception as e:
+                logger.warning(f"Job {job['_id']} heartbeat failed: {str(e)}")
+
+
+worker_pool = JobWorkerPool(create_job_queue())
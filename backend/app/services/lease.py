@@ -0,0 +1,39 @@
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.errors import DuplicateKeyError
+
+# Unique per process, so workers on one host do not share leases
+OWNER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class Lease:
+    """A named lock in MongoDB held by at most one process until it expires.
+
+    Used to elect a single worker for one-off work such as index setup; an
+    expired lease (its holder crashed) can be taken over by anyone.
+    """
+
+    def __init__(self, collection: AsyncCollection, name: str, ttl_seconds: float):
+        self._collection = collection
+        self._name = name
+        self._ttl = ttl_seconds
+
+    async def acquire(self) -> bool:
+        now = datetime.now(timezone.utc)
+        try:
+            await self._collection.update_one(
+                {"_id": self._name, "$or": [{"expires_at": {"$lt": now}}, {"owner": OWNER}]},
+                {"$set": {"owner": OWNER, "expires_at": now + timedelta(seconds=self._ttl)}},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            # Held by someone else: the filter missed and the upsert hit the existing _id
+            return False
+
+    async def release(self):
+        await self._collection.delete_one({"_id": self._name, "owner": OWNER})
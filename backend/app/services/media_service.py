@@ -0,0 +1,105 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException
+from app.services.media_worker import MediaError, preprocess, probe
+from app.services.segmentation_service import FFMPEG, FFPROBE, ffmpeg_available
+from app.utils.logger import logger
+from app.utils.telemetry import MEDIA_BYTES, span
+
+MEDIA_PREPROCESSING = os.getenv("MEDIA_PREPROCESSING", "false").lower() == "true"
+MEDIA_WORKERS = int(os.getenv("MEDIA_WORKERS", "2"))
+MEDIA_MAX_HEIGHT = int(os.getenv("MEDIA_MAX_HEIGHT", "480"))
+MEDIA_FPS = int(os.getenv("MEDIA_FPS", "10"))
+MEDIA_CRF = int(os.getenv("MEDIA_CRF", "30"))
+MEDIA_PRESET = os.getenv("MEDIA_PRESET", "veryfast")
+MEDIA_AUDIO_BITRATE = os.getenv("MEDIA_AUDIO_BITRATE", "48k")
+MEDIA_TIMEOUT_SECONDS = float(os.getenv("MEDIA_TIMEOUT_SECONDS", "600"))
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _settings() -> dict:
+    return {
+        "max_height": MEDIA_MAX_HEIGHT,
+        "fps": MEDIA_FPS,
+        "crf": MEDIA_CRF,
+        "preset": MEDIA_PRESET,
+        "audio_bitrate": MEDIA_AUDIO_BITRATE,
+        "timeout": MEDIA_TIMEOUT_SECONDS,
+    }
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # Spawned, not forked: the parent runs threads (log writer, S3 uploads)
+        _executor = ProcessPoolExecutor(
+            max_workers=MEDIA_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def preprocessing_enabled() -> bool:
+    return MEDIA_PREPROCESSING and ffmpeg_available()
+
+
+async def preprocess_video(source: str) -> dict:
+    """Shrink a local recording for analysis in the media process pool.
+
+    Returns ``video_path``, ``audio_path`` (None without an audio track),
+    ``mime_type`` and a ``report`` with sizes and timings. Corrupt or
+    non-video files are rejected with a 400 so the job is not retried; a
+    playable file that fails to re-encode is passed through unchanged.
+    """
+    with span("media.preprocess"):
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                _pool(), preprocess, FFMPEG, FFPROBE, source, _settings()
+            )
+        except MediaError as e:
+            logger.warning(f"Rejected upload {os.path.basename(source)}: {str(e)}")
+            raise HTTPException(status_code=400, detail=f"Invalid video: {str(e)}")
+    report = result["report"]
+    if report["transcode_error"]:
+        logger.warning(
+            f"Re-encoding {os.path.basename(source)} failed, uploading the original: {report['transcode_error']}"
+        )
+    logger.info(
+        f"Preprocessed {os.path.basename(source)}: {report['original_bytes']} -> "
+        f"{report['processed_bytes']} bytes ({report['size_reduction']:.0%} smaller) "
+        f"in {report['preprocess_seconds']:.1f}s, {report['source_mime_type']}"
+    )
+    return result
+
+
+async def prepare_upload(source: str) -> dict:
+    """Get a spooled recording ready for upload, in the same shape as ``preprocess_video``.
+
+    Without preprocessing the file is only probed (when ffprobe is installed)
+    to detect its MIME type and reject corrupt files before they are uploaded.
+    """
+    if preprocessing_enabled():
+        result = await preprocess_video(source)
+        MEDIA_BYTES.labels("original").inc(result["report"]["original_bytes"])
+        MEDIA_BYTES.labels("processed").inc(result["report"]["processed_bytes"])
+        return result
+    mime_type = "video/mp4"
+    if FFPROBE:
+        try:
+            info = await asyncio.to_thread(probe, FFPROBE, source, MEDIA_TIMEOUT_SECONDS)
+        except MediaError as e:
+            logger.warning(f"Rejected upload {os.path.basename(source)}: {str(e)}")
+            raise HTTPException(status_code=400, detail=f"Invalid video: {str(e)}")
+        mime_type = info["mime_type"]
+    return {"video_path": source, "audio_path": None, "mime_type": mime_type, "report": None}
+
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,181 @@
+"""ffprobe/ffmpeg steps run in the media process pool.
+
+Imports nothing from the app, so spawned workers start quickly and do not
+set up logging, clients or metrics of their own.
+"""
+import json
+import os
+import subprocess
+import time
+from typing import Optional
+
+# ffprobe format names (first match wins) and MP4 brands mapped to MIME types
+_FORMAT_MIME = (
+    ("webm", "video/webm"),
+    ("matroska", "video/x-matroska"),
+    ("mov", "video/mp4"),
+    ("avi", "video/x-msvideo"),
+    ("mpegts", "video/mp2t"),
+)
+_QUICKTIME_BRANDS = {"qt"}
+
+
+class MediaError(Exception):
+    """The file is corrupt, not a video, or could not be processed."""
+
+
+def _run(args: list[str], timeout: float) -> subprocess.CompletedProcess:
+    try:
+        return subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise MediaError(f"{os.path.basename(args[0])} timed out after {timeout:.0f}s")
+
+
+def probe(ffprobe: str, source: str, timeout: float) -> dict:
+    result = _run(
+        [ffprobe, "-v", "error", "-print_format", "json", "-show_format", "-show_streams", source],
+        timeout,
+    )
+    if result.returncode != 0:
+        raise MediaError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "ffprobe failed")
+    info = json.loads(result.stdout or "{}")
+    video = next((s for s in info.get("streams", []) if s.get("codec_type") == "video"), None)
+    audio = next((s for s in info.get("streams", []) if s.get("codec_type") == "audio"), None)
+    if not video:
+        raise MediaError("No playable video stream")
+    return {
+        "mime_type": detect_mime(info.get("format", {})),
+        "duration": _duration(info.get("format", {}), video),
+        "width": video.get("width"),
+        "height": video.get("height"),
+        "video_codec": video.get("codec_name"),
+        "has_audio": audio is not None,
+    }
+
+
+def _duration(container: dict, video: dict) -> Optional[float]:
+    # MediaRecorder WebM has no container duration; None means unknown, not broken
+    for value in (container.get("duration"), video.get("duration")):
+        try:
+            if float(value) > 0:
+                return float(value)
+        except (TypeError, ValueError):
+            pass
+    return None
+
+
+def detect_mime(container: dict) -> str:
+    names = container.get("format_name", "").split(",")
+    brand = container.get("tags", {}).get("major_brand", "").strip()
+    if "mov" in names and brand in _QUICKTIME_BRANDS:
+        return "video/quicktime"
+    for name, mime_type in _FORMAT_MIME:
+        if name in names:
+            return mime_type
+    # The model APIs need a video/* type; MP4 is the most widely accepted
+    return "video/mp4"
+
+
+# Enough of a file's start to recognize its container, EBML DocType included
+SNIFF_BYTES = 512
+_QUICKTIME_ATOMS = {b"moov", b"mdat", b"free", b"wide"}
+
+
+def sniff_mime(head: bytes) -> Optional[str]:
+    """MIME type of a video from its first bytes, or None for other data.
+
+    For uploads that never touch local disk; it matches ``detect_mime``
+    without running ffprobe, but cannot tell a corrupt file from a good one.
+    """
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        # WebM is Matroska with a "webm" DocType in the EBML header
+        return "video/webm" if b"webm" in head[:64] else "video/x-matroska"
+    if head[4:8] == b"ftyp":
+        brand = head[8:12].decode("latin-1").strip()
+        return "video/quicktime" if brand in _QUICKTIME_BRANDS else "video/mp4"
+    if head[4:8] in _QUICKTIME_ATOMS:
+        return "video/quicktime"
+    if head[:4] == b"RIFF" and head[8:12] == b"AVI ":
+        return "video/x-msvideo"
+    if len(head) > 188 and head[0] == head[188] == 0x47:
+        return "video/mp2t"
+    return None
+
+
+def transcode(
+    ffmpeg: str,
+    source: str,
+    video_path: str,
+    audio_path: Optional[str],
+    settings: dict,
+    timeout: float,
+):
+    """Re-encode to a small H.264/AAC MP4 and, in the same decode pass, a mono audio track."""
+    args = [
+        ffmpeg, "-y", "-v", "error", "-i", source,
+        "-map", "0:v:0", "-map", "0:a:0?",
+        "-vf", f"scale=-2:'min({settings['max_height']},ih)':flags=fast_bilinear,fps={settings['fps']}",
+        "-c:v", "libx264", "-preset", settings["preset"], "-crf", str(settings["crf"]),
+        "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-b:a", settings["audio_bitrate"], "-ac", "1",
+        "-movflags", "+faststart", video_path,
+    ]
+    if audio_path:
+        args += [
+            "-map", "0:a:0", "-vn", "-c:a", "aac", "-b:a", settings["audio_bitrate"],
+            "-ac", "1", "-ar", "16000", audio_path,
+        ]
+    result = _run(args, timeout)
+    if result.returncode != 0:
+        raise MediaError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "ffmpeg failed")
+
+
+def _remove(*paths: Optional[str]):
+    for path in paths:
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+def preprocess(ffmpeg: str, ffprobe: str, source: str, settings: dict) -> dict:
+    """Probe, shrink and split ``source``; returns paths and a size/latency report.
+
+    The re-encoded video is only used when it is smaller than the original.
+    Raises MediaError for files ffprobe cannot read as video; when only the
+    re-encode fails, the original is returned without an audio track.
+    """
+    start = time.perf_counter()
+    timeout = settings["timeout"]
+    info = probe(ffprobe, source, timeout)
+    base, _ = os.path.splitext(source)
+    video_path = f"{base}.small.mp4"
+    audio_path = f"{base}.audio.m4a" if info["has_audio"] else None
+    transcode_error = None
+    try:
+        transcode(ffmpeg, source, video_path, audio_path, settings, timeout)
+    except (MediaError, OSError) as e:
+        # The probe found a playable video, so it is uploaded as recorded
+        _remove(video_path, audio_path)
+        video_path, audio_path, transcode_error = source, None, str(e)
+
+    original_bytes = os.path.getsize(source)
+    processed_bytes = os.path.getsize(video_path)
+    if video_path != source and processed_bytes >= original_bytes:
+        os.remove(video_path)
+        video_path, processed_bytes = source, original_bytes
+    mime_type = "video/mp4" if video_path != source else info["mime_type"]
+    return {
+        "video_path": video_path,
+        "audio_path": audio_path,
+        "mime_type": mime_type,
+        "report": {
+            **info,
+            "source_mime_type": info["mime_type"],
+            "mime_type": mime_type,
+            "original_bytes": original_bytes,
+            "processed_bytes": processed_bytes,
+            "audio_bytes": os.path.getsize(audio_path) if audio_path else 0,
+            "size_reduction": round(1 - processed_bytes / original_bytes, 3) if original_bytes else 0,
+            "transcode_error": transcode_error,
+            "preprocess_seconds": round(time.perf_counter() - start, 3),
+        },
+    }
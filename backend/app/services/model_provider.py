@@ -0,0 +1,350 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+
+import vertexai
+from google import genai
+from google.genai import types
+from google.oauth2 import service_account
+from vertexai.generative_models import GenerationConfig, GenerativeModel, Part
+from app.services.rate_limiter import (
+    BATCH,
+    INTERACTIVE,
+    ModelLimiter,
+    current_caller,
+    current_priority,
+    model_limiter,
+)
+from app.services.registry import services
+from app.services.response_parser import response_schema
+from app.utils.telemetry import span
+
+# "gemini" and "vertex" call Google; "fake" generates schema-shaped JSON locally
+MODEL_PROVIDER = os.getenv("MODEL_PROVIDER")
+QUESTION_MODEL_PROVIDER = os.getenv("QUESTION_MODEL_PROVIDER", MODEL_PROVIDER or "gemini")
+ANALYSIS_MODEL_PROVIDER = os.getenv("ANALYSIS_MODEL_PROVIDER", MODEL_PROVIDER or "vertex")
+
+FAKE_MODEL_SEED = int(os.getenv("FAKE_MODEL_SEED", "0"))
+FAKE_MODEL_LATENCY_MS = float(os.getenv("FAKE_MODEL_LATENCY_MS", "200"))
+FAKE_MODEL_LATENCY_SIGMA = float(os.getenv("FAKE_MODEL_LATENCY_SIGMA", "0.5"))
+FAKE_MODEL_ERROR_RATE = float(os.getenv("FAKE_MODEL_ERROR_RATE", "0"))
+FAKE_MODEL_THROTTLE_RATE = float(os.getenv("FAKE_MODEL_THROTTLE_RATE", "0"))
+FAKE_MODEL_MALFORMED_RATE = float(os.getenv("FAKE_MODEL_MALFORMED_RATE", "0"))
+FAKE_MODEL_LIST_SIZE = int(os.getenv("FAKE_MODEL_LIST_SIZE", "10"))
+
+current_path = os.path.dirname(os.path.abspath(__file__))
+credentials_path = os.path.join(
+    current_path, "credentials", "ai-interview-poc-2b5cf8540f16.json"
+)
+
+
+@dataclass
+class Usage:
+    prompt_token_count: int = 0
+    candidates_token_count: int = 0
+
+
+@dataclass
+class ModelResponse:
+    text: str
+    usage: Optional[object] = None
+
+
+@dataclass
+class VideoInput:
+    uri: str
+    mime_type: str = "video/mp4"
+    start: Optional[float] = None
+    end: Optional[float] = None
+
+
+class ModelProvider(ABC):
+    """Generates JSON text matching ``schema`` (a pydantic type) for a prompt.
+
+    ``stream`` yields partial responses; the last one carrying ``usage`` wins.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def generate(
+        self, model: str, prompt: str, schema, video: Optional[VideoInput] = None
+    ) -> ModelResponse: ...
+
+    @abstractmethod
+    def stream(
+        self, model: str, prompt: str, schema, video: Optional[VideoInput] = None
+    ) -> AsyncIterator[ModelResponse]: ...
+
+
+class GeminiProvider(ModelProvider):
+    """Gemini API via google-genai; text prompts only."""
+
+    name = "gemini"
+
+    def __init__(self):
+        services.register("gemini", lambda: genai.Client(api_key=os.getenv("GEMINI_API_KEY")))
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _config(schema) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            response_mime_type="application/json", response_schema=response_schema(schema)
+        )
+
+    def _check_input(self, video: Optional[VideoInput]):
+        if video is not None:
+            raise ValueError("The gemini provider does not accept video input")
+
+    async def generate(self, model, prompt, schema, video=None) -> ModelResponse:
+        self._check_input(video)
+        client = await services.aget("gemini")
+        response = await client.aio.models.generate_content(
+            model=model, contents=prompt, config=self._config(schema)
+        )
+        return ModelResponse(response.text or "", response.usage_metadata)
+
+    async def stream(self, model, prompt, schema, video=None):
+        self._check_input(video)
+        client = await services.aget("gemini")
+        stream = await client.aio.models.generate_content_stream(
+            model=model, contents=prompt, config=self._config(schema)
+        )
+        async for chunk in stream:
+            yield ModelResponse(chunk.text or "", chunk.usage_metadata)
+
+
+class VertexProvider(ModelProvider):
+    """Vertex AI generative models; accepts a video (or a time range of one) by URI."""
+
+    name = "vertex"
+
+    def __init__(self):
+        services.register("vertex", self._init)
+        self._models: dict[str, GenerativeModel] = {}
+
+    @staticmethod
+    def _init() -> bool:
+        credentials = service_account.Credentials.from_service_account_file(credentials_path)
+        vertexai.init(
+            project=os.getenv("GOOGLE_CLOUD_PROJECT"),
+            credentials=credentials,
+            location="us-central1",
+        )
+        return True
+
+    async def _model(self, name: str) -> GenerativeModel:
+        await services.aget("vertex")
+        if name not in self._models:
+            self._models[name] = GenerativeModel(name)
+        return self._models[name]
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _config(schema) -> GenerationConfig:
+        return GenerationConfig(
+            response_mime_type="application/json", response_schema=response_schema(schema)
+        )
+
+    @staticmethod
+    def _contents(prompt: str, video: Optional[VideoInput]) -> list:
+        if video is None:
+            return [prompt]
+        part = {"file_data": {"file_uri": video.uri, "mime_type": video.mime_type}}
+        if video.start is not None:
+            part["video_metadata"] = {"start_offset": timedelta(seconds=video.start)}
+            if video.end is not None:
+                part["video_metadata"]["end_offset"] = timedelta(seconds=video.end)
+        return [prompt, Part.from_dict(part)]
+
+    @staticmethod
+    def _text(response) -> str:
+        # Chunks without candidates (e.g. the final usage-only chunk) raise on .text
+        try:
+            return response.text
+        except ValueError:
+            return ""
+
+    async def generate(self, model, prompt, schema, video=None) -> ModelResponse:
+        generative_model = await self._model(model)
+        response = await generative_model.generate_content_async(
+            self._contents(prompt, video), generation_config=self._config(schema)
+        )
+        return ModelResponse(self._text(response), response.usage_metadata)
+
+    async def stream(self, model, prompt, schema, video=None):
+        generative_model = await self._model(model)
+        response = await generative_model.generate_content_async(
+            self._contents(prompt, video), generation_config=self._config(schema), stream=True
+        )
+        async for chunk in response:
+            yield ModelResponse(self._text(chunk), chunk.usage_metadata)
+
+
+class FakeModelError(RuntimeError):
+    def __init__(self, message: str, code: int = 503):
+        super().__init__(message)
+        self.code = code
+
+
+class FakeProvider(ModelProvider):
+    """Local stand-in for load tests: no network, no cost, reproducible output.
+
+    Responses are generated from the response schema with a generator seeded
+    by the prompt, so the same prompt always gets the same answer. Latency is
+    log-normal around ``FAKE_MODEL_LATENCY_MS``; a ``FAKE_MODEL_ERROR_RATE``
+    share of calls fail, a ``FAKE_MODEL_THROTTLE_RATE`` share are rejected
+    with 429 and a ``FAKE_MODEL_MALFORMED_RATE`` share return truncated
+    JSON, exercising the re-ask path.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        seed: int = FAKE_MODEL_SEED,
+        latency_ms: float = FAKE_MODEL_LATENCY_MS,
+        latency_sigma: float = FAKE_MODEL_LATENCY_SIGMA,
+        error_rate: float = FAKE_MODEL_ERROR_RATE,
+        throttle_rate: float = FAKE_MODEL_THROTTLE_RATE,
+        malformed_rate: float = FAKE_MODEL_MALFORMED_RATE,
+    ):
+        self._seed = seed
+        self._latency_ms = latency_ms
+        self._latency_sigma = latency_sigma
+        self._error_rate = error_rate
+        self._throttle_rate = throttle_rate
+        self._malformed_rate = malformed_rate
+        # Shared across calls so a run sees a reproducible sequence of delays/faults
+        self._faults = random.Random(seed)
+
+    def _value(self, node: dict, rng: random.Random, name: str, top: bool = False):
+        if "enum" in node:
+            return rng.choice(node["enum"])
+        kind = node.get("type")
+        if kind == "object":
+            return {
+                key: self._value(child, rng, key)
+                for key, child in node.get("properties", {}).items()
+            }
+        if kind == "array":
+            size = FAKE_MODEL_LIST_SIZE if top else rng.randint(1, 3)
+            return [self._value(node["items"], rng, name) for _ in range(size)]
+        if kind == "integer":
+            return rng.randint(int(node.get("minimum", 0)), int(node.get("maximum", 100)))
+        if kind == "number":
+            return round(rng.uniform(node.get("minimum", 0), node.get("maximum", 100)), 2)
+        if kind == "boolean":
+            return rng.random() < 0.5
+        return f"{name or 'item'} {rng.randint(1, 10 ** 6)}"
+
+    def _respond(self, prompt: str, schema) -> tuple[str, Usage, float]:
+        digest = hashlib.sha256(f"{self._seed}:{prompt}".encode()).digest()
+        rng = random.Random(digest)
+        text = json.dumps(self._value(response_schema(schema), rng, "", top=True))
+        latency = self._latency_ms * self._faults.lognormvariate(0, self._latency_sigma) / 1000
+        roll = self._faults.random()
+        if roll < self._error_rate:
+            raise FakeModelError("Fake provider injected failure")
+        roll -= self._error_rate
+        if roll < self._throttle_rate:
+            raise FakeModelError("Fake provider RESOURCE_EXHAUSTED", code=429)
+        roll -= self._throttle_rate
+        if roll < self._malformed_rate:
+            text = text[: len(text) // 2]
+        usage = Usage(prompt_token_count=len(prompt) // 4, candidates_token_count=len(text) // 4)
+        return text, usage, latency
+
+    async def generate(self, model, prompt, schema, video=None) -> ModelResponse:
+        text, usage, latency = self._respond(prompt, schema)
+        await asyncio.sleep(latency)
+        return ModelResponse(text, usage)
+
+    async def stream(self, model, prompt, schema, video=None):
+        text, usage, latency = self._respond(prompt, schema)
+        await asyncio.sleep(latency)
+        for i in range(0, len(text), 64):
+            yield ModelResponse(text[i:i + 64])
+            await asyncio.sleep(0)
+        yield ModelResponse("", usage)
+
+
+class LimitedProvider(ModelProvider):
+    """Routes another provider's calls through the shared ``ModelLimiter``.
+
+    Calls are attributed to the user bound with ``model_caller``. A throttled
+    stream is only retried if it failed before yielding anything.
+    """
+
+    def __init__(self, provider: ModelProvider, limiter: ModelLimiter, priority: int):
+        self.name = provider.name
+        self._provider = provider
+        self._limiter = limiter
+        self._priority = priority
+
+    async def generate(self, model, prompt, schema, video=None) -> ModelResponse:
+        user_id = current_caller()
+        await self._limiter.check_budget(user_id)
+        attempt = 0
+        while True:
+            try:
+                async with self._limiter.slot(user_id, current_priority(self._priority)):
+                    with span("model.generate", provider=self.name, model=model):
+                        response = await self._provider.generate(model, prompt, schema, video)
+                break
+            except Exception as e:
+                await asyncio.sleep(self._limiter.backoff(e, attempt))
+                attempt += 1
+        await self._limiter.record(user_id, response.usage)
+        return response
+
+    async def stream(self, model, prompt, schema, video=None):
+        user_id = current_caller()
+        await self._limiter.check_budget(user_id)
+        attempt = 0
+        usage = None
+        while True:
+            started = False
+            try:
+                async with self._limiter.slot(user_id, current_priority(self._priority)):
+                    with span("model.stream", provider=self.name, model=model):
+                        async for chunk in self._provider.stream(model, prompt, schema, video):
+                            started = True
+                            usage = chunk.usage or usage
+                            yield chunk
+                break
+            except Exception as e:
+                if started:
+                    raise
+                await asyncio.sleep(self._limiter.backoff(e, attempt))
+                attempt += 1
+        await self._limiter.record(user_id, usage)
+
+
+PROVIDERS = {
+    "gemini": GeminiProvider,
+    "vertex": VertexProvider,
+    "fake": FakeProvider,
+}
+
+
+def create_provider(name: str) -> ModelProvider:
+    if name not in PROVIDERS:
+        raise RuntimeError(f"Unknown model provider: {name}")
+    return PROVIDERS[name]()
+
+
+# Interactive question generation is admitted ahead of queued video analysis
+question_provider = LimitedProvider(
+    create_provider(QUESTION_MODEL_PROVIDER), model_limiter, INTERACTIVE
+)
+analysis_provider = LimitedProvider(
+    create_provider(ANALYSIS_MODEL_PROVIDER), model_limiter, BATCH
+)
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import time
+from collections import defaultdict
+from typing import AsyncIterator
+from app.repositories.session_repository import SessionRepository
+
+PROGRESS_POLL_SECONDS = float(os.getenv("PROGRESS_POLL_SECONDS", "2"))
+PROGRESS_KEEPALIVE_SECONDS = float(os.getenv("PROGRESS_KEEPALIVE_SECONDS", "15"))
+
+
+class ProgressBroker:
+    """Wakes in-process listeners when a session's analysis progress changes.
+
+    Listeners also re-read the session on a timer, so updates written by
+    other workers are picked up without a shared broker. ``close`` ends
+    every stream when the worker shuts down; clients reconnect elsewhere.
+    """
+
+    def __init__(self):
+        self._waiters: dict[str, set[asyncio.Event]] = defaultdict(set)
+        self.closing = False
+
+    def close(self):
+        self.closing = True
+        for waiters in self._waiters.values():
+            for event in waiters:
+                event.set()
+
+    def publish(self, session_id: str):
+        for event in self._waiters.get(session_id, ()):
+            event.set()
+
+    async def wait(self, session_id: str, timeout: float):
+        event = asyncio.Event()
+        self._waiters[session_id].add(event)
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._waiters[session_id].discard(event)
+            if not self._waiters[session_id]:
+                del self._waiters[session_id]
+
+
+progress_broker = ProgressBroker()
+
+
+async def analysis_events(
+    sessions: SessionRepository, session_id: str, user_id: str
+) -> AsyncIterator[tuple[str, dict]]:
+    """Yield (event, data) pairs for a session's analysis, starting from stored state.
+
+    Per-question results already persisted on the session are replayed first,
+    so a reconnecting client catches up without re-triggering any work.
+    """
+    sent = set()
+    last_status = None
+    last_sent = time.monotonic()
+    while not progress_broker.closing:
+        session = await sessions.find_progress(session_id, user_id)
+        if not session:
+            yield "failed", {"detail": "Session not found"}
+            return
+
+        progress = session.get("analysis_progress") or {}
+        for index, result in sorted(
+            (progress.get("questions") or {}).items(), key=lambda item: int(item[0])
+        ):
+            if index not in sent:
+                sent.add(index)
+                last_sent = time.monotonic()
+                yield "question", {"index": int(index), "result": result}
+
+        status = (progress.get("status"), progress.get("stage"))
+        if status != last_status:
+            last_status = status
+            last_sent = time.monotonic()
+            yield "status", {
+                "status": progress.get("status"),
+                "stage": progress.get("stage"),
+                "job_id": progress.get("job_id"),
+            }
+
+        if session.get("analytics"):
+            yield "complete", {
+                "video_url": session.get("video_url"),
+                "analytics": session["analytics"],
+            }
+            return
+        if progress.get("status") == "failed":
+            yield "failed", {"detail": progress.get("error") or "Analysis failed"}
+            return
+
+        if time.monotonic() - last_sent >= PROGRESS_KEEPALIVE_SECONDS:
+            last_sent = time.monotonic()
+            yield "ping", {}
+        await progress_broker.wait(session_id, PROGRESS_POLL_SECONDS)
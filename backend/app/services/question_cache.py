@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from cachetools import TTLCache
+from app.database import get_database
+from app.utils.logger import logger
+
+QUESTION_CACHE_MAXSIZE = int(os.getenv("QUESTION_CACHE_MAXSIZE", "1024"))
+QUESTION_CACHE_MEMORY_TTL_SECONDS = int(os.getenv("QUESTION_CACHE_MEMORY_TTL_SECONDS", "600"))
+QUESTION_CACHE_TTL_SECONDS = int(os.getenv("QUESTION_CACHE_TTL_SECONDS", "86400"))
+QUESTION_CACHE_VARIANTS = int(os.getenv("QUESTION_CACHE_VARIANTS", "1"))
+
+Generator = Callable[[str, str, int], Awaitable[list]]
+
+
+def make_cache_key(job_description: str, difficulty: str, num_questions: int) -> str:
+    normalized = " ".join(job_description.lower().split())
+    raw = f"{normalized}\x1f{difficulty.lower()}\x1f{num_questions}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class QuestionCache:
+    """Two-tier cache of generated question sets keyed by a hash of the request.
+
+    Each key holds a pool of up to ``variants`` question sets; once the pool is
+    full, requests are served by sampling from it instead of calling the model.
+    """
+
+    def __init__(
+        self,
+        collection_name: Optional[str] = "question_cache",
+        maxsize: int = QUESTION_CACHE_MAXSIZE,
+        memory_ttl: int = QUESTION_CACHE_MEMORY_TTL_SECONDS,
+        ttl: int = QUESTION_CACHE_TTL_SECONDS,
+        variants: int = QUESTION_CACHE_VARIANTS,
+    ):
+        self._memory: TTLCache = TTLCache(maxsize=maxsize, ttl=memory_ttl)
+        self._collection_name = collection_name
+        self._ttl = ttl
+        self._variants = max(1, variants)
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._counters = {
+            "memory_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "errors": 0,
+        }
+        self._latency = {"hit": [0.0, 0], "miss": [0.0, 0]}
+
+    @property
+    def _collection(self):
+        if self._collection_name is None:
+            return None
+        return get_database()[self._collection_name]
+
+    async def get_or_generate(
+        self, job_description: str, difficulty: str, num_questions: int, generate: Generator
+    ) -> list:
+        start = time.perf_counter()
+        key = make_cache_key(job_description, difficulty, num_questions)
+
+        pool = self._memory.get(key)
+        tier = "memory_hits"
+        if pool is None and self._collection_name is not None:
+            pool = await self._load(key)
+            tier = "shared_hits"
+            if pool:
+                self._memory[key] = pool
+
+        if pool and len(pool) >= self._variants:
+            self._counters[tier] += 1
+            self._record("hit", start)
+            return list(random.choice(pool))
+
+        task = self._inflight.get(key)
+        if task:
+            self._counters["coalesced"] += 1
+        else:
+            self._counters["misses"] += 1
+            task = asyncio.create_task(
+                self._fill(key, job_description, difficulty, num_questions, generate)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        questions = await asyncio.shield(task)
+        self._record("miss", start)
+        return list(questions)
+
+    async def _fill(
+        self, key: str, job_description: str, difficulty: str, num_questions: int, generate: Generator
+    ) -> list:
+        try:
+            questions = await generate(job_description, difficulty, num_questions)
+        except Exception:
+            self._counters["errors"] += 1
+            raise
+        pool = list(self._memory.get(key) or [])
+        pool.append(questions)
+        self._memory[key] = pool[-self._variants:]
+        if self._collection_name is not None:
+            try:
+                await self._store(key, questions)
+            except Exception as e:
+                logger.warning(f"Question cache write failed: {str(e)}")
+        return questions
+
+    async def _load(self, key: str) -> Optional[list]:
+        try:
+            doc = await self._collection.find_one(
+                {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+                {"variants": 1},
+            )
+        except Exception as e:
+            logger.warning(f"Question cache read failed: {str(e)}")
+            return None
+        return doc["variants"] if doc else None
+
+    async def _store(self, key: str, questions: list):
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self._ttl)
+        await self._collection.update_one(
+            {"_id": key},
+            {
+                "$push": {"variants": {"$each": [questions], "$slice": -self._variants}},
+                "$set": {"expires_at": expires_at},
+            },
+            upsert=True,
+        )
+
+    def _record(self, outcome: str, start: float):
+        bucket = self._latency[outcome]
+        bucket[0] += time.perf_counter() - start
+        bucket[1] += 1
+
+    def stats(self) -> dict:
+        hits = self._counters["memory_hits"] + self._counters["shared_hits"]
+        lookups = hits + self._counters["misses"] + self._counters["coalesced"]
+        return {
+            **self._counters,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "avg_hit_latency_ms": self._avg_ms("hit"),
+            "avg_miss_latency_ms": self._avg_ms("miss"),
+            "memory_entries": len(self._memory),
+        }
+
+    def _avg_ms(self, outcome: str) -> float:
+        total, count = self._latency[outcome]
+        return round(total / count * 1000, 3) if count else 0.0
+
+
+question_cache = QuestionCache()
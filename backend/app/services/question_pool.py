@@ -0,0 +1,158 @@
+import hashlib
+import os
+import random
+import re
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Iterable, Optional
+
+from cachetools import TTLCache
+from pymongo import ReturnDocument
+from app.database import get_database
+from app.utils.logger import logger
+
+QUESTION_POOL_MAX_SIZE = int(os.getenv("QUESTION_POOL_MAX_SIZE", "500"))
+QUESTION_POOL_SIMILARITY = float(os.getenv("QUESTION_POOL_SIMILARITY", "0.8"))
+QUESTION_POOL_MEMORY_TTL_SECONDS = int(os.getenv("QUESTION_POOL_MEMORY_TTL_SECONDS", "300"))
+
+Generator = Callable[[str, str, int], Awaitable[list]]
+
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+
+
+def normalize_question(text: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def make_pool_key(job_description: str, difficulty: str) -> str:
+    normalized = " ".join(job_description.lower().split())
+    raw = f"{normalized}\x1f{difficulty.lower()}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def dedupe_questions(
+    questions: Iterable[str],
+    existing: Iterable[str] = (),
+    similarity: float = QUESTION_POOL_SIMILARITY,
+) -> list[str]:
+    """Return the questions not already covered, dropping exact and near duplicates.
+
+    Near duplicates are questions whose word sets overlap by at least
+    ``similarity`` (Jaccard), which catches rewordings like a swapped article
+    or added "please" without needing an embedding call.
+    """
+    seen = [set(normalize_question(q).split()) for q in existing]
+    exact = {" ".join(sorted(words)) for words in seen}
+    kept = []
+    for question in questions:
+        words = set(normalize_question(question).split())
+        if not words or " ".join(sorted(words)) in exact:
+            continue
+        if any(len(words & other) / len(words | other) >= similarity for other in seen):
+            continue
+        seen.append(words)
+        exact.add(" ".join(sorted(words)))
+        kept.append(question.strip())
+    return kept
+
+
+class QuestionPools:
+    """Large per-role question pools that candidate sets are sampled from.
+
+    Pools are generated in bulk ahead of time (one model call per role), kept
+    in MongoDB and mirrored in memory, so serving a question set is a local
+    ``random.sample`` rather than a model call.
+    """
+
+    def __init__(
+        self,
+        collection_name: str = "question_pools",
+        memory_ttl: int = QUESTION_POOL_MEMORY_TTL_SECONDS,
+        max_size: int = QUESTION_POOL_MAX_SIZE,
+        similarity: float = QUESTION_POOL_SIMILARITY,
+    ):
+        self._collection_name = collection_name
+        # Missing pools are cached as [] so roles without a pool cost no lookup
+        self._memory: TTLCache = TTLCache(maxsize=4096, ttl=memory_ttl)
+        self._max_size = max_size
+        self._similarity = similarity
+
+    @property
+    def _collection(self):
+        return get_database()[self._collection_name]
+
+    async def get(self, job_description: str, difficulty: str) -> list[str]:
+        key = make_pool_key(job_description, difficulty)
+        pool = self._memory.get(key)
+        if pool is None:
+            try:
+                doc = await self._collection.find_one({"_id": key}, {"questions": 1})
+            except Exception as e:
+                logger.warning(f"Question pool read failed: {str(e)}")
+                return []
+            pool = doc["questions"] if doc else []
+            self._memory[key] = pool
+        return pool
+
+    async def sample(
+        self, job_description: str, difficulty: str, num_questions: int
+    ) -> Optional[list[str]]:
+        pool = await self.get(job_description, difficulty)
+        if len(pool) < num_questions:
+            return None
+        return random.sample(pool, num_questions)
+
+    async def add(self, job_description: str, difficulty: str, questions: list[str]) -> dict:
+        key = make_pool_key(job_description, difficulty)
+        doc = await self._collection.find_one({"_id": key}, {"questions": 1})
+        new = dedupe_questions(questions, doc["questions"] if doc else [], self._similarity)
+        # Appended in one update, so concurrent batches for a role keep each other's questions
+        doc = await self._collection.find_one_and_update(
+            {"_id": key},
+            {
+                "$push": {"questions": {"$each": new, "$slice": -self._max_size}},
+                "$set": {
+                    "job_description": job_description,
+                    "difficulty": difficulty,
+                    "updated_at": datetime.now(timezone.utc),
+                },
+            },
+            projection={"questions": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        pool = doc["questions"]
+        self._memory[key] = pool
+        logger.info(
+            f"Question pool for {job_description} ({difficulty}): "
+            f"{len(new)} of {len(questions)} new, {len(pool)} total"
+        )
+        return {"generated": len(questions), "added": len(new), "size": len(pool)}
+
+    async def build(
+        self, job_description: str, difficulty: str, pool_size: int, generate: Generator
+    ) -> dict:
+        questions = await generate(job_description, difficulty, pool_size)
+        return await self.add(job_description, difficulty, questions)
+
+    async def list(self) -> list[dict]:
+        cursor = self._collection.find(
+            {},
+            {
+                "job_description": 1,
+                "difficulty": 1,
+                "size": {"$size": "$questions"},
+                "updated_at": 1,
+            },
+        ).sort("updated_at", -1)
+        return [
+            {
+                "job_description": doc["job_description"],
+                "difficulty": doc["difficulty"],
+                "size": doc["size"],
+                "updated_at": doc["updated_at"].isoformat(),
+            }
+            async for doc in cursor
+        ]
+
+
+question_pools = QuestionPools()
@@ -0,0 +1,325 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException
+from app.database import get_database
+from app.utils.logger import logger
+from app.utils.model_usage import model_cost
+
+MODEL_QUOTA_BACKEND = os.getenv("MODEL_QUOTA_BACKEND", "memory")
+MODEL_MAX_CONCURRENCY = int(os.getenv("MODEL_MAX_CONCURRENCY", "8"))
+MODEL_USER_CONCURRENCY = int(os.getenv("MODEL_USER_CONCURRENCY", "2"))
+MODEL_RATE_PER_SECOND = float(os.getenv("MODEL_RATE_PER_SECOND", "5"))
+MODEL_BURST = int(os.getenv("MODEL_BURST", "10"))
+MODEL_THROTTLE_RETRIES = int(os.getenv("MODEL_THROTTLE_RETRIES", "4"))
+MODEL_THROTTLE_BACKOFF_SECONDS = float(os.getenv("MODEL_THROTTLE_BACKOFF_SECONDS", "1"))
+# 0 disables the cap
+MODEL_USER_DAILY_BUDGET_USD = float(os.getenv("MODEL_USER_DAILY_BUDGET_USD", "0"))
+MODEL_DAILY_BUDGET_USD = float(os.getenv("MODEL_DAILY_BUDGET_USD", "0"))
+
+# Lower runs first
+INTERACTIVE = 0
+BATCH = 1
+
+GLOBAL_KEY = "*"
+
+_caller: ContextVar[tuple[Optional[str], Optional[int]]] = ContextVar(
+    "model_caller", default=(None, None)
+)
+
+
+@contextmanager
+def model_caller(user_id: str, priority: Optional[int] = None):
+    """Attribute model calls made inside the block to ``user_id``.
+
+    ``priority`` overrides the provider's default, e.g. to run bulk work
+    through the interactive question provider at batch priority.
+    """
+    token = _caller.set((user_id, priority))
+    try:
+        yield
+    finally:
+        _caller.reset(token)
+
+
+def current_caller() -> Optional[str]:
+    return _caller.get()[0]
+
+
+def current_priority(default: int) -> int:
+    priority = _caller.get()[1]
+    return default if priority is None else priority
+
+
+def is_throttled(error: Exception) -> bool:
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    return code == 429 or "RESOURCE_EXHAUSTED" in str(error)
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class PrioritySemaphore:
+    """A semaphore that hands free slots to the lowest priority value first."""
+
+    def __init__(self, value: int):
+        self._value = value
+        self._waiters: list = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: int):
+        if self._value > 0 and not self._waiters:
+            self._value -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Handed a slot just as we were cancelled: pass it on
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    @property
+    def waiting(self) -> int:
+        return sum(not future.done() for _, _, future in self._waiters)
+
+    def release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._value += 1
+
+
+class TokenBucket:
+    """Request-rate limiter whose rate halves on throttling and creeps back on success."""
+
+    def __init__(self, rate: float, burst: int):
+        self.max_rate = rate
+        self.rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def take(self):
+        if self.max_rate <= 0:
+            return
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def throttled(self):
+        self.rate = max(self.max_rate / 16, self.rate / 2)
+        self._tokens = min(self._tokens, 0)
+
+    def succeeded(self):
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class QuotaStore(ABC):
+    @abstractmethod
+    async def get(self, key: str, day: str) -> dict: ...
+
+    @abstractmethod
+    async def add(self, key: str, day: str, usage: dict): ...
+
+
+class InMemoryQuotaStore(QuotaStore):
+    def __init__(self):
+        self._usage: dict[tuple[str, str], dict] = {}
+
+    async def get(self, key: str, day: str) -> dict:
+        return dict(self._usage.get((key, day), {}))
+
+    async def add(self, key: str, day: str, usage: dict):
+        # Keep only today's counters
+        for stale in [k for k in self._usage if k[1] != day]:
+            del self._usage[stale]
+        entry = self._usage.setdefault((key, day), {})
+        for field, value in usage.items():
+            entry[field] = entry.get(field, 0) + value
+
+
+class MongoQuotaStore(QuotaStore):
+    """Daily counters shared by every worker, expired by a TTL index on ``expires_at``."""
+
+    def __init__(self, collection_name: str = "model_quotas"):
+        self._collection_name = collection_name
+
+    @property
+    def _collection(self):
+        return get_database()[self._collection_name]
+
+    async def get(self, key: str, day: str) -> dict:
+        doc = await self._collection.find_one({"_id": f"{key}:{day}"}, {"usage": 1})
+        return (doc or {}).get("usage", {})
+
+    async def add(self, key: str, day: str, usage: dict):
+        await self._collection.update_one(
+            {"_id": f"{key}:{day}"},
+            {
+                "$inc": {f"usage.{field}": value for field, value in usage.items()},
+                "$setOnInsert": {
+                    "key": key,
+                    "day": day,
+                    "expires_at": datetime.now(timezone.utc) + timedelta(days=2),
+                },
+            },
+            upsert=True,
+        )
+
+
+def create_quota_store() -> QuotaStore:
+    if MODEL_QUOTA_BACKEND == "mongo":
+        return MongoQuotaStore()
+    return InMemoryQuotaStore()
+
+
+class ModelLimiter:
+    """Admission control for model calls.
+
+    A call needs a per-user slot, a global slot (handed out by priority, so
+    interactive requests overtake queued batch work) and a rate token. Calls
+    the provider throttles are retried with jittered exponential backoff while
+    the rate adapts; usage and cost are counted per user per day against the
+    configured budgets.
+    """
+
+    def __init__(
+        self,
+        store: QuotaStore,
+        concurrency: int = MODEL_MAX_CONCURRENCY,
+        user_concurrency: int = MODEL_USER_CONCURRENCY,
+        rate: float = MODEL_RATE_PER_SECOND,
+        burst: int = MODEL_BURST,
+        retries: int = MODEL_THROTTLE_RETRIES,
+        backoff_seconds: float = MODEL_THROTTLE_BACKOFF_SECONDS,
+        user_budget: float = MODEL_USER_DAILY_BUDGET_USD,
+        global_budget: float = MODEL_DAILY_BUDGET_USD,
+    ):
+        self._store = store
+        self._slots = PrioritySemaphore(concurrency)
+        self._user_concurrency = user_concurrency
+        self._user_slots: dict[str, list] = {}
+        self._bucket = TokenBucket(rate, burst)
+        self._retries = retries
+        self._backoff_seconds = backoff_seconds
+        self._user_budget = user_budget
+        self._global_budget = global_budget
+
+    @property
+    def waiting(self) -> int:
+        return self._slots.waiting
+
+    @asynccontextmanager
+    async def slot(self, user_id: Optional[str], priority: int):
+        entry = None
+        if user_id and self._user_concurrency > 0:
+            entry = self._user_slots.setdefault(
+                user_id, [asyncio.Semaphore(self._user_concurrency), 0]
+            )
+            entry[1] += 1
+        try:
+            if entry:
+                await entry[0].acquire()
+            try:
+                await self._slots.acquire(priority)
+                try:
+                    await self._bucket.take()
+                    yield
+                    self._bucket.succeeded()
+                finally:
+                    self._slots.release()
+            finally:
+                if entry:
+                    entry[0].release()
+        finally:
+            if entry:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._user_slots[user_id]
+
+    def backoff(self, error: Exception, attempt: int) -> float:
+        """Seconds to wait before retrying a throttled call; re-raises other errors."""
+        if not is_throttled(error):
+            raise error
+        self._bucket.throttled()
+        if attempt >= self._retries:
+            logger.error(f"Model provider still throttling after {attempt + 1} attempts")
+            raise HTTPException(
+                status_code=503,
+                detail="Model provider is busy, please retry shortly",
+                headers={"Retry-After": str(round(self._backoff_seconds * 2 ** attempt))},
+            )
+        delay = self._backoff_seconds * 2 ** attempt * random.uniform(0.5, 1.5)
+        logger.warning(
+            f"Model provider throttled, retrying in {delay:.1f}s "
+            f"(rate now {self._bucket.rate:.2f}/s)"
+        )
+        return delay
+
+    async def check_budget(self, user_id: Optional[str]):
+        day = _today()
+        if user_id and self._user_budget > 0:
+            usage = await self._store.get(user_id, day)
+            if usage.get("cost_usd", 0) >= self._user_budget:
+                raise HTTPException(status_code=429, detail="Daily model budget exceeded")
+        if self._global_budget > 0:
+            usage = await self._store.get(GLOBAL_KEY, day)
+            if usage.get("cost_usd", 0) >= self._global_budget:
+                raise HTTPException(status_code=429, detail="Daily model budget exceeded")
+
+    async def record(self, user_id: Optional[str], usage_metadata):
+        usage = {
+            "calls": 1,
+            "prompt_tokens": getattr(usage_metadata, "prompt_token_count", None) or 0,
+            "output_tokens": getattr(usage_metadata, "candidates_token_count", None) or 0,
+            "cost_usd": model_cost(usage_metadata),
+        }
+        day = _today()
+        try:
+            if user_id:
+                await self._store.add(user_id, day, usage)
+            await self._store.add(GLOBAL_KEY, day, usage)
+        except Exception as e:
+            logger.warning(f"Failed to record model usage: {str(e)}")
+
+    async def usage_today(self, user_id: str) -> dict:
+        usage = await self._store.get(user_id, _today())
+        return {
+            **usage,
+            "budget_usd": self._user_budget or None,
+        }
+
+    async def global_usage_today(self) -> dict:
+        usage = await self._store.get(GLOBAL_KEY, _today())
+        return {
+            **usage,
+            "budget_usd": self._global_budget or None,
+            "waiting": self.waiting,
+        }
+
+
+model_limiter = ModelLimiter(create_quota_store())
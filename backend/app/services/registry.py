@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+from app.utils.logger import logger
+
+
+class ServiceRegistry:
+    """Builds external clients on first use instead of at import time.
+
+    Each service registers a factory and, optionally, an async ``check`` that
+    proves the dependency is reachable. ``warm_up`` builds and checks every
+    service in parallel; a failure marks the service not ready rather than
+    stopping the process, and the next ``warm_up`` retries it.
+
+    Code on the event loop uses ``aget``, which builds a missing client in a
+    thread and shares that build between concurrent callers; ``get`` is for
+    worker threads and clients that are already built.
+    """
+
+    def __init__(self):
+        self._factories: dict[str, tuple[Callable[[], Any], bool]] = {}
+        self._checks: dict[str, Callable[[Any], Awaitable[None]]] = {}
+        self._instances: dict[str, Any] = {}
+        self._status: dict[str, dict] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._building: dict[str, asyncio.Future] = {}
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        check: Optional[Callable[[Any], Awaitable[None]]] = None,
+        blocking: bool = True,
+    ):
+        """``blocking`` factories are built in a thread during warm-up."""
+        self._factories[name] = (factory, blocking)
+        self._locks[name] = threading.Lock()
+        if check:
+            self._checks[name] = check
+        self._status[name] = {"ready": False, "error": None, "elapsed_ms": None}
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        # Per service, so a slow build never holds up lookups of the others
+        with self._locks[name]:
+            if name not in self._instances:
+                factory, _ = self._factories[name]
+                start = time.perf_counter()
+                self._instances[name] = factory()
+                logger.info(f"Initialized {name} client in {(time.perf_counter() - start) * 1000:.0f}ms")
+            return self._instances[name]
+
+    async def aget(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        _, blocking = self._factories[name]
+        if not blocking:
+            return self.get(name)
+        building = self._building.get(name)
+        if building is None:
+            building = asyncio.ensure_future(asyncio.to_thread(self.get, name))
+            self._building[name] = building
+            building.add_done_callback(lambda _: self._building.pop(name, None))
+        # Shielded so one cancelled caller does not abort the build for the rest
+        return await asyncio.shield(building)
+
+    def pop(self, name: str) -> Any:
+        with self._locks[name]:
+            self._status[name]["ready"] = False
+            return self._instances.pop(name, None)
+
+    async def _warm_up_one(self, name: str, timeout: float):
+        start = time.perf_counter()
+        try:
+            instance = await self.aget(name)
+            check = self._checks.get(name)
+            if check:
+                await asyncio.wait_for(check(instance), timeout)
+            self._status[name].update(ready=True, error=None)
+        except Exception as e:
+            logger.error(f"Service {name} is not ready: {str(e) or type(e).__name__}")
+            self._status[name].update(ready=False, error=str(e) or type(e).__name__)
+        self._status[name]["elapsed_ms"] = round((time.perf_counter() - start) * 1000)
+
+    async def warm_up(self, timeout: float = 10.0, only_unready: bool = False) -> dict:
+        names = [
+            name for name in self._factories
+            if not (only_unready and self._status[name]["ready"])
+        ]
+        await asyncio.gather(*(self._warm_up_one(name, timeout) for name in names))
+        return self.status()
+
+    @property
+    def ready(self) -> bool:
+        return all(status["ready"] for status in self._status.values())
+
+    def status(self) -> dict:
+        return {name: dict(status) for name, status in self._status.items()}
+
+
+services = ServiceRegistry()
@@ -0,0 +1,226 @@
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Any, Awaitable, Callable
+
+from pydantic import TypeAdapter, ValidationError
+from app.utils.logger import logger
+
+MODEL_REASK_ATTEMPTS = int(os.getenv("MODEL_REASK_ATTEMPTS", "1"))
+
+REASK_PROMPT = """Your previous response could not be used: {error}
+Return only the corrected JSON, with no code fences or commentary.
+
+Previous response:
+{text}
+"""
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+
+
+class ResponseParseError(ValueError):
+    pass
+
+
+def strip_fences(text: str) -> str:
+    match = _FENCE.search(text)
+    return match.group(1) if match else text
+
+
+def repair_json(text: str) -> str:
+    """Drop trailing commas before a closing bracket, leaving strings untouched."""
+    out = []
+    in_string = escape = False
+    # A comma outside strings is held until the next token shows it is not trailing
+    comma = False
+    for char in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == ",":
+            if comma:
+                out.append(",")
+            comma = True
+            continue
+        elif not char.isspace():
+            if comma and char not in "]}":
+                out.append(",")
+            comma = False
+            if char == '"':
+                in_string = True
+        out.append(char)
+    if comma:
+        out.append(",")
+    return "".join(out)
+
+
+def _json_span(text: str) -> str:
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        raise ResponseParseError("No JSON value found in response")
+    start = min(starts)
+    depth = 0
+    in_string = escape = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "[{":
+            depth += 1
+        elif char in "]}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    raise ResponseParseError("Response JSON is truncated")
+
+
+def extract_json(text: str) -> Any:
+    """Parse the first JSON value in a model response, tolerating fences and prose."""
+    try:
+        return json.loads(repair_json(_json_span(strip_fences(text))))
+    except json.JSONDecodeError as e:
+        raise ResponseParseError(f"Invalid JSON: {e.msg} at position {e.pos}")
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+# The subset of JSON Schema accepted as a Gemini/Vertex response schema
+_RESPONSE_SCHEMA_KEYS = {
+    "type", "properties", "required", "items", "enum",
+    "minimum", "maximum", "description", "nullable", "format",
+}
+
+
+def response_schema(schema) -> dict:
+    """Convert a pydantic type into a response schema for JSON-mode generation.
+
+    Model APIs reject ``$ref``, ``anyOf`` and titles, so references are inlined
+    and ``Optional[X]`` becomes ``X`` with ``nullable``.
+    """
+    raw = _adapter(schema).json_schema()
+    defs = raw.pop("$defs", {})
+
+    def convert(node: dict) -> dict:
+        if "$ref" in node:
+            return convert(defs[node["$ref"].split("/")[-1]])
+        if "anyOf" in node:
+            options = [o for o in node["anyOf"] if o.get("type") != "null"]
+            out = convert(options[0])
+            if len(options) < len(node["anyOf"]):
+                out["nullable"] = True
+            if "description" in node:
+                out["description"] = node["description"]
+            return out
+        out = {k: v for k, v in node.items() if k in _RESPONSE_SCHEMA_KEYS}
+        if "properties" in out:
+            out["properties"] = {k: convert(v) for k, v in out["properties"].items()}
+            # Ask the model for every field, even those with defaults on our side
+            out["required"] = list(out["properties"])
+        if "items" in out:
+            out["items"] = convert(out["items"])
+        return out
+
+    return convert(raw)
+
+
+def parse_model_json(text: str, schema) -> Any:
+    data = extract_json(text)
+    try:
+        return _adapter(schema).validate_python(data)
+    except ValidationError as e:
+        raise ResponseParseError(f"Schema validation failed: {e.errors()[:3]}")
+
+
+async def parse_with_reask(
+    text: str,
+    schema,
+    reask: Callable[[str], Awaitable[str]],
+    attempts: int = MODEL_REASK_ATTEMPTS,
+) -> Any:
+    """Parse and validate a response, asking the model to fix only its output on failure.
+
+    The re-ask is a text-only call carrying the broken response, which is far
+    cheaper than repeating the original generation (and its video input).
+    """
+    for attempt in range(attempts + 1):
+        try:
+            return parse_model_json(text, schema)
+        except ResponseParseError as e:
+            if attempt == attempts:
+                raise
+            logger.warning(f"Model response rejected ({str(e)}), re-asking for corrected JSON")
+            text = await reask(REASK_PROMPT.format(error=str(e), text=text))
+
+
+class JsonArrayStream:
+    """Incrementally parses the first top-level JSON array in a token stream.
+
+    ``feed`` returns the array elements completed by each chunk, so callers can
+    act on the first items before the model has finished generating.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._item_start = None
+        self.complete = False
+        self.errors = 0
+
+    def feed(self, chunk: str) -> list:
+        items = []
+        self._buffer += chunk
+        while self._pos < len(self._buffer) and not self.complete:
+            char = self._buffer[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif self._item_start is None:
+                # Skip fences and prose until the array opens
+                if char == "[":
+                    self._depth = 1
+                    self._item_start = self._pos + 1
+            elif char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+            elif char in "]}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(self._buffer[self._item_start:self._pos], items)
+                    self.complete = True
+            elif char == "," and self._depth == 1:
+                self._emit(self._buffer[self._item_start:self._pos], items)
+                self._item_start = self._pos + 1
+            self._pos += 1
+        return items
+
+    def _emit(self, raw: str, items: list):
+        raw = raw.strip()
+        if not raw:
+            return
+        try:
+            items.append(json.loads(repair_json(raw)))
+        except json.JSONDecodeError:
+            self.errors += 1
@@ -1,26 +1,325 @@
+import asyncio
+import base64
+import hashlib
 import boto3
 import os
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import HTTPException
+from app.services.media_worker import SNIFF_BYTES, sniff_mime
+from app.services.registry import services
 from app.utils.logger import logger
+from app.utils.telemetry import span
 from datetime import datetime
+from typing import AsyncIterator, Optional
 
-from dotenv import load_dotenv
-load_dotenv()
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")  # e.g. a local MinIO or moto server
+S3_PART_SIZE = int(os.getenv("S3_PART_SIZE_MB", "8")) * 1024 * 1024
+S3_UPLOAD_CONCURRENCY = int(os.getenv("S3_UPLOAD_CONCURRENCY", "4"))
+S3_PRESIGNED_URL_EXPIRES = int(os.getenv("S3_PRESIGNED_URL_EXPIRES", "3600"))
 
-s3_client = boto3.client(
-    's3',
-    aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
-    aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY")
-)
 BUCKET_NAME = os.getenv("S3_BUCKET_NAME")
 
-async def upload_video(file, user_id: str) -> str:
+_part_executor = ThreadPoolExecutor(
+    max_workers=S3_UPLOAD_CONCURRENCY, thread_name_prefix="s3-part"
+)
+
+
+def _create_client():
+    return boto3.client(
+        's3',
+        aws_access_key_id=os.getenv("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=os.getenv("AWS_SECRET_ACCESS_KEY"),
+        region_name=os.getenv("AWS_REGION"),
+        endpoint_url=S3_ENDPOINT_URL,
+    )
+
+
+async def _check(client):
+    await asyncio.to_thread(client.head_bucket, Bucket=BUCKET_NAME)
+
+
+services.register("s3", _create_client, check=_check)
+
+
+async def s3_client():
+    return await services.aget("s3")
+
+
+EXTENSIONS = {
+    "video/mp4": "mp4",
+    "video/webm": "webm",
+    "video/quicktime": "mov",
+    "video/x-matroska": "mkv",
+    "video/x-msvideo": "avi",
+    "video/mp2t": "ts",
+    "audio/mp4": "m4a",
+}
+
+
+def new_video_key(user_id: str, content_type: str = "video/mp4") -> str:
+    extension = EXTENSIONS.get(content_type, "bin")
+    return f"interviews/{user_id}_{datetime.now().isoformat()}.{extension}"
+
+
+def video_url_for(key: str) -> str:
+    if S3_ENDPOINT_URL:
+        return f"{S3_ENDPOINT_URL.rstrip('/')}/{BUCKET_NAME}/{key}"
+    return f"https://{BUCKET_NAME}.s3.amazonaws.com/{key}"
+
+
+def _sha256_b64(data: bytes) -> str:
+    return base64.b64encode(hashlib.sha256(data).digest()).decode()
+
+
+async def upload_video(file, user_id: str, content_type: str = "video/mp4") -> str:
     try:
-        file_name = f"interviews/{user_id}_{datetime.now().isoformat()}.mp4"
-        s3_client.upload_fileobj(file, BUCKET_NAME, file_name, ExtraArgs={'ACL': 'public-read'})
-        video_url = f"https://{BUCKET_NAME}.s3.amazonaws.com/{file_name}"
+        file_name = new_video_key(user_id, content_type)
+        client = await s3_client()
+        with span("s3.upload"):
+            await asyncio.to_thread(
+                client.upload_fileobj,
+                file,
+                BUCKET_NAME,
+                file_name,
+                ExtraArgs={'ACL': 'public-read', 'ContentType': content_type},
+            )
+        video_url = video_url_for(file_name)
         logger.info(f"Video uploaded to S3: {video_url}")
         return video_url
     except Exception as e:
         logger.error(f"S3 upload error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Failed to upload video")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to upload video")
+
+
+def _invalid_video() -> HTTPException:
+    return HTTPException(status_code=400, detail="Invalid video: not a supported video container")
+
+
+async def upload_video_stream(chunks: AsyncIterator[bytes], user_id: str) -> dict:
+    """Upload a byte stream as S3 multipart parts without buffering the whole file.
+
+    At most ``S3_UPLOAD_CONCURRENCY`` parts are in flight at once, so memory
+    stays bounded at roughly ``(S3_UPLOAD_CONCURRENCY + 1) * S3_PART_SIZE``.
+    Each part carries a SHA-256 checksum that S3 verifies on receipt.
+    Returns the ``video_url`` and the ``mime_type`` sniffed from the first
+    bytes; a stream that does not start like a video is rejected with a 400
+    before anything is uploaded.
+    """
+    stream = chunks.__aiter__()
+    head = bytearray()
+    async for chunk in stream:
+        head.extend(chunk)
+        if len(head) >= SNIFF_BYTES:
+            break
+    mime_type = sniff_mime(bytes(head[:SNIFF_BYTES]))
+    if not mime_type:
+        raise _invalid_video()
+
+    async def body() -> AsyncIterator[bytes]:
+        yield bytes(head)
+        async for chunk in stream:
+            yield chunk
+
+    key = new_video_key(user_id, mime_type)
+    loop = asyncio.get_running_loop()
+    client = await s3_client()
+    upload = await asyncio.to_thread(
+        client.create_multipart_upload,
+        Bucket=BUCKET_NAME,
+        Key=key,
+        ACL='public-read',
+        ContentType=mime_type,
+        ChecksumAlgorithm="SHA256",
+    )
+    upload_id = upload["UploadId"]
+    slots = asyncio.Semaphore(S3_UPLOAD_CONCURRENCY)
+    pending: list[asyncio.Future] = []
+    size = 0
+
+    def put_part(part_number: int, body: bytes) -> dict:
+        checksum = _sha256_b64(body)
+        response = client.upload_part(
+            Bucket=BUCKET_NAME,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body,
+            ChecksumAlgorithm="SHA256",
+            ChecksumSHA256=checksum,
+        )
+        if response.get("ChecksumSHA256") not in (None, checksum):
+            raise ValueError(f"Checksum mismatch on part {part_number}")
+        return {
+            "PartNumber": part_number,
+            "ETag": response["ETag"],
+            "ChecksumSHA256": checksum,
+        }
+
+    async def submit(part_number: int, body: bytes):
+        await slots.acquire()
+        future = loop.run_in_executor(_part_executor, put_part, part_number, body)
+        future.add_done_callback(lambda _: slots.release())
+        pending.append(future)
+
+    try:
+        with span("s3.upload_stream") as current:
+            buffer = bytearray()
+            async for chunk in body():
+                buffer.extend(chunk)
+                size += len(chunk)
+                while len(buffer) >= S3_PART_SIZE:
+                    await submit(len(pending) + 1, bytes(buffer[:S3_PART_SIZE]))
+                    del buffer[:S3_PART_SIZE]
+            if buffer or not pending:
+                await submit(len(pending) + 1, bytes(buffer))
+
+            parts = await asyncio.gather(*pending)
+            await asyncio.to_thread(
+                client.complete_multipart_upload,
+                Bucket=BUCKET_NAME,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+            current.set_attribute("s3.bytes", size)
+    except Exception as e:
+        logger.error(f"S3 streaming upload error: {str(e)}")
+        await asyncio.gather(*pending, return_exceptions=True)
+        try:
+            await asyncio.to_thread(
+                client.abort_multipart_upload,
+                Bucket=BUCKET_NAME,
+                Key=key,
+                UploadId=upload_id,
+            )
+        except Exception as abort_error:
+            # Keep the upload error; a bucket lifecycle rule cleans up what is left
+            logger.error(f"S3 abort multipart upload error: {str(abort_error)}")
+        raise HTTPException(status_code=500, detail="Failed to upload video") from e
+
+    video_url = video_url_for(key)
+    logger.info(f"Video streamed to S3 in {len(parts)} parts ({size} bytes): {video_url}")
+    return {"video_url": video_url, "mime_type": mime_type}
+
+
+async def create_direct_upload(user_id: str, parts: int = 1) -> dict:
+    """Presign URLs so the browser can upload straight to the bucket."""
+    key = new_video_key(user_id)
+    try:
+        client = await s3_client()
+        if parts == 1:
+            url = await asyncio.to_thread(
+                client.generate_presigned_url,
+                "put_object",
+                Params={"Bucket": BUCKET_NAME, "Key": key, "ContentType": "video/mp4"},
+                ExpiresIn=S3_PRESIGNED_URL_EXPIRES,
+            )
+            return {"key": key, "upload_id": None, "urls": [url]}
+
+        upload = await asyncio.to_thread(
+            client.create_multipart_upload,
+            Bucket=BUCKET_NAME,
+            Key=key,
+            ACL='public-read',
+            ContentType="video/mp4",
+        )
+        upload_id = upload["UploadId"]
+        urls = [
+            await asyncio.to_thread(
+                client.generate_presigned_url,
+                "upload_part",
+                Params={
+                    "Bucket": BUCKET_NAME,
+                    "Key": key,
+                    "UploadId": upload_id,
+                    "PartNumber": part_number,
+                },
+                ExpiresIn=S3_PRESIGNED_URL_EXPIRES,
+            )
+            for part_number in range(1, parts + 1)
+        ]
+        return {"key": key, "upload_id": upload_id, "urls": urls}
+    except Exception as e:
+        logger.error(f"S3 presign error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to create upload URL")
+
+
+def _listed_parts(client, key: str, upload_id: str) -> dict[int, dict]:
+    paginator = client.get_paginator("list_parts")
+    return {
+        part["PartNumber"]: part
+        for page in paginator.paginate(Bucket=BUCKET_NAME, Key=key, UploadId=upload_id)
+        for part in page.get("Parts", [])
+    }
+
+
+async def complete_direct_upload(
+    key: str,
+    size: int,
+    upload_id: Optional[str] = None,
+    parts: Optional[list[dict]] = None,
+    etag: Optional[str] = None,
+) -> dict:
+    """Finish a browser upload once it matches what the client says it sent.
+
+    Multipart ETags are checked against the parts S3 received before the
+    upload is completed, the object's size against ``size`` (and a single
+    PUT's ETag against ``etag`` when given), and its first bytes must look
+    like a video. A mismatch discards the upload and is rejected with a 400.
+    Returns the ``video_url`` and the sniffed ``mime_type``.
+    """
+    try:
+        client = await s3_client()
+        if upload_id:
+            received = await asyncio.to_thread(_listed_parts, client, key, upload_id)
+            claimed = {p["part_number"]: p["etag"].strip('"') for p in parts or []}
+            if (
+                claimed.keys() != received.keys()
+                or any(received[n]["ETag"].strip('"') != claimed[n] for n in claimed)
+                or sum(part["Size"] for part in received.values()) != size
+            ):
+                await asyncio.to_thread(
+                    client.abort_multipart_upload, Bucket=BUCKET_NAME, Key=key, UploadId=upload_id
+                )
+                raise HTTPException(status_code=400, detail="Uploaded parts do not match the upload")
+            await asyncio.to_thread(
+                client.complete_multipart_upload,
+                Bucket=BUCKET_NAME,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    "Parts": [
+                        {"PartNumber": number, "ETag": received[number]["ETag"]}
+                        for number in sorted(received)
+                    ]
+                },
+            )
+        head = await asyncio.to_thread(client.head_object, Bucket=BUCKET_NAME, Key=key)
+        first = await asyncio.to_thread(
+            client.get_object, Bucket=BUCKET_NAME, Key=key, Range=f"bytes=0-{SNIFF_BYTES - 1}"
+        )
+        mime_type = sniff_mime(first["Body"].read())
+        if head["ContentLength"] != size or (
+            etag and not upload_id and head["ETag"].strip('"') != etag.strip('"')
+        ):
+            rejection = HTTPException(status_code=400, detail="Uploaded file does not match the upload")
+        elif not mime_type:
+            rejection = _invalid_video()
+        else:
+            rejection = None
+        if rejection:
+            await asyncio.to_thread(client.delete_object, Bucket=BUCKET_NAME, Key=key)
+            raise rejection
+        if not upload_id:
+            await asyncio.to_thread(
+                client.put_object_acl, Bucket=BUCKET_NAME, Key=key, ACL='public-read'
+            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"S3 complete upload error: {str(e)}")
+        raise HTTPException(status_code=400, detail="Upload could not be completed")
+
+    video_url = video_url_for(key)
+    logger.info(f"Direct upload completed ({size} bytes, {mime_type}): {video_url}")
+    return {"video_url": video_url, "mime_type": mime_type}
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import re
+import shutil
+from typing import Optional
+from app.utils.logger import logger
+
+FFMPEG = shutil.which(os.getenv("FFMPEG_BINARY", "ffmpeg"))
+FFPROBE = shutil.which(os.getenv("FFPROBE_BINARY", "ffprobe"))
+SILENCE_NOISE_DB = os.getenv("SEGMENT_SILENCE_NOISE_DB", "-35dB")
+SILENCE_MIN_SECONDS = float(os.getenv("SEGMENT_SILENCE_MIN_SECONDS", "1.0"))
+
+_SILENCE = re.compile(r"silence_(start|end): (-?[\d.]+)")
+
+Segment = tuple[float, Optional[float]]
+
+
+def ffmpeg_available() -> bool:
+    return bool(FFMPEG and FFPROBE)
+
+
+async def _run(*args: str) -> tuple[int, str, str]:
+    process = await asyncio.create_subprocess_exec(
+        *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    return process.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+
+async def probe_duration(source: str) -> Optional[float]:
+    if not FFPROBE:
+        return None
+    code, out, err = await _run(
+        FFPROBE, "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "format=duration:stream=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", source,
+    )
+    if code != 0:
+        return None
+    # Container duration, else the video stream's; live WebM reports neither ("N/A")
+    for line in reversed(out.split()):
+        try:
+            if float(line) > 0:
+                return float(line)
+        except ValueError:
+            pass
+    return None
+
+
+async def detect_silences(source: str) -> list[tuple[float, float]]:
+    """Return (start, end) of silent stretches in the audio track."""
+    code, _, err = await _run(
+        FFMPEG, "-hide_banner", "-nostats", "-i", source, "-vn",
+        "-af", f"silencedetect=noise={SILENCE_NOISE_DB}:d={SILENCE_MIN_SECONDS}",
+        "-f", "null", "-",
+    )
+    if code != 0:
+        logger.warning(f"Silence detection failed for {source}")
+        return []
+    silences, start = [], None
+    for kind, value in _SILENCE.findall(err):
+        if kind == "start":
+            start = float(value)
+        elif start is not None:
+            silences.append((start, float(value)))
+            start = None
+    return silences
+
+
+def segments_from_timestamps(
+    timestamps: list[float], num_questions: int, duration: Optional[float]
+) -> Optional[list[Segment]]:
+    # Client clocks drift; keep every start inside the recording
+    timestamps = [max(0.0, min(t, duration) if duration else t) for t in timestamps]
+    if len(timestamps) != num_questions or any(
+        b <= a for a, b in zip(timestamps, timestamps[1:])
+    ):
+        logger.warning("Ignoring question timestamps that do not match the questions")
+        return None
+    ends = list(timestamps[1:]) + [duration]
+    return list(zip(timestamps, ends))
+
+
+async def plan_segments(
+    source: str, num_questions: int, timestamps: Optional[list[float]] = None
+) -> Optional[list[Segment]]:
+    """Split a recording into one (start, end) range per question.
+
+    Client-supplied question start times are preferred. Otherwise, with ffmpeg
+    available, the longest pauses in the audio are taken as question
+    boundaries. Returns None when the video cannot be segmented. ``source``
+    should be a local file when one exists: on a URL, silence detection reads
+    the whole recording over the network.
+    """
+    duration = await probe_duration(source)
+    if timestamps:
+        segments = segments_from_timestamps(timestamps, num_questions, duration)
+        if segments:
+            return segments
+    if num_questions == 1:
+        return [(0.0, duration)]
+    # Without a known duration (e.g. MediaRecorder WebM) the last answer runs to the end
+    if not ffmpeg_available():
+        return None
+
+    silences = await detect_silences(source)
+    if len(silences) < num_questions - 1:
+        return None
+    longest = sorted(silences, key=lambda s: s[1] - s[0], reverse=True)[: num_questions - 1]
+    boundaries = sorted((start + end) / 2 for start, end in longest)
+    starts = [0.0] + boundaries
+    return list(zip(starts, boundaries + [duration]))
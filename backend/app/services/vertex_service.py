@@ -1,35 +1,32 @@
-import json
 import os
-from google.cloud import aiplatform
-from google.cloud.aiplatform.gapic import PredictionServiceClient
 from fastapi import HTTPException
+from app.models.interview import QuestionResult, SessionFeedback, VideoAnalytics
+from app.services.model_provider import VideoInput, analysis_provider
+from app.services.response_parser import (
+    ResponseParseError,
+    parse_with_reask,
+)
+from app.services.segmentation_service import Segment
 from app.utils.logger import logger
-import vertexai
-from google.oauth2 import service_account
-from vertexai.generative_models import GenerativeModel, Part
+from app.utils.model_usage import record_model_call
+from typing import Awaitable, Callable, Optional
+import asyncio
 import time
-from dotenv import load_dotenv
 
-load_dotenv()
+SEGMENT_ANALYSIS_CONCURRENCY = int(os.getenv("SEGMENT_ANALYSIS_CONCURRENCY", "4"))
+SEGMENT_MAX_ATTEMPTS = int(os.getenv("SEGMENT_MAX_ATTEMPTS", "2"))
 
-gcp_project_id_str = os.getenv("GOOGLE_CLOUD_PROJECT")
+ANALYSIS_MODEL = os.getenv("ANALYSIS_MODEL", "gemini-2.0-flash")
 
-current_path = os.path.dirname(os.path.abspath(__file__))
-credentials_path = os.path.join(
-    current_path, "credentials", "ai-interview-poc-2b5cf8540f16.json"
-)
 
-# Load credentials
-credentials = service_account.Credentials.from_service_account_file(credentials_path)
-
-vertexai.init(
-    project=gcp_project_id_str, credentials=credentials, location="us-central1"
-)
-model = GenerativeModel("gemini-2.0-flash")
+async def _reask(prompt: str) -> str:
+    response = await analysis_provider.generate(ANALYSIS_MODEL, prompt, VideoAnalytics)
+    record_model_call("analyze_video.reask", prompt, response.usage)
+    return response.text
 
 
 async def analyze_video(
-    video_url: str, job_description: str, questions: list[str]
+    video_url: str, job_description: str, questions: list[str], mime_type: str = "video/mp4"
 ) -> dict:
     # Validate questions
     if not questions or not isinstance(questions, list):
@@ -40,11 +37,6 @@ async def analyze_video(
 
     questions_text = "\n".join([f"{i+1}. {q}" for i, q in enumerate(questions)])
 
-    print(questions_text)
-
-    # Determine MIME type
-    mime_type = "video/mp4"
-
     # Construct prompt
     prompt = f"""
 You are an expert AI interviewer analyzing a candidate's video response for a {job_description} role. 
@@ -76,117 +68,181 @@ Additionally:
   - Supporting quotes with analysis (strengths and improvement areas).
   - Lists of strengths and improvement areas.
 
-Return a JSON object with:
-- A 'questions' array containing, for each question:
-  - 'question': The question text.
-  - 'answer': The transcribed answer (or empty string if unanswered).
-  - 'score': The score (0-100).
-  - 'body_language': Description of body language (or empty string if unanswered).
-  - 'communication': Description of communication (or empty string if unanswered).
-  - 'time_consumed_seconds': Time taken to answer (or 0 if unanswered).
-- An 'overall_score' (0-100) based on all responses, weighted by answered questions.
-- An 'insights' array with 3 feedback insights.
-- A 'communication' object with:
-  - 'score': Communication score (0-10).
-  - 'overallFeedback': Summary feedback.
-  - 'supportingQuotes': Array of quotes with analysis and type (strength/improvement_area).
-  - 'strengths': List of strengths.
-  - 'improvementAreas': List of improvement areas.
-
-Example output:
-{{
-  "questions": [
-    {{
-      "question": "Tell me about yourself.",
-      "answer": "I'm a software engineer with 5 years of experience in Python and React.",
-      "score": 85,
-      "body_language": "Maintains good eye contact, upright posture.",
-      "communication": "Clear and confident tone, minimal filler words.",
-      "time_consumed_seconds": 45.2
-    }},
-    {{
-      "question": "What is your experience with Python?",
-      "answer": "Answer from User",
-      "score": 95,
-      "body_language": "Maintains good eye contact, upright posture.",
-      "communication": "Clear and confident tone, minimal filler words.",
-      "time_consumed_seconds": 90
-    }}
-  ],
-  "overall_score": 85,
-  "insights": [
-    "Strong technical knowledge in Python demonstrated.",
-    "Needs to reduce filler words for clarity.",
-    "Confident delivery in behavioral questions."
-  ],
-  "communication": {{
-    "score": 8,
-    "overallFeedback": "The candidate communicates clearly with confidence. Minor filler words detected.",
-    "supportingQuotes": [
-      {{
-        "quote": "I led a team to deliver a Python project.",
-        "analysis": "Shows leadership and clarity.",
-        "type": "strength"
-      }},
-      {{
-        "quote": "Um, I think I can, uh, do that.",
-        "analysis": "Filler words reduce fluency.",
-        "type": "improvement_area"
-      }}
-    ],
-    "strengths": ["Confident tone", "Clear articulation"],
-    "improvementAreas": ["Reduce filler words", "Improve pacing"]
-  }}
-}}
+Return the analysis as JSON matching the response schema, with one 'questions' entry per question in order.
 """
 
-    print(prompt)
-
     # Analyze video
     try:
         start_time = time.time()
-        response = model.generate_content(
-            contents=[
-                prompt,
-                Part.from_uri(video_url, mime_type),
-            ]
-        )
+        text = ""
+        usage = None
+        async for chunk in analysis_provider.stream(
+            ANALYSIS_MODEL, prompt, VideoAnalytics, VideoInput(video_url, mime_type)
+        ):
+            text += chunk.text
+            usage = chunk.usage or usage
         end_time = time.time()
-
-        print(response.text)
+        record_model_call("analyze_video", prompt, usage)
 
         # Process response
         try:
-            if response.text.strip().startswith("```json"):
-                cleaned = response.text.strip("`").strip("json").strip()
-            else:
-                cleaned = response.text
-
-            parsed_json = json.loads(cleaned)
-
-            result = parsed_json
-
-            if (
-                not isinstance(result, dict)
-                or "questions" not in result
-                or "overall_score" not in result
-            ):
-                raise ValueError("Invalid response format")
-
-            # Add time_consumed_seconds if not provided
-            for q in result["questions"]:
-                if "time_consumed_seconds" not in q:
-                    q["time_consumed_seconds"] = (
-                        0
-                        if not q["answer"]
-                        else (end_time - start_time) / len(questions)
-                    )
-
-            logger.info(f"Video analysis completed for {video_url}")
-            return result
-        except (ValueError, json.JSONDecodeError) as e:
+            analytics = await parse_with_reask(text, VideoAnalytics, _reask)
+        except ResponseParseError as e:
             logger.error(f"Invalid Vertex AI response: {str(e)}")
             raise HTTPException(status_code=500, detail="Invalid analysis response")
+
+        result = analytics.model_dump()
+
+        # Add time_consumed_seconds if not provided
+        for q in result["questions"]:
+            if q["time_consumed_seconds"] is None:
+                q["time_consumed_seconds"] = (
+                    0
+                    if not q["answer"]
+                    else (end_time - start_time) / len(questions)
+                )
+
+        logger.info(f"Video analysis completed for {video_url}")
+        return result
+    except HTTPException as e:
+        raise e
+    except Exception as e:
+        logger.error(f"Vertex AI error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to analyze video")
+
+
+async def _generate_json(
+    call_site: str, prompt: str, schema, video: Optional[VideoInput] = None
+):
+    async def reask(prompt: str) -> str:
+        response = await analysis_provider.generate(ANALYSIS_MODEL, prompt, schema)
+        record_model_call(f"{call_site}.reask", prompt, response.usage)
+        return response.text
+
+    response = await analysis_provider.generate(ANALYSIS_MODEL, prompt, schema, video)
+    record_model_call(call_site, prompt, response.usage)
+    return await parse_with_reask(response.text, schema, reask)
+
+
+async def analyze_segment(
+    video_url: str,
+    job_description: str,
+    question: str,
+    index: int,
+    segment: tuple,
+    mime_type: str = "video/mp4",
+) -> dict:
+    start, end = segment
+    prompt = f"""
+You are an expert AI interviewer analyzing a candidate's video response for a {job_description} role.
+This part of the recording is the candidate's answer to question {index + 1}: {question}
+
+1. Transcribe the candidate's answer.
+2. Assign a score (0-100) based on accuracy, relevance, and clarity.
+3. Analyze body language (e.g., posture, gestures, eye contact).
+4. Analyze communication (e.g., tone, fluency, confidence).
+
+If the question is not answered, return an empty answer with a score of 0.
+Return JSON matching the response schema, with 'question' set to the question text.
+"""
+    result = await _generate_json(
+        "analyze_segment",
+        prompt,
+        QuestionResult,
+        VideoInput(video_url, mime_type, start, end),
+    )
+    result = result.model_dump()
+    result["question"] = question
+    if end is not None:
+        result["time_consumed_seconds"] = round(end - start, 2) if result["answer"] else 0
+    return result
+
+
+async def summarize_answers(job_description: str, results: list[dict]) -> dict:
+    transcript = "\n\n".join(
+        f"Q{i + 1}: {r['question']}\nA: {r['answer'] or '(no answer)'}\n"
+        f"Communication: {r['communication']}"
+        for i, r in enumerate(results)
+    )
+    prompt = f"""
+You are an expert AI interviewer reviewing a candidate's answers for a {job_description} role.
+
+{transcript}
+
+- Generate 3 insights (25 words or less each) highlighting user feedback from the responses, focusing on strengths or areas for improvement.
+- Analyze communication skills across the transcript, providing a communication score (0-10), a 2-3 sentence overall feedback summary, supporting quotes with analysis (strengths and improvement areas), and lists of strengths and improvement areas.
+Return JSON matching the response schema.
+"""
+    feedback = await _generate_json("summarize_answers", prompt, SessionFeedback)
+    return feedback.model_dump()
+
+
+async def analyze_video_segments(
+    video_url: str,
+    job_description: str,
+    questions: list[str],
+    segments: Optional[list[Segment]] = None,
+    completed: Optional[dict] = None,
+    on_result: Optional[Callable[[int, dict], Awaitable[None]]] = None,
+    mime_type: str = "video/mp4",
+) -> dict:
+    """Analyze each question's part of the video concurrently, then merge.
+
+    ``segments`` is the per-question plan from ``plan_segments``; without one
+    the whole video is analyzed in a single call. ``completed`` maps question
+    index to results from an earlier attempt, which are reused; ``on_result``
+    is awaited as each new per-question result lands.
+    """
+    if not segments:
+        logger.info(f"Video could not be segmented, analyzing as a whole: {video_url}")
+        return await analyze_video(video_url, job_description, questions, mime_type)
+
+    completed = completed or {}
+    limit = asyncio.Semaphore(SEGMENT_ANALYSIS_CONCURRENCY)
+
+    async def run(index: int) -> dict:
+        if index in completed:
+            return completed[index]
+        async with limit:
+            for attempt in range(1, SEGMENT_MAX_ATTEMPTS + 1):
+                try:
+                    result = await analyze_segment(
+                        video_url,
+                        job_description,
+                        questions[index],
+                        index,
+                        segments[index],
+                        mime_type,
+                    )
+                    break
+                except Exception as e:
+                    if attempt == SEGMENT_MAX_ATTEMPTS:
+                        logger.error(f"Segment {index + 1} analysis failed: {str(e)}")
+                        raise
+                    logger.warning(f"Segment {index + 1} attempt {attempt} failed: {str(e)}")
+                    await asyncio.sleep(2 ** (attempt - 1))
+        if on_result:
+            await on_result(index, result)
+        return result
+
+    tasks = [asyncio.create_task(run(i)) for i in range(len(questions))]
+    try:
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            # Once one question has failed for good the job fails; stop the others
+            for task in tasks:
+                task.cancel()
+        feedback = await summarize_answers(job_description, results)
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.error(f"Vertex AI error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to analyze video")
+
+    logger.info(f"Segmented video analysis completed for {video_url} ({len(results)} segments)")
+    return {
+        "questions": results,
+        "overall_score": round(sum(r["score"] for r in results) / len(results), 2),
+        **feedback,
+    }
@@ -1,32 +1,134 @@
 from jose import JWTError, jwt
-from fastapi import HTTPException, Depends
+from fastapi import HTTPException, Depends, Query, Request
 from fastapi.security import OAuth2PasswordBearer
-from datetime import datetime, timedelta
+from cachetools import LRUCache, TTLCache
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+import asyncio
+import hashlib
+import httpx
 import os
-from app.utils.logger import logger
-
-
-from dotenv import load_dotenv
-load_dotenv()
+import time
+from app.database import get_user_repository
+from app.models.user import UserPrincipal
+from app.repositories.user_repository import UserRepository
+from app.utils.logger import logger, user_id_var
 
 SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = "HS256"
+ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+JWT_KEY_ID = os.getenv("JWT_KEY_ID")
+JWT_PRIVATE_KEY_PATH = os.getenv("JWT_PRIVATE_KEY_PATH")
+JWT_PUBLIC_KEY_PATH = os.getenv("JWT_PUBLIC_KEY_PATH")
+JWT_JWKS_URL = os.getenv("JWT_JWKS_URL")
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "10000"))
+JWT_KEY_CACHE_TTL_SECONDS = int(os.getenv("JWT_KEY_CACHE_TTL_SECONDS", "300"))
+JWT_KEY_REFRESH_MIN_SECONDS = float(os.getenv("JWT_KEY_REFRESH_MIN_SECONDS", "30"))
+ADMIN_EMAILS = {
+    email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()
+}
 
-if not SECRET_KEY:
+ASYMMETRIC = not ALGORITHM.startswith("HS")
+
+if not ASYMMETRIC and not SECRET_KEY:
     logger.error("SECRET_KEY is not set")
     raise RuntimeError("Missing SECRET_KEY")
+if ASYMMETRIC and not (JWT_PUBLIC_KEY_PATH or JWT_JWKS_URL):
+    logger.error(f"{ALGORITHM} requires JWT_PUBLIC_KEY_PATH or JWT_JWKS_URL")
+    raise RuntimeError("Missing JWT verification key")
 
-logger.info("JWT SECRET_KEY loaded successfully")
+logger.info(f"JWT {ALGORITHM} keys configured")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
+# Verified claims keyed by token hash; entries are rechecked against exp on hit
+_token_cache: LRUCache = LRUCache(maxsize=JWT_CACHE_SIZE)
+# Public keys by kid, refreshed periodically so rotated keys are picked up
+_key_cache: TTLCache = TTLCache(maxsize=64, ttl=JWT_KEY_CACHE_TTL_SECONDS)
+# One reload in flight at a time; tokens with unknown kids cannot force more
+_key_refresh: Optional[asyncio.Task] = None
+_key_refreshed_at = float("-inf")
+
+
+def _read_key(path: str) -> str:
+    with open(path) as f:
+        return f.read()
+
+
+@lru_cache(maxsize=1)
+def _signing_key():
+    if not ASYMMETRIC:
+        return SECRET_KEY
+    if not JWT_PRIVATE_KEY_PATH:
+        raise RuntimeError("JWT_PRIVATE_KEY_PATH is required to issue tokens")
+    return _read_key(JWT_PRIVATE_KEY_PATH)
+
+
+async def _load_public_keys():
+    if JWT_JWKS_URL:
+        async with httpx.AsyncClient(timeout=5) as client:
+            response = await client.get(JWT_JWKS_URL)
+            response.raise_for_status()
+        for key in response.json().get("keys", []):
+            _key_cache[key.get("kid")] = key
+    else:
+        _key_cache[JWT_KEY_ID] = await asyncio.to_thread(_read_key, JWT_PUBLIC_KEY_PATH)
+
+
+async def _refresh_public_keys():
+    """Reload keys at most once per JWT_KEY_REFRESH_MIN_SECONDS; concurrent callers share the reload."""
+    global _key_refresh, _key_refreshed_at
+    if _key_refresh is None or _key_refresh.done():
+        if time.monotonic() - _key_refreshed_at < JWT_KEY_REFRESH_MIN_SECONDS:
+            return
+        _key_refreshed_at = time.monotonic()
+        _key_refresh = asyncio.create_task(_load_public_keys())
+    try:
+        # Shielded so one cancelled request does not cancel the reload for the others
+        await asyncio.shield(_key_refresh)
+    except Exception as e:
+        logger.error(f"JWT key refresh error: {str(e)}")
+        raise HTTPException(status_code=503, detail="Signing keys unavailable")
+
+
+async def _verification_key(token: str):
+    if not ASYMMETRIC:
+        return SECRET_KEY
+    kid = jwt.get_unverified_header(token).get("kid")
+    key = _key_cache.get(kid)
+    if key is None:
+        await _refresh_public_keys()
+        key = _key_cache.get(kid)
+    if key is None:
+        raise JWTError(f"Unknown signing key: {kid}")
+    return key
+
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    headers = {"kid": JWT_KEY_ID} if JWT_KEY_ID else None
+    encoded_jwt = jwt.encode(to_encode, _signing_key(), algorithm=ALGORITHM, headers=headers)
     return encoded_jwt
 
+
+async def decode_access_token(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).digest()
+    now = datetime.now(timezone.utc).timestamp()
+    payload = _token_cache.get(key)
+    if payload is not None:
+        if payload["exp"] > now:
+            return payload
+        del _token_cache[key]
+        raise JWTError("Signature has expired.")
+    payload = jwt.decode(token, await _verification_key(token), algorithms=[ALGORITHM])
+    # Only tokens with an expiry are cacheable; the cache must never outlive them
+    if "exp" in payload:
+        _token_cache[key] = payload
+    return payload
+
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=401,
@@ -34,11 +136,49 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = await decode_access_token(token)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
+        user_id_var.set(email)
         return email
     except JWTError as e:
         logger.error(f"JWT Error: {str(e)}")
-        raise credentials_exception
\ No newline at end of file
+        raise credentials_exception
+
+
+async def get_current_admin(current_user: str = Depends(get_current_user)):
+    if current_user.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
+
+async def get_current_user_from_query(token: Optional[str] = Query(None)):
+    # EventSource and browser WebSockets cannot send an Authorization header
+    if not token:
+        raise HTTPException(
+            status_code=401,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await get_current_user(token)
+
+
+async def get_current_principal(
+    request: Request,
+    current_user: str = Depends(get_current_user),
+    users: UserRepository = Depends(get_user_repository),
+) -> UserPrincipal:
+    principal: Optional[UserPrincipal] = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+    user = await users.find_by_email(current_user)
+    if not user:
+        raise HTTPException(
+            status_code=401,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    principal = UserPrincipal(user_id=str(user["_id"]), email=user["email"])
+    request.state.principal = principal
+    return principal
@@ -1,6 +1,222 @@
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Optional
 from loguru import logger
+import asyncio
+import glob
+import gzip
+import json
+import os
+import queue
+import shutil
 import sys
+import threading
+import time
+import traceback
+import zlib
 
-logger.remove()
-logger.add(sys.stderr, format="{time} {level} {message}", level="INFO")
-logger.add("logs/app.log", rotation="1 MB", retention="10 days", level="DEBUG")
\ No newline at end of file
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# "{pid}" is replaced with the process id, giving each worker process its own file
+LOG_FILE = os.getenv("LOG_FILE", "logs/app.log")
+LOG_FILE_LEVEL = os.getenv("LOG_FILE_LEVEL", "DEBUG")
+LOG_ROTATION_MB = int(os.getenv("LOG_ROTATION_MB", "100"))
+LOG_ROTATION_HOURS = float(os.getenv("LOG_ROTATION_HOURS", "24"))
+LOG_RETENTION_DAYS = float(os.getenv("LOG_RETENTION_DAYS", "10"))
+# Records beyond this many waiting to be written are dropped (and counted)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Share of requests whose DEBUG records are kept; sampled per request, not per record
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+# "text" or "json" for stderr; the file is always JSON lines
+LOG_STDERR_FORMAT = os.getenv("LOG_STDERR_FORMAT", "text")
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+user_id_var: ContextVar[Optional[str]] = ContextVar("user_id", default=None)
+
+_STOP = object()
+
+
+def _add_context(record):
+    record["extra"].setdefault("request_id", request_id_var.get())
+    record["extra"].setdefault("user_id", user_id_var.get())
+
+
+def _sampled(record) -> bool:
+    if record["level"].no > 10 or LOG_DEBUG_SAMPLE_RATE >= 1:
+        return True
+    request_id = record["extra"].get("request_id")
+    if request_id is None:
+        return False
+    # Stable per request, so a sampled request keeps all of its debug records
+    return zlib.crc32(request_id.encode()) % 10_000 < LOG_DEBUG_SAMPLE_RATE * 10_000
+
+
+def _exception_text(record) -> Optional[str]:
+    if not record["exception"]:
+        return None
+    error_type, value, tb = record["exception"]
+    return "".join(traceback.format_exception(error_type, value, tb))
+
+
+def json_line(record) -> str:
+    entry = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "message": record["message"],
+        "module": record["name"],
+        "line": record["line"],
+        **{k: v for k, v in record["extra"].items() if v is not None},
+    }
+    exception = _exception_text(record)
+    if exception:
+        entry["exception"] = exception
+    return json.dumps(entry, default=str) + "\n"
+
+
+def text_line(record) -> str:
+    context = " ".join(
+        f"{key}={record['extra'][key]}"
+        for key in ("request_id", "user_id")
+        if record["extra"].get(key)
+    )
+    line = (
+        f"{record['time'].strftime('%Y-%m-%dT%H:%M:%S.%f%z')} "
+        f"{record['level'].name} {record['message']}"
+    )
+    if context:
+        line += f" [{context}]"
+    return line + "\n" + (_exception_text(record) or "")
+
+
+class RotatingFile:
+    """Append-only file that rotates by size or age and gzips what it rotates out."""
+
+    def __init__(self, path: str, max_bytes: int, max_age_seconds: float, retention_days: float):
+        self._path = path
+        self._max_bytes = max_bytes
+        self._max_age = max_age_seconds
+        self._retention = retention_days * 86400
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._open()
+
+    def _open(self):
+        self._file = open(self._path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+        self._rotate_at = time.time() + self._max_age
+
+    def write(self, text: str):
+        if self._size and (
+            self._size + len(text) > self._max_bytes or time.time() >= self._rotate_at
+        ):
+            self._rotate()
+        self._file.write(text)
+        self._size += len(text)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def _rotate(self):
+        self._file.close()
+        base, ext = os.path.splitext(self._path)
+        rotated = f"{base}.{datetime.now():%Y-%m-%d_%H-%M-%S_%f}{ext}"
+        os.replace(self._path, rotated)
+        self._open()
+        with open(rotated, "rb") as src, gzip.open(f"{rotated}.gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(rotated)
+        cutoff = time.time() - self._retention
+        for old in glob.glob(f"{glob.escape(base)}.*{ext}.gz"):
+            if os.path.getmtime(old) < cutoff:
+                os.remove(old)
+
+
+class BackgroundSink:
+    """Loguru sink that hands records to a writer thread.
+
+    The logging call only puts the record on an in-process queue; formatting
+    and I/O happen on the thread, which writes whatever has accumulated as
+    one batch. When the queue is full, records are dropped and counted
+    instead of blocking the event loop.
+    """
+
+    def __init__(self, stream, formatter: Callable[[dict], str], queue_size: int = LOG_QUEUE_SIZE):
+        self._stream = stream
+        self._format = formatter
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._dropped = 0
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message):
+        try:
+            self._queue.put_nowait(message.record)
+        except queue.Full:
+            self._dropped += 1
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < 1024:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not _STOP]
+            try:
+                text = "".join(self._format(record) for record in records)
+                if self._dropped:
+                    text += f"{self._dropped} log records dropped, writer fell behind\n"
+                    self._dropped = 0
+                self._stream.write(text)
+                self._stream.flush()
+            except Exception as e:
+                print(f"Log writer error: {e}", file=sys.__stderr__)
+            for _ in batch:
+                self._queue.task_done()
+            if len(records) < len(batch):
+                return
+
+    def stop(self):
+        self._queue.put(_STOP)
+        self._thread.join(timeout=5)
+        # Only files opened here are ours to close; stderr belongs to the process
+        if isinstance(self._stream, RotatingFile):
+            self._stream.close()
+
+    async def complete(self):
+        await asyncio.to_thread(self._queue.join)
+
+
+def configure_logging():
+    """Send records to stderr and a JSON-lines file through background writers.
+
+    ``await logger.complete()`` waits until everything logged so far is written.
+    """
+    logger.remove()
+    logger.configure(patcher=_add_context)
+    logger.add(
+        BackgroundSink(sys.stderr, json_line if LOG_STDERR_FORMAT == "json" else text_line),
+        format="{message}",
+        level=LOG_LEVEL,
+        colorize=False,
+    )
+    logger.add(
+        BackgroundSink(
+            RotatingFile(
+                LOG_FILE.replace("{pid}", str(os.getpid())),
+                LOG_ROTATION_MB * 1024 * 1024,
+                LOG_ROTATION_HOURS * 3600,
+                LOG_RETENTION_DAYS,
+            ),
+            json_line,
+        ),
+        format="{message}",
+        level=LOG_FILE_LEVEL,
+        filter=_sampled,
+        colorize=False,
+    )
+
+
+configure_logging()
@@ -0,0 +1,55 @@
+from collections import defaultdict
+from app.utils.logger import logger
+from app.utils.telemetry import MODEL_TOKENS
+import os
+
+# USD per million tokens; defaults are gemini-2.0-flash list prices
+MODEL_INPUT_COST_PER_MILLION = float(os.getenv("MODEL_INPUT_COST_PER_MILLION", "0.10"))
+MODEL_OUTPUT_COST_PER_MILLION = float(os.getenv("MODEL_OUTPUT_COST_PER_MILLION", "0.40"))
+
+_report = defaultdict(
+    lambda: {
+        "calls": 0, "prompt_chars": 0, "prompt_tokens": 0, "output_tokens": 0, "cost_usd": 0.0
+    }
+)
+
+
+def model_cost(usage_metadata=None) -> float:
+    prompt_tokens = getattr(usage_metadata, "prompt_token_count", None) or 0
+    output_tokens = getattr(usage_metadata, "candidates_token_count", None) or 0
+    return (
+        prompt_tokens * MODEL_INPUT_COST_PER_MILLION
+        + output_tokens * MODEL_OUTPUT_COST_PER_MILLION
+    ) / 1_000_000
+
+
+def record_model_call(call_site: str, prompt: str, usage_metadata=None):
+    prompt_tokens = getattr(usage_metadata, "prompt_token_count", None) or 0
+    output_tokens = getattr(usage_metadata, "candidates_token_count", None) or 0
+    entry = _report[call_site]
+    entry["calls"] += 1
+    entry["prompt_chars"] += len(prompt)
+    entry["prompt_tokens"] += prompt_tokens
+    entry["output_tokens"] += output_tokens
+    entry["cost_usd"] += model_cost(usage_metadata)
+    MODEL_TOKENS.labels(call_site, "prompt").inc(prompt_tokens)
+    MODEL_TOKENS.labels(call_site, "output").inc(output_tokens)
+    logger.debug(
+        f"Model call {call_site}: {len(prompt)} prompt chars, "
+        f"{prompt_tokens} prompt tokens, {output_tokens} output tokens"
+    )
+
+
+def usage_report() -> dict:
+    """Per call site totals and per-call averages of prompt size and token usage."""
+    report = {}
+    for call_site, entry in _report.items():
+        calls = entry["calls"]
+        report[call_site] = {
+            **entry,
+            "cost_usd": round(entry["cost_usd"], 6),
+            "avg_prompt_chars": round(entry["prompt_chars"] / calls, 1),
+            "avg_prompt_tokens": round(entry["prompt_tokens"] / calls, 1),
+            "avg_output_tokens": round(entry["output_tokens"] / calls, 1),
+        }
+    return report
@@ -0,0 +1,53 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from app.utils.logger import logger
+from app.utils.telemetry import span
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Hashes with a cost other than BCRYPT_ROUNDS are reported as needing an update
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+# bcrypt releases the GIL, so a small thread pool gives real parallelism
+_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password"
+)
+_pending = 0
+
+
+async def _run(name: str, fn, *args):
+    global _pending
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        logger.warning(f"Password hashing saturated ({_pending} pending), rejecting request")
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please try again",
+            headers={"Retry-After": "1"},
+        )
+    _pending += 1
+    try:
+        with span(name):
+            return await asyncio.get_running_loop().run_in_executor(_executor, fn, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    return await _run("bcrypt.hash", pwd_context.hash, password)
+
+
+async def verify_password(password: str, hashed: str) -> tuple[bool, Optional[str]]:
+    """Verify a password, returning a replacement hash if the stored one is outdated."""
+    return await _run("bcrypt.verify", pwd_context.verify_and_update, password, hashed)
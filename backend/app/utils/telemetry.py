@@ -0,0 +1,179 @@
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse
+from opentelemetry import trace
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from pymongo import monitoring
+from app.utils.logger import logger
+
+# Traces are exported over OTLP/HTTP when an endpoint is set, e.g. a local collector
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "interview-api")
+TRACE_SAMPLE_RATIO = float(os.getenv("TRACE_SAMPLE_RATIO", "1.0"))
+# Lets a request opt into a pyinstrument profile with ?profile=1
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+TELEMETRY_INTERVAL_SECONDS = float(os.getenv("TELEMETRY_INTERVAL_SECONDS", "1"))
+
+tracer = trace.get_tracer("app")
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+)
+SPAN_LATENCY = Histogram(
+    "span_duration_seconds",
+    "Duration of instrumented operations (MongoDB, S3, bcrypt, model calls, jobs)",
+    ["span"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+MODEL_TOKENS = Counter("model_tokens_total", "Model tokens by call site", ["call_site", "kind"])
+# Under several worker processes (PROMETHEUS_MULTIPROC_DIR set) gauges are combined per mode
+JOB_QUEUE_DEPTH = Gauge(
+    "job_queue_depth", "Jobs waiting to be claimed", multiprocess_mode="livemax"
+)
+JOBS_RUNNING = Gauge(
+    "jobs_running", "Jobs running on this worker", ["type"], multiprocess_mode="livesum"
+)
+MEDIA_BYTES = Counter("media_bytes_total", "Recording bytes before and after preprocessing", ["kind"])
+MODEL_CALLS_WAITING = Gauge(
+    "model_calls_waiting",
+    "Model calls waiting for a concurrency slot",
+    multiprocess_mode="livesum",
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between when a timer was due and when the event loop ran it",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+
+
+def metrics_payload() -> bytes:
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # Each worker writes its samples to files there; any worker can serve the total
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Trace an operation and record its duration under ``span_duration_seconds``."""
+    start = time.perf_counter()
+    with tracer.start_as_current_span(name, attributes=attributes) as current:
+        try:
+            yield current
+        finally:
+            SPAN_LATENCY.labels(name).observe(time.perf_counter() - start)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Times every MongoDB command without touching the repositories."""
+
+    def __init__(self):
+        self._spans: dict = {}
+
+    def started(self, event):
+        self._spans[(event.request_id, event.connection_id)] = tracer.start_span(
+            f"mongodb.{event.command_name}",
+            attributes={"db.system": "mongodb", "db.name": event.database_name},
+        )
+
+    def _finish(self, event, error: Optional[str] = None):
+        SPAN_LATENCY.labels(f"mongodb.{event.command_name}").observe(
+            event.duration_micros / 1_000_000
+        )
+        current = self._spans.pop((event.request_id, event.connection_id), None)
+        if current is not None:
+            if error:
+                current.set_status(trace.StatusCode.ERROR, error)
+            current.end()
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event, str(event.failure))
+
+
+def configure_tracing():
+    if not OTEL_EXPORTER_OTLP_ENDPOINT:
+        return
+    # Imported only when tracing is on, to keep startup light
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": OTEL_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(TRACE_SAMPLE_RATIO)),
+    )
+    provider.add_span_processor(
+        BatchSpanProcessor(OTLPSpanExporter(endpoint=f"{OTEL_EXPORTER_OTLP_ENDPOINT}/v1/traces"))
+    )
+    trace.set_tracer_provider(provider)
+    logger.info(f"Exporting traces to {OTEL_EXPORTER_OTLP_ENDPOINT}")
+
+
+def instrument(app: FastAPI):
+    @app.middleware("http")
+    async def observe_request(request: Request, call_next):
+        if PROFILING_ENABLED and request.query_params.get("profile"):
+            from pyinstrument import Profiler
+
+            profiler = Profiler(async_mode="enabled")
+            profiler.start()
+            await call_next(request)
+            profiler.stop()
+            return HTMLResponse(profiler.output_html())
+
+        start = time.perf_counter()
+        status = 500
+        with tracer.start_as_current_span(
+            f"{request.method} {request.url.path}", kind=trace.SpanKind.SERVER
+        ) as current:
+            try:
+                response = await call_next(request)
+                status = response.status_code
+                return response
+            finally:
+                route = request.scope.get("route")
+                path = route.path if route else "unmatched"
+                current.update_name(f"{request.method} {path}")
+                current.set_attribute("http.status_code", status)
+                REQUEST_LATENCY.labels(request.method, path, status).observe(
+                    time.perf_counter() - start
+                )
+
+
+async def monitor(
+    queue_depth: Callable[[], Awaitable[int]],
+    model_waiting: Callable[[], int],
+    interval: float = TELEMETRY_INTERVAL_SECONDS,
+):
+    """Sample event-loop lag and queue depths until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        due = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - due))
+        MODEL_CALLS_WAITING.set(model_waiting())
+        try:
+            JOB_QUEUE_DEPTH.set(await queue_depth())
+        except Exception as e:
+            logger.debug(f"Job queue depth unavailable: {str(e)}")
@@ -0,0 +1,47 @@
+"""Gunicorn settings for running the API as several worker processes.
+
+    gunicorn app.main:app          # from backend/, picks up this file
+    WEB_CONCURRENCY=4 gunicorn app.main:app
+    kill -HUP <master pid>         # rolling restart: new workers start, old ones drain
+
+Each worker is a full app instance (own clients, job workers and lifespan).
+State they share lives in MongoDB, so the job queue and model quotas default
+to the Mongo backends here. Concurrency and rate limits (MODEL_MAX_CONCURRENCY,
+MODEL_RATE_PER_SECOND, JOB_WORKER_CONCURRENCY, ...) apply per worker.
+"""
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from dotenv import load_dotenv
+
+# Read .env first so its values win over the multi-worker defaults below
+load_dotenv()
+os.environ.setdefault("JOB_QUEUE_BACKEND", "mongo")
+os.environ.setdefault("MODEL_QUOTA_BACKEND", "mongo")
+os.environ.setdefault("LOG_FILE", "logs/app.{pid}.log")
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "interview-metrics")
+)
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+# Covers request draining plus the job pool's JOB_DRAIN_SECONDS before a worker is killed
+graceful_timeout = int(float(os.getenv("JOB_DRAIN_SECONDS", "30"))) + 15
+timeout = int(os.getenv("WORKER_TIMEOUT_SECONDS", "120"))
+keepalive = 5
+
+
+def on_starting(server):
+    # Metric files from a previous run would otherwise be summed into this one
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
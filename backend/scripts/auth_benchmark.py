@@ -0,0 +1,164 @@
+"""Measure the cost of authentication on the event loop.
+
+``passwords`` runs a burst of concurrent logins (bcrypt verification at
+BCRYPT_ROUNDS) two ways: ``inline`` calls passlib directly inside the async
+handler, as login used to, and ``executor`` goes through the bounded
+password pool. It reports logins/sec, login latency, requests rejected
+with 503 once the pool is saturated, and event-loop lag sampled every
+10 ms while the burst runs.
+
+``tokens`` times access-token verification per call: ``jwt.decode`` on every
+request, ``decode_access_token`` answering from the verified-claims cache,
+and the whole ``get_current_user`` dependency. It then sends a burst of
+tokens naming unknown signing keys with a simulated slow JWKS endpoint and
+counts how many reloads they trigger.
+
+    python scripts/auth_benchmark.py passwords --logins 64 --concurrency 32
+    python scripts/auth_benchmark.py tokens --calls 20000 --unknown-kids 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException  # noqa: E402
+from jose import JWTError, jwt  # noqa: E402
+from app.utils import auth, passwords  # noqa: E402
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _with_lag(work) -> tuple[float, list[float]]:
+    """Await ``work()`` while sampling event-loop lag; returns elapsed seconds and lags."""
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def sample():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - start - 0.01)
+
+    sampler = asyncio.create_task(sample())
+    await asyncio.sleep(0)  # let the sampler start before the work is scheduled
+    start = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - start
+    done.set()
+    await sampler
+    return elapsed, lags
+
+
+async def login_burst(mode: str, logins: int, concurrency: int) -> dict:
+    stored = passwords.pwd_context.hash("correct horse")
+    slots = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    rejected = 0
+
+    async def login():
+        nonlocal rejected
+        async with slots:
+            start = time.perf_counter()
+            try:
+                if mode == "inline":
+                    passwords.pwd_context.verify_and_update("correct horse", stored)
+                else:
+                    await passwords.verify_password("correct horse", stored)
+                latencies.append(time.perf_counter() - start)
+            except HTTPException:
+                rejected += 1
+
+    elapsed, lags = await _with_lag(lambda: asyncio.gather(*(login() for _ in range(logins))))
+    return {
+        "mode": mode,
+        "logins_per_second": round(len(latencies) / elapsed, 1),
+        "p50_login_ms": round(_percentile(latencies, 50) * 1000, 1),
+        "p99_login_ms": round(_percentile(latencies, 99) * 1000, 1),
+        "rejected": rejected,
+        "p99_loop_lag_ms": round(_percentile(lags, 99) * 1000, 1) if lags else None,
+        "max_loop_lag_ms": round(max(lags) * 1000, 1) if lags else None,
+    }
+
+
+def run_passwords(args):
+    print(
+        f"bcrypt rounds {passwords.BCRYPT_ROUNDS}, {passwords.PASSWORD_HASH_WORKERS} workers, "
+        f"max pending {passwords.PASSWORD_HASH_MAX_PENDING}, {os.cpu_count()} CPUs",
+        file=sys.stderr,
+    )
+    rows = [asyncio.run(login_burst(mode, args.logins, args.concurrency)) for mode in ("inline", "executor")]
+    print(json.dumps(rows, indent=2))
+
+
+async def time_calls(call, calls: int) -> dict:
+    start = time.perf_counter()
+    for _ in range(calls):
+        await call()
+    elapsed = time.perf_counter() - start
+    return {"calls_per_second": round(calls / elapsed), "us_per_call": round(elapsed / calls * 1e6, 1)}
+
+
+async def unknown_kid_burst(tokens: int, fetch_ms: float) -> dict:
+    """Concurrent tokens with made-up kids against a JWKS endpoint taking ``fetch_ms``."""
+    reloads = 0
+
+    async def load():
+        nonlocal reloads
+        reloads += 1
+        await asyncio.sleep(fetch_ms / 1000)
+
+    auth.ASYMMETRIC, auth._load_public_keys = True, load
+    forged = [jwt.encode({"sub": "x"}, "x", headers={"kid": f"kid-{i}"}) for i in range(tokens)]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(auth._verification_key(t) for t in forged), return_exceptions=True)
+    burst_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    await asyncio.gather(*(auth._verification_key(t) for t in forged), return_exceptions=True)
+    return {
+        "tokens": tokens,
+        "jwks_reloads": reloads,
+        "rejected": sum(isinstance(r, JWTError) for r in results),
+        "burst_ms": round(burst_ms, 1),
+        "repeat_burst_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def run_tokens(args):
+    token = auth.create_access_token({"sub": "bench@example.com"})
+    key = auth._signing_key()
+    rows = {
+        "jwt_decode": asyncio.run(
+            time_calls(lambda: asyncio.sleep(0, jwt.decode(token, key, algorithms=[auth.ALGORITHM])), args.calls)
+        ),
+        "decode_access_token_cached": asyncio.run(time_calls(lambda: auth.decode_access_token(token), args.calls)),
+        "get_current_user_cached": asyncio.run(time_calls(lambda: auth.get_current_user(token), args.calls)),
+        "unknown_kids": asyncio.run(unknown_kid_burst(args.unknown_kids, args.fetch_ms)),
+    }
+    print(json.dumps(rows, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    burst = commands.add_parser("passwords", help="concurrent logins: inline bcrypt vs the password pool")
+    burst.add_argument("--logins", type=int, default=64)
+    burst.add_argument("--concurrency", type=int, default=32)
+    burst.set_defaults(run=run_passwords)
+    tokens = commands.add_parser("tokens", help="token verification cost and JWKS reloads for unknown kids")
+    tokens.add_argument("--calls", type=int, default=20000)
+    tokens.add_argument("--unknown-kids", type=int, default=500)
+    tokens.add_argument("--fetch-ms", type=float, default=50, help="simulated JWKS response time")
+    tokens.set_defaults(run=run_tokens)
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Flatten already-analyzed sessions into the reporting and search collections.
+
+New analyses are recorded as they complete; this fills in sessions analyzed
+before that (or before search was added). Safe to re-run, since results are
+keyed by session and overwritten with the session's stored analysis
+time, so a re-run never moves a session to another cohort. ``--after`` resumes from the last session
+id printed.
+
+    python scripts/backfill_analytics.py --batch-size 500
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId  # noqa: E402
+from app.database import close, get_database, setup_schema  # noqa: E402
+from app.repositories.analytics_repository import AnalyticsRepository  # noqa: E402
+from app.repositories.search_repository import SearchRepository  # noqa: E402
+from app.repositories.session_repository import analysis_time  # noqa: E402
+
+PROJECTION = {
+    "user_id": 1,
+    "job_description": 1,
+    "difficulty": 1,
+    "analytics": 1,
+    "analyzed_at": 1,
+    "updated_at": 1,
+}
+
+
+async def backfill(batch_size: int, after: str = None):
+    db = get_database()
+    await setup_schema(db)
+    repositories = (AnalyticsRepository(db), SearchRepository(db))
+    query = {"analytics": {"$ne": None}}
+    if after:
+        query["_id"] = {"$gt": ObjectId(after)}
+    total = 0
+    try:
+        while True:
+            batch = await db.sessions.find(query, PROJECTION).sort("_id", 1).limit(batch_size).to_list(None)
+            if not batch:
+                break
+            await asyncio.gather(
+                *(
+                    repository.record(
+                        str(session["_id"]),
+                        session["user_id"],
+                        session.get("job_description", "Unknown Role"),
+                        session.get("difficulty"),
+                        session["analytics"],
+                        analysis_time(session),
+                    )
+                    for session in batch
+                    for repository in repositories
+                )
+            )
+            total += len(batch)
+            query["_id"] = {"$gt": batch[-1]["_id"]}
+            print(f"{total} sessions recorded, last {batch[-1]['_id']}")
+    finally:
+        await close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--after", help="resume after this session id")
+    args = parser.parse_args()
+    asyncio.run(backfill(args.batch_size, args.after))
+
+
+if __name__ == "__main__":
+    main()
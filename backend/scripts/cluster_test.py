@@ -0,0 +1,205 @@
+"""Check that the API scales across worker processes and survives a rolling restart.
+
+Starts gunicorn locally, first with one worker and then with ``--workers``,
+and pushes the same number of interview sessions through each:
+register, generate questions, upload a recording, then poll the session until
+analysis is done. During the multi-worker run the master gets SIGHUP, which
+replaces every worker while sessions are in flight. Needs MongoDB and an S3
+endpoint (e.g. MinIO) configured as for the server; the model provider is
+forced to the fake one.
+
+    python scripts/cluster_test.py --workers 4 --sessions 40 --min-scaling 2
+
+Prints throughput for both runs and any session that did not finish; exits
+non-zero if a session failed or got stuck, or if throughput grew by less than
+``--min-scaling``.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+from load_test import FFMPEG, make_video
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(workers: int, port: int, args) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "WEB_CONCURRENCY": str(workers),
+        "BIND": f"127.0.0.1:{port}",
+        "MODEL_PROVIDER": "fake",
+        "FAKE_MODEL_LATENCY_MS": str(args.model_latency_ms),
+        "JOB_QUEUE_BACKEND": "mongo",
+        # Short leases so work from a killed worker is picked up within the run
+        "JOB_LEASE_SECONDS": "10",
+        "JOB_HEARTBEAT_SECONDS": "2",
+        "JOB_DRAIN_SECONDS": str(args.drain_seconds),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "app.main:app"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health/ready", timeout=2).is_success:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    server.kill()
+    raise RuntimeError(f"Server with {workers} workers did not become ready")
+
+
+def stop_server(server: subprocess.Popen):
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=120)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+async def run_session(client: httpx.AsyncClient, n: int, video: bytes, args) -> dict:
+    email = f"cluster-{uuid.uuid4().hex[:12]}@example.com"
+    password = "cluster-test-password"
+    # Requests can land on a worker that is being replaced; retry like a client would
+    for attempt in range(5):
+        try:
+            await client.post("/auth/register", json={"email": email, "password": password})
+            token = (
+                await client.post("/auth/token", data={"username": email, "password": password})
+            ).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+            session_id = (
+                await client.post(
+                    "/interview/generate-questions",
+                    json={"job_description": "Backend Engineer", "difficulty": "medium", "num_questions": 3},
+                    headers=headers,
+                )
+            ).json()["session_id"]
+            break
+        except (httpx.HTTPError, KeyError):
+            await asyncio.sleep(1 + attempt)
+    else:
+        return {"session": n, "state": "not started"}
+
+    key = uuid.uuid4().hex
+    for attempt in range(5):
+        try:
+            response = await client.post(
+                "/interview/upload-video",
+                files={"file": ("interview.mp4", video, "video/mp4")},
+                data={"session_id": session_id},
+                headers={**headers, "Idempotency-Key": key},
+            )
+            if response.status_code == 202:
+                break
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(1 + attempt)
+
+    deadline = time.monotonic() + args.session_timeout
+    state = None
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get(f"/interview/sessions/{session_id}", headers=headers)
+            state = response.json().get("state")
+            if state in ("done", "failed"):
+                break
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(1)
+    return {"session": session_id, "state": state}
+
+
+async def run_load(port: int, args, server: subprocess.Popen = None) -> dict:
+    if args.video:
+        with open(args.video, "rb") as f:
+            video = f.read()
+    else:
+        video = make_video(args.video_seconds)
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    slots = asyncio.Semaphore(args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}", timeout=60, limits=limits
+    ) as client:
+
+        async def one(n: int) -> dict:
+            async with slots:
+                return await run_session(client, n, video, args)
+
+        async def rolling_restart():
+            await asyncio.sleep(args.restart_after)
+            print(f"Sending SIGHUP to gunicorn master {server.pid}", file=sys.stderr)
+            server.send_signal(signal.SIGHUP)
+
+        start = time.perf_counter()
+        restart = asyncio.create_task(rolling_restart()) if server else None
+        results = await asyncio.gather(*(one(n) for n in range(args.sessions)))
+        elapsed = time.perf_counter() - start
+        if restart:
+            restart.cancel()
+    lost = [r for r in results if r["state"] != "done"]
+    return {
+        "sessions": len(results),
+        "seconds": round(elapsed, 1),
+        "sessions_per_second": round(len(results) / elapsed, 3),
+        "lost": lost,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20, help="sessions in flight at once")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--video", help="recording to upload (default: a clip generated with ffmpeg)")
+    parser.add_argument("--video-seconds", type=float, default=10, help="length of the clip made without --video")
+    parser.add_argument("--model-latency-ms", type=float, default=2000)
+    parser.add_argument("--drain-seconds", type=float, default=5)
+    parser.add_argument("--restart-after", type=float, default=10, help="seconds into the run")
+    parser.add_argument("--session-timeout", type=float, default=300)
+    parser.add_argument("--min-scaling", type=float, default=2.0)
+    parser.add_argument("--no-restart", action="store_true")
+    args = parser.parse_args()
+    if not args.video and not FFMPEG:
+        parser.error("--video is required when ffmpeg is not installed")
+
+    report = {}
+    for label, workers in (("single", 1), ("cluster", args.workers)):
+        server = start_server(workers, args.port, args)
+        try:
+            restart = server if label == "cluster" and not args.no_restart else None
+            report[label] = asyncio.run(run_load(args.port, args, restart))
+        finally:
+            stop_server(server)
+    report["scaling"] = round(
+        report["cluster"]["sessions_per_second"] / report["single"]["sessions_per_second"], 2
+    )
+    print(json.dumps(report, indent=2))
+
+    failures = []
+    for label in ("single", "cluster"):
+        if report[label]["lost"]:
+            failures.append(f"{len(report[label]['lost'])} sessions did not finish in the {label} run")
+    if report["scaling"] < args.min_scaling:
+        failures.append(f"throughput scaled {report['scaling']}x, expected {args.min_scaling}x")
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
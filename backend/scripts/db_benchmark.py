@@ -0,0 +1,141 @@
+"""Compare request throughput on the old synchronous Mongo access and the async data layer.
+
+Each simulated request does what login plus a dashboard load does: look up
+the user by email, then read their latest sessions. "sync" runs those
+queries with a blocking ``MongoClient`` inside ``async def`` handlers, the
+way the routes used to; "async" runs them through the repositories on one
+shared ``AsyncMongoClient``. Both serve ``--concurrency`` requests at a time
+on one event loop and report requests/sec, latency percentiles and the
+worst event-loop stall. Seeds ``--users`` users with ``--sessions`` sessions
+each into a separate database that is dropped afterwards; needs MONGODB_URI
+(a local mongod is fine).
+
+    python scripts/db_benchmark.py --requests 5000 --concurrency 100
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import AsyncMongoClient, MongoClient  # noqa: E402
+from app.repositories.session_repository import LIST_PROJECTION, SessionRepository  # noqa: E402
+from app.repositories.user_repository import UserRepository  # noqa: E402
+
+
+def seed(db, users: int, sessions: int):
+    db.users.drop()
+    db.sessions.drop()
+    db.users.create_index("email", unique=True)
+    db.sessions.create_index([("user_id", 1), ("_id", -1)])
+    db.users.insert_many([{"email": f"user-{n}@example.com", "password": "x"} for n in range(users)])
+    for n in range(users):
+        db.sessions.insert_many(
+            [
+                {
+                    "user_id": f"user-{n}@example.com",
+                    "job_description": "Backend Engineer",
+                    "difficulty": "medium",
+                    "num_questions": 5,
+                    "questions": [f"Question {q}" for q in range(5)],
+                    "state": "done",
+                }
+                for _ in range(sessions)
+            ]
+        )
+
+
+def sync_request(db):
+    async def request(email: str):
+        # What the handlers did before: blocking driver calls on the event loop
+        db.users.find_one({"email": email})
+        list(db.sessions.find({"user_id": email}, LIST_PROJECTION).sort("_id", -1).limit(20))
+
+    return request
+
+
+def async_request(db):
+    users, sessions = UserRepository(db), SessionRepository(db)
+
+    async def request(email: str):
+        await users.find_by_email(email)
+        await sessions.list_page(email, 20)
+
+    return request
+
+
+async def measure(request, args) -> dict:
+    rng = random.Random(args.seed)
+    slots = asyncio.Semaphore(args.concurrency)
+    latencies, lag = [], [0.0]
+    stop = asyncio.Event()
+
+    async def watch_loop():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag[0] = max(lag[0], time.perf_counter() - start - 0.01)
+
+    async def one():
+        async with slots:
+            start = time.perf_counter()
+            await request(f"user-{rng.randrange(args.users)}@example.com")
+            latencies.append(time.perf_counter() - start)
+
+    watcher = asyncio.create_task(watch_loop())
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await watcher
+    latencies.sort()
+    return {
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 2),
+        "max_loop_stall_ms": round(lag[0] * 1000, 1),
+    }
+
+
+async def run_async(args) -> dict:
+    client = AsyncMongoClient(os.environ["MONGODB_URI"], maxPoolSize=args.concurrency)
+    try:
+        return await measure(async_request(client[args.database]), args)
+    finally:
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--sessions", type=int, default=20, help="sessions per user")
+    parser.add_argument("--database", default="db_benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not os.getenv("MONGODB_URI"):
+        sys.exit("MONGODB_URI is required")
+
+    client = MongoClient(os.environ["MONGODB_URI"])
+    try:
+        seed(client[args.database], args.users, args.sessions)
+        report = {
+            "sync": asyncio.run(measure(sync_request(client[args.database]), args)),
+            "async": asyncio.run(run_async(args)),
+        }
+    finally:
+        client.drop_database(args.database)
+        client.close()
+    report["speedup"] = round(
+        report["async"]["requests_per_second"] / report["sync"]["requests_per_second"], 2
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Drive the main user flow against a running server and report latency per endpoint.
+
+Each virtual user registers, logs in, then repeatedly generates questions,
+uploads a recording and loads the dashboard until the run ends. Point the
+server at the fake model provider (``MODEL_PROVIDER=fake``) and a local S3
+endpoint so runs cost nothing and are repeatable:
+
+    MODEL_PROVIDER=fake S3_ENDPOINT_URL=http://localhost:9000 uvicorn app.main:app
+    python scripts/load_test.py --users 20 --duration 60 --max-p95-ms 500
+
+Prints a table (or ``--json``) of requests, errors, throughput and latency
+percentiles; with ``--max-p95-ms`` or ``--max-error-rate`` it exits non-zero
+when a budget is exceeded.
+
+``--dashboard-users`` adds users that only load the dashboard. With
+``--baseline`` they first run alone, then alongside the uploading users
+while analyses run in the background, and the two dashboard p99s are
+compared; ``--max-p99-growth`` fails the run if reads slowed down by more
+than that factor:
+
+    python scripts/load_test.py --users 20 --dashboard-users 10 --wait-analysis \
+        --baseline --max-p99-growth 1.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+
+JOB_DESCRIPTIONS = ["Backend Engineer", "Data Scientist", "Product Manager", "DevOps Engineer"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+FFMPEG = shutil.which(os.getenv("FFMPEG_BINARY", "ffmpeg"))
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float, ok: bool):
+        self.latencies[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+    @staticmethod
+    def _percentile(values: list[float], pct: float) -> float:
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def report(self, elapsed: float) -> dict:
+        report = {}
+        for endpoint, values in self.latencies.items():
+            report[endpoint] = {
+                "requests": len(values),
+                "errors": self.errors[endpoint],
+                "rps": round(len(values) / elapsed, 2),
+                **{
+                    f"p{pct}_ms": round(self._percentile(values, pct) * 1000, 1)
+                    for pct in (50, 90, 95, 99)
+                },
+                "max_ms": round(max(values) * 1000, 1),
+            }
+        return report
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, stats: Stats, index: int, video: bytes, args):
+        self.client = client
+        self.stats = stats
+        self.index = index
+        self.video = video
+        self.args = args
+        self.headers = {}
+
+    async def request(self, endpoint: str, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        try:
+            headers = {**self.headers, **kwargs.pop("headers", {})}
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+        except httpx.HTTPError:
+            self.stats.record(endpoint, time.perf_counter() - start, False)
+            raise
+        self.stats.record(endpoint, time.perf_counter() - start, response.is_success)
+        response.raise_for_status()
+        return response
+
+    async def sign_in(self):
+        email = f"loadtest-{uuid.uuid4().hex[:12]}@example.com"
+        password = "load-test-password"
+        await self.request(
+            "register", "POST", "/auth/register", json={"email": email, "password": password}
+        )
+        response = await self.request(
+            "login", "POST", "/auth/token", data={"username": email, "password": password}
+        )
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def wait_for_job(self, job_id: str):
+        start = time.perf_counter()
+        while True:
+            response = await self.client.get(f"/interview/jobs/{job_id}", headers=self.headers)
+            status = response.json().get("status") if response.is_success else "failed"
+            if status in ("completed", "failed"):
+                self.stats.record("analysis (end to end)", time.perf_counter() - start, status == "completed")
+                return
+            await asyncio.sleep(1)
+
+    async def iteration(self, n: int):
+        num_questions = 1 + n % 3
+        response = await self.request(
+            "generate-questions",
+            "POST",
+            "/interview/generate-questions",
+            json={
+                "job_description": JOB_DESCRIPTIONS[(self.index + n) % len(JOB_DESCRIPTIONS)],
+                "difficulty": DIFFICULTIES[n % len(DIFFICULTIES)],
+                "num_questions": num_questions,
+            },
+        )
+        response = await self.request(
+            "upload-video",
+            "POST",
+            "/interview/upload-video",
+            files={"file": ("interview.mp4", self.video, "video/mp4")},
+            data={"session_id": response.json()["session_id"]},
+            headers={"Idempotency-Key": uuid.uuid4().hex},
+        )
+        if self.args.wait_analysis:
+            await self.wait_for_job(response.json()["job_id"])
+        await self.request("dashboard", "GET", "/interview/dashboard")
+
+    async def run(self, deadline: float):
+        users = self.args.users + self.args.dashboard_users
+        await asyncio.sleep(self.args.ramp_up * self.index / max(1, users))
+        try:
+            await self.sign_in()
+        except httpx.HTTPError:
+            return
+        n = 0
+        while time.perf_counter() < deadline and (not self.args.iterations or n < self.args.iterations):
+            try:
+                await self.iteration(n)
+            except httpx.HTTPError:
+                pass
+            n += 1
+
+
+class DashboardReader(VirtualUser):
+    """Only loads the dashboard, to show whether background analyses slow reads down."""
+
+    async def iteration(self, n: int):
+        await self.request("dashboard (reader)", "GET", "/interview/dashboard")
+        await asyncio.sleep(self.args.read_interval)
+
+
+def make_video(seconds: float) -> bytes:
+    """A small valid MP4 (test pattern and tone) that passes the server's media probe."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "interview.mp4")
+        subprocess.run(
+            [
+                FFMPEG, "-y", "-v", "error",
+                "-f", "lavfi", "-i", f"testsrc=size=320x240:rate=10:duration={seconds}",
+                "-f", "lavfi", "-i", f"sine=frequency=440:duration={seconds}",
+                "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+                "-c:a", "aac", "-shortest", path,
+            ],
+            check=True,
+            capture_output=True,
+        )
+        with open(path, "rb") as f:
+            return f.read()
+
+
+async def run(args, uploaders: int, video: bytes) -> dict:
+    stats = Stats()
+    limits = httpx.Limits(max_connections=(uploaders + args.dashboard_users) * 2)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        start = time.perf_counter()
+        deadline = start + args.duration
+        users = [VirtualUser(client, stats, i, video, args) for i in range(uploaders)]
+        users += [
+            DashboardReader(client, stats, uploaders + i, video, args)
+            for i in range(args.dashboard_users)
+        ]
+        await asyncio.gather(*(user.run(deadline) for user in users))
+        elapsed = time.perf_counter() - start
+    return stats.report(elapsed)
+
+
+def print_table(report: dict):
+    columns = ["requests", "errors", "rps", "p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms"]
+    print(f"{'endpoint':<24}" + "".join(f"{c:>10}" for c in columns))
+    for endpoint, row in report.items():
+        print(f"{endpoint:<24}" + "".join(f"{row[c]:>10}" for c in columns))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--iterations", type=int, default=0, help="per user; 0 for no limit")
+    parser.add_argument("--ramp-up", type=float, default=5, help="seconds to start all users")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--video", help="recording to upload (default: a clip generated with ffmpeg)")
+    parser.add_argument("--video-seconds", type=float, default=10, help="length of the generated clip")
+    parser.add_argument("--wait-analysis", action="store_true", help="poll each job to completion")
+    parser.add_argument("--dashboard-users", type=int, default=0, help="users that only load the dashboard")
+    parser.add_argument("--read-interval", type=float, default=0.2, help="seconds between dashboard reads")
+    parser.add_argument("--baseline", action="store_true", help="run the dashboard users alone first")
+    parser.add_argument("--max-p99-growth", type=float, help="allowed loaded/baseline dashboard p99")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--max-p95-ms", type=float)
+    parser.add_argument("--max-error-rate", type=float)
+    args = parser.parse_args()
+
+    if args.video:
+        with open(args.video, "rb") as f:
+            video = f.read()
+    elif FFMPEG:
+        video = make_video(args.video_seconds)
+    else:
+        parser.error("--video is required when ffmpeg is not installed")
+
+    baseline = None
+    if args.baseline:
+        if not args.dashboard_users:
+            parser.error("--baseline needs --dashboard-users")
+        baseline = asyncio.run(run(args, 0, video))
+    report = asyncio.run(run(args, args.users, video))
+    if args.json:
+        print(json.dumps({"baseline": baseline, "loaded": report} if baseline else report, indent=2))
+    else:
+        if baseline:
+            print("Dashboard users alone:")
+            print_table(baseline)
+            print("\nWith uploads and analyses running:")
+        print_table(report)
+
+    failures = []
+    if baseline and "dashboard (reader)" in report:
+        growth = report["dashboard (reader)"]["p99_ms"] / max(baseline["dashboard (reader)"]["p99_ms"], 0.1)
+        print(f"\nDashboard p99 grew {growth:.2f}x under load", file=sys.stderr)
+        if args.max_p99_growth is not None and growth > args.max_p99_growth:
+            failures.append(f"dashboard p99 grew {growth:.2f}x, allowed {args.max_p99_growth}x")
+    for endpoint, row in report.items():
+        if args.max_p95_ms is not None and row["p95_ms"] > args.max_p95_ms:
+            failures.append(f"{endpoint} p95 {row['p95_ms']}ms exceeds {args.max_p95_ms}ms")
+        if args.max_error_rate is not None and row["errors"] / row["requests"] > args.max_error_rate:
+            failures.append(f"{endpoint} error rate exceeds {args.max_error_rate}")
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""Measure how long logging blocks the event loop per request.
+
+Simulates requests that each emit a few INFO and DEBUG records and reports the
+time spent in the logging calls, for the previous configuration (synchronous
+stderr and file writes, 1 MB rotation) and the current one (background
+writer, JSON lines, sampled DEBUG). Output goes to a temporary directory and
+stderr is discarded, so only the cost paid by the caller is measured.
+
+    python scripts/logging_benchmark.py --requests 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep the import-time configuration away from the real log file
+os.environ["LOG_FILE"] = os.path.join(tempfile.mkdtemp(), "app.log")
+
+from loguru import logger  # noqa: E402
+from app.utils import logger as app_logger  # noqa: E402
+
+
+def configure_previous(log_dir: str):
+    logger.remove()
+    logger.configure(patcher=None)
+    logger.add(sys.stderr, format="{time} {level} {message}", level="INFO")
+    logger.add(os.path.join(log_dir, "app.log"), rotation="1 MB", retention="10 days", level="DEBUG")
+
+
+def configure_current(log_dir: str):
+    app_logger.LOG_FILE = os.path.join(log_dir, "app.log")
+    app_logger.configure_logging()
+
+
+async def simulate(requests: int, info: int, debug: int) -> list[float]:
+    costs = []
+    for n in range(requests):
+        app_logger.request_id_var.set(uuid.uuid4().hex)
+        app_logger.user_id_var.set(f"user{n % 50}@example.com")
+        start = time.perf_counter()
+        for i in range(info):
+            logger.info(f"Handled step {i} for session {n}")
+        for i in range(debug):
+            logger.debug(f"Model call generate_questions: {n * 10 + i} prompt chars")
+        costs.append(time.perf_counter() - start)
+        await asyncio.sleep(0)
+    await logger.complete()
+    return costs
+
+
+def run(configure, args) -> dict:
+    with tempfile.TemporaryDirectory() as log_dir:
+        configure(log_dir)
+        costs = asyncio.run(simulate(args.requests, args.info, args.debug))
+        ordered = sorted(costs)
+        return {
+            "mean_us": round(statistics.mean(costs) * 1e6, 1),
+            "p99_us": round(ordered[int(len(ordered) * 0.99) - 1] * 1e6, 1),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--info", type=int, default=3, help="INFO records per request")
+    parser.add_argument("--debug", type=int, default=5, help="DEBUG records per request")
+    args = parser.parse_args()
+
+    stderr = sys.stderr
+    sys.stderr = open(os.devnull, "w")
+    try:
+        report = {
+            "previous": run(configure_previous, args),
+            "current": run(configure_current, args),
+        }
+    finally:
+        sys.stderr = stderr
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Measure what media preprocessing saves per recording.
+
+Runs the same preprocessing the upload path uses (probe, downscale and
+re-encode, audio extraction, MIME detection) over the given files and
+prints size and time per file. Without files it generates sample fixtures
+with the local ffmpeg binary (a high-bitrate 720p MP4, a WebM, a live WebM
+without duration or cues as browser MediaRecorder writes it, and a
+truncated, corrupt MP4), so it runs offline.
+
+    python scripts/media_benchmark.py
+    python scripts/media_benchmark.py recordings/*.mp4 --json
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException  # noqa: E402
+from app.services import media_service  # noqa: E402
+from app.services.segmentation_service import FFMPEG, ffmpeg_available  # noqa: E402
+
+FIXTURE_SECONDS = 20
+
+
+def make_fixtures(directory: str) -> list[str]:
+    source = [
+        "-f", "lavfi", "-i", f"testsrc2=size=1280x720:rate=30:duration={FIXTURE_SECONDS}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:duration={FIXTURE_SECONDS}",
+    ]
+    fixtures = {
+        "webcam_720p.mp4": ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "16", "-c:a", "aac"],
+        "webcam_720p.webm": ["-c:v", "libvpx", "-b:v", "4M", "-c:a", "libopus"],
+        # Written as a live stream: no Duration element and no cues, like MediaRecorder output
+        "mediarecorder.webm": ["-c:v", "libvpx", "-b:v", "2M", "-c:a", "libopus", "-f", "webm", "-live", "1"],
+    }
+    paths = []
+    for name, codec in fixtures.items():
+        path = os.path.join(directory, name)
+        result = subprocess.run(
+            [FFMPEG, "-y", "-v", "error", *source, *codec, "-shortest", path], capture_output=True
+        )
+        if result.returncode == 0:
+            paths.append(path)
+        else:
+            print(f"Skipping fixture {name}: {result.stderr.decode(errors='replace').strip()}", file=sys.stderr)
+    if paths:
+        corrupt = os.path.join(directory, "corrupt.mp4")
+        with open(paths[0], "rb") as src, open(corrupt, "wb") as dst:
+            dst.write(src.read(4096))
+        paths.append(corrupt)
+    return paths
+
+
+async def run(paths: list[str], work_dir: str) -> list[dict]:
+    rows = []
+    for path in paths:
+        # Work on a copy: preprocessing writes its outputs next to the source
+        copy = os.path.join(work_dir, os.path.basename(path))
+        shutil.copyfile(path, copy)
+        try:
+            result = await media_service.preprocess_video(copy)
+            rows.append({"file": os.path.basename(path), "status": "ok", **result["report"]})
+        except HTTPException as e:
+            rows.append({"file": os.path.basename(path), "status": "rejected", "detail": e.detail})
+    media_service.shutdown()
+    return rows
+
+
+def print_table(rows: list[dict]):
+    print(f"{'file':<24}{'status':<10}{'type':<18}{'original MB':>12}{'processed MB':>14}{'saved':>8}{'seconds':>9}")
+    for row in rows:
+        if row["status"] != "ok":
+            print(f"{row['file']:<24}{row['status']:<10}{row['detail']}")
+            continue
+        print(
+            f"{row['file']:<24}{row['status']:<10}{row['source_mime_type']:<18}"
+            f"{row['original_bytes'] / 1e6:>12.2f}{row['processed_bytes'] / 1e6:>14.2f}"
+            f"{row['size_reduction']:>8.0%}{row['preprocess_seconds']:>9.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="recordings to process (default: generated fixtures)")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args()
+    if not ffmpeg_available():
+        sys.exit("ffmpeg and ffprobe are required (set FFMPEG_BINARY / FFPROBE_BINARY)")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        paths = args.files or make_fixtures(work_dir)
+        run_dir = os.path.join(work_dir, "run")
+        os.makedirs(run_dir)
+        rows = asyncio.run(run(paths, run_dir))
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
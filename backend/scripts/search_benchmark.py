@@ -0,0 +1,175 @@
+"""Measure /interview/search query latency over a large synthetic index.
+
+Loads synthetic analyses (``--sessions`` sessions of ``--questions`` answered
+questions, spread over ``--users`` users) into a separate database through
+the same repository the app uses, then runs random one- and two-word
+searches for random users, half of them with role, difficulty, score or kind
+filters, and prints latency percentiles. Exits non-zero if p95 is above
+``--max-p95-ms``. Needs MONGODB_URI; the benchmark database is dropped at
+the end unless ``--keep`` is given, and ``--skip-load`` reuses a kept one.
+
+    python scripts/search_benchmark.py --sessions 200000 --max-p95-ms 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import AsyncMongoClient  # noqa: E402
+from app.repositories.search_repository import SearchRepository  # noqa: E402
+
+ROLES = ["Backend Engineer", "Data Scientist", "Product Manager", "Frontend Engineer", "DevOps Engineer"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+WORDS = (
+    "api cache database index query latency throughput python java kubernetes docker cluster "
+    "scaling sharding replication consistency availability partition queue stream kafka event "
+    "microservice monolith deployment pipeline testing coverage refactor design pattern interface "
+    "stakeholder roadmap metric experiment hypothesis regression model feature training dataset "
+    "bias variance accuracy precision recall customer team conflict deadline priority ownership "
+    "mentor feedback communication leadership tradeoff estimate incident outage postmortem "
+    "monitoring alert dashboard security authentication token encryption react component state "
+    "render accessibility performance memory thread async concurrency lock transaction migration"
+).split()
+FILLER = "the a and to of in that we it was i my with for on this so then because".split()
+# Zipf-like word frequencies, so some terms match many answers and others few
+WEIGHTS = [1 / rank for rank in range(1, len(WORDS) + 1)]
+
+
+def sentence(rng: random.Random, length: int) -> str:
+    return " ".join(
+        rng.choices(WORDS, WEIGHTS)[0] if rng.random() < 0.4 else rng.choice(FILLER)
+        for _ in range(length)
+    )
+
+
+def synthetic_analysis(rng: random.Random, questions: int) -> dict:
+    return {
+        "questions": [
+            {
+                "question": f"Tell me about {sentence(rng, 6)}",
+                "answer": sentence(rng, rng.randint(40, 120)),
+                "score": rng.randint(0, 100),
+                "body_language": sentence(rng, 12),
+                "communication": sentence(rng, 12),
+            }
+            for _ in range(questions)
+        ],
+        "overall_score": rng.randint(0, 100),
+        "insights": [sentence(rng, 15) for _ in range(3)],
+        "communication": {
+            "overallFeedback": sentence(rng, 40),
+            "supportingQuotes": [{"quote": sentence(rng, 12), "analysis": sentence(rng, 12)}],
+            "strengths": [sentence(rng, 3)],
+            "improvementAreas": [sentence(rng, 3)],
+        },
+    }
+
+
+async def load(repository: SearchRepository, args, rng: random.Random):
+    slots = asyncio.Semaphore(args.concurrency)
+    start = time.perf_counter()
+
+    async def one(n: int):
+        async with slots:
+            await repository.record(
+                f"session-{n}",
+                f"user-{n % args.users}@example.com",
+                ROLES[n % len(ROLES)],
+                DIFFICULTIES[n % len(DIFFICULTIES)],
+                synthetic_analysis(rng, args.questions),
+                datetime.now(timezone.utc),
+            )
+
+    for batch_start in range(0, args.sessions, 10000):
+        await asyncio.gather(*(one(n) for n in range(batch_start, min(args.sessions, batch_start + 10000))))
+        print(f"{min(args.sessions, batch_start + 10000)} sessions loaded", file=sys.stderr)
+    return time.perf_counter() - start
+
+
+def random_search(rng: random.Random, args) -> dict:
+    search = {
+        "user_id": f"user-{rng.randrange(args.users)}@example.com",
+        "query": " ".join(rng.choices(WORDS, WEIGHTS, k=rng.randint(1, 2))),
+    }
+    if rng.random() < 0.5:
+        filters = {
+            "role": ROLES[rng.randrange(len(ROLES))],
+            "difficulty": rng.choice(DIFFICULTIES),
+            "min_score": rng.randint(0, 60),
+            "kind": "answer",
+        }
+        key = rng.choice(list(filters))
+        search[key] = filters[key]
+    return search
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    client = AsyncMongoClient(os.environ["MONGODB_URI"])
+    db = client[args.database]
+    repository = SearchRepository(db)
+    report = {}
+    try:
+        if not args.skip_load:
+            await db.search_entries.drop()
+            await repository.ensure_indexes()
+            report["load_seconds"] = round(await load(repository, args, rng), 1)
+        report["entries"] = await db.search_entries.estimated_document_count()
+
+        timings, hits = [], []
+        for _ in range(args.queries):
+            search = random_search(rng, args)
+            start = time.perf_counter()
+            results = await repository.search(**search, limit=21)
+            timings.append((time.perf_counter() - start) * 1000)
+            hits.append(len(results))
+        timings.sort()
+        report.update(
+            {
+                "queries": len(timings),
+                "mean_results": round(statistics.mean(hits), 1),
+                "p50_ms": round(timings[len(timings) // 2], 2),
+                "p95_ms": round(timings[int(len(timings) * 0.95)], 2),
+                "p99_ms": round(timings[int(len(timings) * 0.99)], 2),
+                "max_ms": round(timings[-1], 2),
+            }
+        )
+    finally:
+        if not args.keep:
+            await client.drop_database(args.database)
+        await client.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200000)
+    parser.add_argument("--questions", type=int, default=5, help="answered questions per session")
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=64, help="sessions written at once while loading")
+    parser.add_argument("--database", default="search_benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark database")
+    parser.add_argument("--skip-load", action="store_true", help="reuse a kept benchmark database")
+    parser.add_argument("--max-p95-ms", type=float, default=50)
+    args = parser.parse_args()
+    if not os.getenv("MONGODB_URI"):
+        sys.exit("MONGODB_URI is required")
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if report["p95_ms"] > args.max_p95_ms:
+        print(f"p95 {report['p95_ms']}ms is above {args.max_p95_ms}ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
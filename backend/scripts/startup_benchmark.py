@@ -0,0 +1,71 @@
+"""Measure cold-start cost: import time of ``app.main`` and time to first request.
+
+Each sample runs in a fresh interpreter so module caches do not hide import
+cost. Prints a JSON summary; with ``--max-import-seconds`` or
+``--max-first-request-seconds`` it exits non-zero when the median exceeds the
+budget, so CI can track regressions.
+
+    python scripts/startup_benchmark.py --runs 5 --max-import-seconds 2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = """
+import json, time
+start = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    client.get("/health/live").raise_for_status()
+    first_request = time.perf_counter()
+print(json.dumps({"import": imported - start, "first_request": first_request - start}))
+"""
+
+
+def sample() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", SAMPLE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-seconds", type=float)
+    parser.add_argument("--max-first-request-seconds", type=float)
+    args = parser.parse_args()
+
+    samples = [sample() for _ in range(args.runs)]
+    report = {
+        metric: {
+            "median": round(statistics.median(s[metric] for s in samples), 3),
+            "max": round(max(s[metric] for s in samples), 3),
+        }
+        for metric in ("import", "first_request")
+    }
+    print(json.dumps(report, indent=2))
+
+    budgets = {"import": args.max_import_seconds, "first_request": args.max_first_request_seconds}
+    over = [
+        metric for metric, budget in budgets.items()
+        if budget is not None and report[metric]["median"] > budget
+    ]
+    for metric in over:
+        print(f"{metric} median exceeds {budgets[metric]}s budget", file=sys.stderr)
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
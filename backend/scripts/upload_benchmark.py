@@ -0,0 +1,118 @@
+"""Measure S3 upload throughput and peak memory for large recordings.
+
+Uploads a generated file of ``--size-mb`` megabytes through the two server-side
+paths: ``stream`` pushes the bytes into S3 multipart parts as they arrive
+(``POST /interview/upload-video/stream``), and ``file`` hands a file on disk
+to ``upload_fileobj`` the way a spooled form upload is sent. Each mode runs in
+its own process so peak RSS is measured separately. Point it at a local S3
+stand-in with S3_ENDPOINT_URL and S3_BUCKET_NAME (the bucket is created if
+missing):
+
+    moto_server -p 5001 &
+    S3_ENDPOINT_URL=http://localhost:5001 S3_BUCKET_NAME=bench AWS_ACCESS_KEY_ID=x \\
+        AWS_SECRET_ACCESS_KEY=x AWS_REGION=us-east-1 python scripts/upload_benchmark.py --size-mb 1024
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import s3_service  # noqa: E402
+
+CHUNK = 64 * 1024  # what Starlette hands over per request.stream() iteration
+# An MP4 ftyp box, so the streamed bytes pass the upload's container check
+MP4_HEADER = b"\x00\x00\x00\x18ftypisom\x00\x00\x02\x00isomiso2"
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def chunks(size: int, block: bytes):
+    sent = 0
+    while sent < size:
+        piece = block[: min(CHUNK, size - sent)]
+        sent += len(piece)
+        yield piece
+
+
+async def ensure_bucket():
+    client = await s3_service.s3_client()
+    try:
+        client.head_bucket(Bucket=s3_service.BUCKET_NAME)
+    except Exception:
+        client.create_bucket(Bucket=s3_service.BUCKET_NAME)
+
+
+async def run_mode(mode: str, size: int) -> dict:
+    block = MP4_HEADER + os.urandom(CHUNK - len(MP4_HEADER))
+    await ensure_bucket()
+    path = None
+    if mode == "file":
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            for _ in range(0, size, CHUNK):
+                f.write(block)
+            path = f.name
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    try:
+        if mode == "stream":
+            await s3_service.upload_video_stream(chunks(size, block), "benchmark")
+        else:
+            with open(path, "rb") as f:
+                await s3_service.upload_video(f, "benchmark")
+    finally:
+        if path:
+            os.remove(path)
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "size_mb": round(size / 1024 / 1024),
+        "seconds": round(elapsed, 2),
+        "mb_per_second": round(size / 1024 / 1024 / elapsed, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "rss_growth_mb": round(peak_rss_mb() - baseline, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=1024)
+    parser.add_argument("--mode", choices=["stream", "file"], help="run one mode in this process")
+    parser.add_argument("--max-rss-growth-mb", type=float, help="fail if streaming grows RSS more")
+    args = parser.parse_args()
+    if not os.getenv("S3_BUCKET_NAME"):
+        sys.exit("S3_BUCKET_NAME (and S3_ENDPOINT_URL for a local stand-in) is required")
+
+    if args.mode:
+        print(json.dumps(asyncio.run(run_mode(args.mode, args.size_mb * 1024 * 1024))))
+        return
+
+    rows = []
+    for mode in ("stream", "file"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--size-mb", str(args.size_mb)],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        rows.append(json.loads(output.strip().splitlines()[-1]))
+    print(f"{'mode':<8}{'size MB':>9}{'seconds':>9}{'MB/s':>8}{'peak RSS MB':>13}{'RSS growth MB':>15}")
+    for row in rows:
+        print(
+            f"{row['mode']:<8}{row['size_mb']:>9}{row['seconds']:>9}{row['mb_per_second']:>8}"
+            f"{row['peak_rss_mb']:>13}{row['rss_growth_mb']:>15}"
+        )
+    if args.max_rss_growth_mb is not None and rows[0]["rss_growth_mb"] > args.max_rss_growth_mb:
+        sys.exit(f"streaming grew RSS by {rows[0]['rss_growth_mb']}MB, allowed {args.max_rss_growth_mb}MB")
+
+
+if __name__ == "__main__":
+    main()
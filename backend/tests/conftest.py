@@ -0,0 +1,86 @@
+import os
+import sys
+import tempfile
+
+import mongomock
+import pytest
+
+# Settings are read at import time, so set them before any app module loads
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ["LOG_FILE"] = os.path.join(tempfile.mkdtemp(), "app.log")
+os.environ["MODEL_PROVIDER"] = "fake"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class AsyncCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def skip(self, count: int):
+        self._cursor = self._cursor.skip(count)
+        return self
+
+    def limit(self, count: int):
+        self._cursor = self._cursor.limit(count)
+        return self
+
+    async def to_list(self, length=None):
+        return list(self._cursor)[:length]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._cursor)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class AsyncCollection:
+    """Awaitable facade over a mongomock collection, enough for repository code."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def find(self, *args, **kwargs) -> AsyncCursor:
+        return AsyncCursor(self._collection.find(*args, **kwargs))
+
+    async def aggregate(self, pipeline, **kwargs) -> AsyncCursor:
+        return AsyncCursor(self._collection.aggregate(pipeline, **kwargs))
+
+    def __getattr__(self, name):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+
+        return call
+
+
+class AsyncDatabase:
+    def __init__(self):
+        self._db = mongomock.MongoClient().db
+
+    def __getitem__(self, name: str) -> AsyncCollection:
+        return AsyncCollection(self._db[name])
+
+    def __getattr__(self, name: str) -> AsyncCollection:
+        return self[name]
+
+
+@pytest.fixture
+def mongo_db() -> AsyncDatabase:
+    return AsyncDatabase()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    # Stop the background log writers before pytest closes the captured stderr
+    from app.utils.logger import logger
+
+    logger.remove()
@@ -0,0 +1,42 @@
+import math
+import random
+
+from app.services.analytics_service import PERCENTILES, score_distribution
+
+
+def _nearest_rank(scores: list[int], pct: float) -> int:
+    ordered = sorted(scores)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)), 1) - 1]
+
+
+def test_percentiles_match_nearest_rank_on_raw_scores():
+    rng = random.Random(7)
+    scores = [rng.randint(0, 100) for _ in range(997)]
+    buckets = [{"_id": score, "count": scores.count(score)} for score in set(scores)]
+
+    result = score_distribution(buckets)
+
+    assert result["percentiles"] == {f"p{p}": _nearest_rank(scores, p) for p in PERCENTILES}
+
+
+def test_histogram_puts_perfect_scores_in_the_last_bin():
+    result = score_distribution([{"_id": 0, "count": 2}, {"_id": 95, "count": 1}, {"_id": 100, "count": 3}])
+
+    histogram = result["histogram"]
+    assert len(histogram) == 10
+    assert histogram[0] == {"from": 0, "to": 10, "count": 2}
+    assert histogram[-1] == {"from": 90, "to": 100, "count": 4}
+    assert sum(b["count"] for b in histogram) == 6
+
+
+def test_single_score_is_every_percentile():
+    result = score_distribution([{"_id": 42.0, "count": 1}])
+
+    assert set(result["percentiles"].values()) == {42}
+
+
+def test_no_scores_gives_empty_percentiles():
+    result = score_distribution([])
+
+    assert all(value is None for value in result["percentiles"].values())
+    assert all(b["count"] == 0 for b in result["histogram"])
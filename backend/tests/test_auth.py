@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+from jose import JWTError, jwt
+
+from app.utils import auth
+
+
+def test_unknown_kids_share_one_throttled_reload(monkeypatch):
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.01)
+
+    monkeypatch.setattr(auth, "ASYMMETRIC", True)
+    monkeypatch.setattr(auth, "_load_public_keys", load)
+    monkeypatch.setattr(auth, "_key_refresh", None)
+    monkeypatch.setattr(auth, "_key_refreshed_at", float("-inf"))
+    token = jwt.encode({"sub": "a@example.com"}, "other", headers={"kid": "unknown"})
+
+    async def verify_burst():
+        return await asyncio.gather(*(auth._verification_key(token) for _ in range(10)), return_exceptions=True)
+
+    first = asyncio.run(verify_burst())
+    second = asyncio.run(verify_burst())
+
+    assert loads == 1
+    assert all(isinstance(result, JWTError) for result in first + second)
+
+
+def test_cached_token_is_rejected_after_expiry(monkeypatch):
+    token = auth.create_access_token({"sub": "a@example.com"})
+    payload = asyncio.run(auth.decode_access_token(token))
+    monkeypatch.setitem(payload, "exp", 0)
+
+    with pytest.raises(JWTError):
+        asyncio.run(auth.decode_access_token(token))
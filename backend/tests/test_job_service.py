@@ -0,0 +1,261 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from app.services import job_service
+from app.services.job_service import (
+    COMPLETED,
+    FAILED,
+    NODE_NAME,
+    QUEUED,
+    RUNNING,
+    InMemoryJobQueue,
+    JobQueue,
+    JobWorkerPool,
+    MongoJobQueue,
+    new_job,
+)
+
+
+def test_job_queue_requires_every_method():
+    class Partial(JobQueue):
+        async def enqueue(self, job):
+            return job["_id"]
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_depth_tracks_queued_jobs():
+    async def run():
+        queue = InMemoryJobQueue()
+        first = await queue.enqueue(new_job("test", "user", {}))
+        await queue.enqueue(new_job("test", "user", {}))
+        assert await queue.depth() == 2
+        claimed = await queue.claim()
+        assert claimed["_id"] == first
+        assert await queue.depth() == 1
+        await queue.retry(first, 0, "boom")
+        assert await queue.depth() == 2
+        assert (await queue.get(first))["status"] == QUEUED
+
+    asyncio.run(run())
+
+
+def test_finished_jobs_are_evicted_after_ttl():
+    async def run():
+        queue = InMemoryJobQueue(result_ttl=0.05)
+        done = await queue.enqueue(new_job("test", "user", {}))
+        failed = await queue.enqueue(new_job("test", "user", {}))
+        await queue.claim()
+        await queue.claim()
+        await queue.update(done, {"status": COMPLETED})
+        await queue.update(failed, {"status": FAILED})
+        assert (await queue.get(done))["status"] == COMPLETED
+        assert await queue.depth() == 0
+        await asyncio.sleep(0.1)
+        assert await queue.get(done) is None
+        assert await queue.get(failed) is None
+
+    asyncio.run(run())
+
+
+def _pool(queue: JobQueue, handler, max_attempts: int = 2):
+    pool = JobWorkerPool(queue, concurrency=1, max_attempts=max_attempts, backoff_seconds=0)
+    failures = []
+
+    async def on_failure(job, error):
+        failures.append(error)
+
+    pool.register("test", handler, on_failure=on_failure)
+    return pool, failures
+
+
+def test_job_reclaimed_after_every_attempt_died_is_failed_not_rerun():
+    ran = []
+
+    async def handler(job, progress):
+        ran.append(job["_id"])
+
+    async def run():
+        queue = InMemoryJobQueue()
+        pool, failures = _pool(queue, handler)
+        job = new_job("test", "user", {})
+        job["attempts"] = 2  # both attempts were lost with their workers
+        await queue.enqueue(job)
+        await pool._run(await queue.claim())
+        return await queue.get(job["_id"]), failures
+
+    job, failures = asyncio.run(run())
+
+    assert not ran
+    assert job["status"] == FAILED
+    assert failures == ["Worker lost during all 2 attempts"]
+
+
+def test_job_pinned_to_another_node_is_failed_with_its_hook():
+    async def handler(job, progress):
+        raise AssertionError("must not run away from its spooled file")
+
+    async def run():
+        queue = InMemoryJobQueue()
+        pool, failures = _pool(queue, handler)
+        job_id = await queue.enqueue(new_job("test", "user", {}, node="gone-node"))
+        await pool._run(await queue.claim())
+        return await queue.get(job_id), failures
+
+    job, failures = asyncio.run(run())
+
+    assert job["status"] == FAILED
+    assert failures == ["Node gone-node did not come back to run the job"]
+
+
+def test_stop_releases_jobs_still_running_after_the_drain():
+    async def handler(job, progress):
+        await asyncio.sleep(10)
+
+    async def run():
+        queue = InMemoryJobQueue()
+        pool, _ = _pool(queue, handler)
+        job_id = await queue.enqueue(new_job("test", "user", {}))
+        await pool.start()
+        await asyncio.sleep(0.01)
+        await pool.stop(drain_seconds=0.05)
+        return await queue.get(job_id)
+
+    job = asyncio.run(run())
+
+    assert job["status"] == QUEUED
+    assert job["attempts"] == 0  # a restart does not use up an attempt
+    assert job["error"] == "Worker stopped"
+
+
+def test_stop_lets_short_jobs_finish():
+    async def handler(job, progress):
+        await asyncio.sleep(0.02)
+        return {"done": True}
+
+    async def run():
+        queue = InMemoryJobQueue()
+        pool, _ = _pool(queue, handler)
+        job_id = await queue.enqueue(new_job("test", "user", {}))
+        await pool.start()
+        await asyncio.sleep(0.01)
+        await pool.stop(drain_seconds=1)
+        return await queue.get(job_id)
+
+    job = asyncio.run(run())
+
+    assert job["status"] == COMPLETED
+    assert job["result"] == {"done": True}
+
+
+def test_mongo_claim_takes_over_stale_and_orphaned_pinned_jobs(monkeypatch, mongo_db):
+    monkeypatch.setattr(job_service, "get_database", lambda: mongo_db)
+    queue = MongoJobQueue(poll_interval=0, lease_seconds=60, pin_timeout=3600)
+    now = job_service._now()
+
+    def job(job_id: str, node, status: str, age: float) -> dict:
+        doc = new_job("test", "user", {}, node=node)
+        stamp = now - timedelta(seconds=age)
+        doc.update(_id=job_id, status=status, heartbeat_at=stamp, updated_at=stamp, available_at=stamp)
+        return doc
+
+    async def claim_all() -> list[str]:
+        for doc in (
+            job("live-running", NODE_NAME, RUNNING, 10),
+            job("pinned-elsewhere", "other-node", QUEUED, 60),
+            job("stale-running", None, RUNNING, 120),
+            job("orphaned", "gone-node", RUNNING, 7200),
+        ):
+            await queue.enqueue(doc)
+        claimed = []
+        while claimed_job := await queue.claim():
+            claimed.append(claimed_job["_id"])
+        return claimed
+
+    assert sorted(asyncio.run(claim_all())) == ["orphaned", "stale-running"]
+
+
+def test_mongo_writes_are_fenced_to_the_current_claim(monkeypatch, mongo_db):
+    monkeypatch.setattr(job_service, "get_database", lambda: mongo_db)
+    queue = MongoJobQueue(poll_interval=0, lease_seconds=60)
+
+    async def run():
+        job_id = await queue.enqueue(new_job("test", "user", {}))
+        first = await queue.claim()
+        # The first worker stalls past its lease and another one takes the job over
+        stale = job_service._now() - timedelta(seconds=120)
+        await mongo_db.jobs.update_one({"_id": job_id}, {"$set": {"heartbeat_at": stale}})
+        second = await queue.claim()
+        assert second["_id"] == job_id and second["worker"] != first["worker"]
+
+        assert not await queue.heartbeat(job_id, first["worker"])
+        assert not await queue.update(job_id, {"status": COMPLETED}, first["worker"])
+        assert not await queue.retry(job_id, 0, "boom", first["worker"])
+        await queue.release(job_id, first["worker"])
+        assert await queue.update(job_id, {"stage": "analyzing"}, second["worker"])
+        return await queue.get(job_id)
+
+    job = asyncio.run(run())
+
+    assert job["status"] == RUNNING
+    assert job["attempts"] == 2
+    assert job["stage"] == "analyzing"
+
+
+def test_worker_that_lost_its_lease_stops_the_handler(monkeypatch, mongo_db):
+    monkeypatch.setattr(job_service, "get_database", lambda: mongo_db)
+    monkeypatch.setattr(job_service, "JOB_HEARTBEAT_SECONDS", 0.01)
+    queue = MongoJobQueue(poll_interval=0, lease_seconds=60)
+    stopped = []
+
+    async def handler(job, progress):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            stopped.append(job["_id"])
+            raise
+
+    async def run():
+        pool, failures = _pool(queue, handler)
+        job_id = await queue.enqueue(new_job("test", "user", {}))
+        job = await queue.claim()
+        running = asyncio.create_task(pool._run(job))
+        await asyncio.sleep(0.02)
+        await mongo_db.jobs.update_one({"_id": job_id}, {"$set": {"worker": "other-worker"}})
+        await asyncio.wait_for(running, 1)
+        return await queue.get(job_id), failures
+
+    job, failures = asyncio.run(run())
+
+    assert stopped == [job["_id"]]
+    assert job["status"] == RUNNING
+    assert job["worker"] == "other-worker"
+    assert not failures
+
+
+def test_progress_after_a_lost_lease_ends_the_attempt(monkeypatch, mongo_db):
+    monkeypatch.setattr(job_service, "get_database", lambda: mongo_db)
+    queue = MongoJobQueue(poll_interval=0, lease_seconds=60)
+    reached = []
+
+    async def handler(job, progress):
+        await mongo_db.jobs.update_one({"_id": job["_id"]}, {"$set": {"worker": "other-worker"}})
+        await progress("analyzing", {"segments.0": {"score": 1}})
+        reached.append(job["_id"])
+        return {"done": True}
+
+    async def run():
+        pool, failures = _pool(queue, handler)
+        job_id = await queue.enqueue(new_job("test", "user", {}))
+        await pool._run(await queue.claim())
+        return await queue.get(job_id), failures
+
+    job, failures = asyncio.run(run())
+
+    assert not reached
+    assert job["status"] == RUNNING
+    assert job["result"] == {}
+    assert not failures
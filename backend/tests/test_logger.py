@@ -0,0 +1,71 @@
+import contextvars
+import gzip
+import json
+import threading
+from types import SimpleNamespace
+
+from app.utils.logger import BackgroundSink, RotatingFile, json_line, logger, request_id_var
+
+
+def _rotating_file(tmp_path, max_bytes: int = 1024 * 1024) -> RotatingFile:
+    return RotatingFile(str(tmp_path / "app.log"), max_bytes, 3600, 1)
+
+
+def test_record_is_written_with_the_request_id(tmp_path):
+    handler = logger.add(
+        BackgroundSink(_rotating_file(tmp_path), json_line),
+        format="{message}",
+        filter=lambda record: record["extra"].get("probe"),
+    )
+
+    def handle_request():
+        request_id_var.set("req-1")
+        logger.bind(probe=True).info("answer analyzed")
+
+    contextvars.copy_context().run(handle_request)
+    logger.remove(handler)
+
+    entry = json.loads((tmp_path / "app.log").read_text())
+    assert entry["message"] == "answer analyzed"
+    assert entry["request_id"] == "req-1"
+    assert entry["level"] == "INFO"
+
+
+def test_file_rotates_at_the_size_limit(tmp_path):
+    log = _rotating_file(tmp_path, max_bytes=100)
+
+    log.write("a" * 60 + "\n")
+    log.write("b" * 30 + "\n")
+    log.write("c" * 30 + "\n")
+    log.close()
+
+    rotated = list(tmp_path.glob("app.*.log.gz"))
+    assert len(rotated) == 1
+    with gzip.open(rotated[0], "rt") as archived:
+        assert archived.read() == "a" * 60 + "\n" + "b" * 30 + "\n"
+    assert (tmp_path / "app.log").read_text() == "c" * 30 + "\n"
+
+
+def test_queued_records_are_written_on_stop():
+    class SlowStream:
+        def __init__(self):
+            self.text = ""
+            self.release = threading.Event()
+
+        def write(self, text: str):
+            # Hold the writer on its first batch so later records stay queued
+            self.release.wait(5)
+            self.text += text
+
+        def flush(self):
+            pass
+
+    stream = SlowStream()
+    sink = BackgroundSink(stream, lambda record: f"{record}\n")
+
+    for index in range(5):
+        sink.write(SimpleNamespace(record=index))
+    stream.release.set()
+    sink.stop()
+
+    assert stream.text.splitlines() == ["0", "1", "2", "3", "4"]
@@ -0,0 +1,100 @@
+import json
+import subprocess
+
+import pytest
+
+from app.services import media_worker
+from app.services.media_worker import MediaError, detect_mime, sniff_mime
+
+
+@pytest.mark.parametrize(
+    "container, mime_type",
+    [
+        ({"format_name": "mov,mp4,m4a,3gp,3g2,mj2", "tags": {"major_brand": "isom"}}, "video/mp4"),
+        ({"format_name": "mov,mp4,m4a,3gp,3g2,mj2", "tags": {"major_brand": "qt  "}}, "video/quicktime"),
+        ({"format_name": "matroska,webm"}, "video/webm"),
+        ({"format_name": "avi"}, "video/x-msvideo"),
+        ({"format_name": "mpegts"}, "video/mp2t"),
+        ({"format_name": "flv"}, "video/mp4"),
+        ({}, "video/mp4"),
+    ],
+)
+def test_detect_mime(container, mime_type):
+    assert detect_mime(container) == mime_type
+
+
+@pytest.mark.parametrize(
+    "head, mime_type",
+    [
+        (b"\x00\x00\x00\x18ftypisom\x00\x00\x02\x00", "video/mp4"),
+        (b"\x00\x00\x00\x14ftypqt  \x00\x00\x02\x00", "video/quicktime"),
+        (b"\x00\x00\x00\x08wide\x00\x00\x00\x00mdat", "video/quicktime"),
+        (b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01\x42\x82\x84webm", "video/webm"),
+        (b"\x1a\x45\xdf\xa3\xa3\x42\x86\x81\x01\x42\x82\x88matroska", "video/x-matroska"),
+        (b"RIFF\x00\x10\x00\x00AVI LIST", "video/x-msvideo"),
+        ((b"\x47" + b"\xff" * 187) * 2, "video/mp2t"),
+        (b"PK\x03\x04 not a video", None),
+        (b"", None),
+    ],
+)
+def test_sniff_mime(head, mime_type):
+    assert sniff_mime(head) == mime_type
+
+
+def _ffprobe_output(monkeypatch, info: dict, returncode: int = 0):
+    result = subprocess.CompletedProcess([], returncode, json.dumps(info), "")
+    monkeypatch.setattr(media_worker, "_run", lambda args, timeout: result)
+
+
+def test_probe_accepts_webm_without_container_duration(monkeypatch):
+    # Browser MediaRecorder output: no Duration element, ffprobe reports N/A
+    _ffprobe_output(monkeypatch, {
+        "format": {"format_name": "matroska,webm", "duration": "N/A"},
+        "streams": [{"codec_type": "video", "codec_name": "vp8", "width": 640, "height": 480}],
+    })
+
+    info = media_worker.probe("ffprobe", "recording.webm", 10)
+
+    assert info["duration"] is None
+    assert info["mime_type"] == "video/webm"
+
+
+def test_probe_falls_back_to_stream_duration(monkeypatch):
+    _ffprobe_output(monkeypatch, {
+        "format": {"format_name": "matroska,webm"},
+        "streams": [{"codec_type": "video", "duration": "12.5"}],
+    })
+
+    assert media_worker.probe("ffprobe", "recording.webm", 10)["duration"] == 12.5
+
+
+def test_probe_rejects_files_without_video(monkeypatch):
+    _ffprobe_output(monkeypatch, {"format": {"format_name": "mp3"}, "streams": [{"codec_type": "audio"}]})
+
+    with pytest.raises(MediaError):
+        media_worker.probe("ffprobe", "song.mp3", 10)
+
+
+def test_failed_transcode_uploads_original_and_removes_partial_outputs(monkeypatch, tmp_path):
+    source = tmp_path / "upload.webm"
+    source.write_bytes(b"x" * 1000)
+    monkeypatch.setattr(media_worker, "probe", lambda ffprobe, path, timeout: {
+        "mime_type": "video/webm", "duration": None, "width": 640, "height": 480,
+        "video_codec": "vp8", "has_audio": True,
+    })
+
+    def transcode(ffmpeg, path, video_path, audio_path, settings, timeout):
+        for partial in (video_path, audio_path):
+            with open(partial, "wb") as f:
+                f.write(b"partial")
+        raise MediaError("Conversion failed!")
+
+    monkeypatch.setattr(media_worker, "transcode", transcode)
+
+    result = media_worker.preprocess("ffmpeg", "ffprobe", str(source), {"timeout": 10})
+
+    assert result["video_path"] == str(source)
+    assert result["audio_path"] is None
+    assert result["mime_type"] == "video/webm"
+    assert result["report"]["transcode_error"] == "Conversion failed!"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["upload.webm"]
@@ -0,0 +1,22 @@
+import asyncio
+
+import pytest
+
+from app.services.model_provider import FakeProvider, ModelProvider
+
+
+def test_provider_must_implement_generate_and_stream():
+    class GenerateOnly(ModelProvider):
+        async def generate(self, model, prompt, schema, video=None): ...
+
+    with pytest.raises(TypeError):
+        GenerateOnly()
+
+
+def test_fake_provider_stream_ends_with_usage():
+    async def collect():
+        return [chunk async for chunk in FakeProvider(latency_ms=0).stream("m", "prompt", list[str])]
+
+    chunks = asyncio.run(collect())
+
+    assert chunks[-1].usage is not None
@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils import passwords
+
+
+def test_saturated_pool_rejects_with_503(monkeypatch):
+    monkeypatch.setattr(passwords, "PASSWORD_HASH_MAX_PENDING", 0)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(passwords.hash_password("secret"))
+
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "1"}
+
+
+def test_verify_flags_hashes_with_other_cost_for_rehash():
+    old = passwords.pwd_context.handler().using(rounds=passwords.BCRYPT_ROUNDS - 1).hash("secret")
+
+    valid, new_hash = asyncio.run(passwords.verify_password("secret", old))
+
+    assert valid
+    assert new_hash and passwords.pwd_context.verify("secret", new_hash)
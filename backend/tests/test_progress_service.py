@@ -0,0 +1,41 @@
+import asyncio
+
+from app.services import progress_service
+from app.services.progress_service import ProgressBroker, analysis_events
+
+
+class Sessions:
+    async def find_progress(self, session_id, user_id):
+        return {"analysis_progress": {"status": "running", "stage": "analyzing"}}
+
+
+def test_close_ends_open_streams(monkeypatch):
+    broker = ProgressBroker()
+    monkeypatch.setattr(progress_service, "progress_broker", broker)
+    monkeypatch.setattr(progress_service, "PROGRESS_POLL_SECONDS", 60)
+
+    async def run():
+        events = []
+
+        async def listen():
+            async for event, _ in analysis_events(Sessions(), "session", "user"):
+                events.append(event)
+
+        stream = asyncio.create_task(listen())
+        await asyncio.sleep(0.01)
+        broker.close()
+        await asyncio.wait_for(stream, 1)
+        return events
+
+    assert asyncio.run(run()) == ["status"]
+
+
+def test_streams_opened_while_closing_end_immediately(monkeypatch):
+    broker = ProgressBroker()
+    broker.close()
+    monkeypatch.setattr(progress_service, "progress_broker", broker)
+
+    async def run():
+        return [event async for event, _ in analysis_events(Sessions(), "session", "user")]
+
+    assert asyncio.run(run()) == []
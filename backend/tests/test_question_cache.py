@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+from app.services import question_cache
+from app.services.model_provider import FakeProvider
+from app.services.question_cache import QuestionCache, make_cache_key
+
+
+def _generator():
+    provider = FakeProvider(latency_ms=5, latency_sigma=0)
+    calls = []
+
+    async def generate(job_description: str, difficulty: str, num_questions: int) -> list:
+        calls.append(job_description)
+        # The call number is in the prompt, so each generation is a different set
+        response = await provider.generate("fake", f"{job_description} {difficulty} {len(calls)}", list[str])
+        return json.loads(response.text)[:num_questions]
+
+    return generate, calls
+
+
+def test_concurrent_identical_requests_make_one_model_call():
+    cache = QuestionCache(collection_name=None)
+    generate, calls = _generator()
+
+    async def run():
+        return await asyncio.gather(
+            *(cache.get_or_generate("Backend  Engineer", "EASY", 3, generate) for _ in range(5)),
+            cache.get_or_generate("backend engineer", "easy", 3, generate),
+        )
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(result == results[0] for result in results)
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["coalesced"] == 5
+
+
+def test_expired_memory_entry_is_regenerated():
+    cache = QuestionCache(collection_name=None, memory_ttl=0.05)
+    generate, calls = _generator()
+
+    async def run():
+        await cache.get_or_generate("Data Scientist", "hard", 3, generate)
+        await cache.get_or_generate("Data Scientist", "hard", 3, generate)
+        await asyncio.sleep(0.1)
+        await cache.get_or_generate("Data Scientist", "hard", 3, generate)
+
+    asyncio.run(run())
+
+    assert len(calls) == 2
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_shared_tier_serves_other_workers_until_it_expires(monkeypatch, mongo_db):
+    monkeypatch.setattr(question_cache, "get_database", lambda: mongo_db)
+    generate, calls = _generator()
+
+    async def run():
+        first = await QuestionCache().get_or_generate("DevOps Engineer", "medium", 3, generate)
+        # A fresh instance has an empty memory tier, like another worker process
+        other = QuestionCache()
+        second = await other.get_or_generate("DevOps Engineer", "medium", 3, generate)
+        return first, second, other.stats()
+
+    first, second, stats = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert second == first
+    assert stats["shared_hits"] == 1
+
+    async def expired():
+        await QuestionCache(ttl=0).get_or_generate("Product Manager", "easy", 3, generate)
+        await QuestionCache().get_or_generate("Product Manager", "easy", 3, generate)
+
+    asyncio.run(expired())
+
+    assert len(calls) == 3
+
+
+def test_variants_fill_then_rotate(monkeypatch, mongo_db):
+    monkeypatch.setattr(question_cache, "get_database", lambda: mongo_db)
+    cache = QuestionCache(variants=2)
+    generate, calls = _generator()
+
+    async def run():
+        return [await cache.get_or_generate("Backend Engineer", "easy", 3, generate) for _ in range(10)]
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 2
+    assert results[0] != results[1]
+    assert all(result in results[:2] for result in results[2:])
+    key = make_cache_key("Backend Engineer", "easy", 3)
+    stored = asyncio.run(mongo_db.question_cache.find_one({"_id": key}))
+    assert stored["variants"] == results[:2]
@@ -0,0 +1,61 @@
+import asyncio
+
+from app.services import question_pool
+from app.services.question_pool import QuestionPools, dedupe_questions
+
+
+class SlowReads:
+    """Delays reads so concurrent adds interleave between their read and write."""
+
+    def __init__(self, db):
+        self._db = db
+
+    def __getitem__(self, name):
+        collection = self._db[name]
+        find_one = collection.find_one
+
+        async def slow_find_one(*args, **kwargs):
+            doc = await find_one(*args, **kwargs)
+            await asyncio.sleep(0.01)
+            return doc
+
+        collection.find_one = slow_find_one
+        return collection
+
+
+def test_dedupe_drops_exact_and_near_duplicates():
+    existing = ["What is a Python decorator?"]
+    questions = ["what is a python decorator", "What is a Python decorator, please?", "Explain the GIL."]
+
+    assert dedupe_questions(questions, existing, similarity=0.8) == ["Explain the GIL."]
+
+
+def test_concurrent_batches_for_a_role_keep_each_others_questions(monkeypatch, mongo_db):
+    monkeypatch.setattr(question_pool, "get_database", lambda: SlowReads(mongo_db))
+    pools = QuestionPools()
+    first = ["Describe a REST API you designed.", "How do you test async code?"]
+    second = ["Explain database indexing.", "How would you shard a queue?"]
+
+    async def run():
+        await asyncio.gather(
+            pools.add("Backend Engineer", "easy", first),
+            pools.add("Backend Engineer", "easy", second),
+        )
+        return await QuestionPools().get("Backend Engineer", "easy")
+
+    assert sorted(asyncio.run(run())) == sorted(first + second)
+
+
+def test_pool_keeps_only_the_newest_questions(monkeypatch, mongo_db):
+    monkeypatch.setattr(question_pool, "get_database", lambda: mongo_db)
+    pools = QuestionPools(max_size=3)
+
+    asyncio.run(pools.add("Data Scientist", "hard", ["Explain overfitting.", "What is a p-value?"]))
+    result = asyncio.run(pools.add("Data Scientist", "hard", ["Describe gradient boosting.", "What is a p-value?"]))
+
+    assert result == {"generated": 2, "added": 1, "size": 3}
+    assert asyncio.run(QuestionPools().get("Data Scientist", "hard")) == [
+        "Explain overfitting.",
+        "What is a p-value?",
+        "Describe gradient boosting.",
+    ]
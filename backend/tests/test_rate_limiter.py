@@ -0,0 +1,43 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.rate_limiter import InMemoryQuotaStore, ModelLimiter, QuotaStore
+
+
+def test_quota_store_is_abstract():
+    with pytest.raises(TypeError):
+        QuotaStore()
+
+
+def test_in_memory_store_sums_usage_and_drops_previous_days():
+    store = InMemoryQuotaStore()
+
+    async def run():
+        await store.add("user", "2026-10-17", {"calls": 5})
+        await store.add("user", "2026-10-18", {"calls": 1, "cost": 0.5})
+        await store.add("user", "2026-10-18", {"calls": 2})
+        return await store.get("user", "2026-10-18"), await store.get("user", "2026-10-17")
+
+    today, yesterday = asyncio.run(run())
+
+    assert today == {"calls": 3, "cost": 0.5}
+    assert yesterday == {}
+
+
+def test_user_usage_excludes_other_users_and_global_usage_sums_them():
+    limiter = ModelLimiter(InMemoryQuotaStore(), user_budget=1.0, global_budget=10.0)
+    metadata = SimpleNamespace(prompt_token_count=10, candidates_token_count=5)
+
+    async def run():
+        await limiter.record("a@example.com", metadata)
+        await limiter.record("b@example.com", metadata)
+        await limiter.record(None, metadata)
+        return await limiter.usage_today("a@example.com"), await limiter.global_usage_today()
+
+    mine, total = asyncio.run(run())
+
+    assert mine["calls"] == 1 and mine["budget_usd"] == 1.0
+    assert total["calls"] == 3 and total["budget_usd"] == 10.0
+    assert total["waiting"] == 0
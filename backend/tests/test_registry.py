@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import time
+
+from app.services.registry import ServiceRegistry
+
+
+def test_concurrent_callers_share_one_build_off_the_loop():
+    registry = ServiceRegistry()
+    builds = []
+
+    def factory():
+        builds.append(threading.current_thread())
+        time.sleep(0.2)
+        return object()
+
+    registry.register("slow", factory)
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        instances = await asyncio.gather(*(registry.aget("slow") for _ in range(5)))
+        ticker.cancel()
+        return instances, ticks
+
+    instances, ticks = asyncio.run(main())
+
+    assert len(builds) == 1 and builds[0] is not threading.main_thread()
+    assert all(instance is instances[0] for instance in instances)
+    assert ticks >= 5  # the loop kept running during the build
+
+
+def test_slow_build_does_not_block_other_services():
+    registry = ServiceRegistry()
+    started = threading.Event()
+    registry.register("slow", lambda: started.set() or time.sleep(0.5) or "slow")
+    registry.register("fast", lambda: "fast")
+
+    thread = threading.Thread(target=registry.get, args=("slow",))
+    thread.start()
+    started.wait()
+    start = time.perf_counter()
+
+    assert registry.get("fast") == "fast"
+    assert time.perf_counter() - start < 0.2
+    thread.join()
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import time
+from typing import List
+
+import pytest
+
+from app.services.response_parser import (
+    JsonArrayStream,
+    ResponseParseError,
+    extract_json,
+    parse_with_reask,
+    repair_json,
+)
+
+
+def test_repair_drops_trailing_commas_outside_strings():
+    text = '{"a": [1, 2, ], "b": "x, ]", "c": {"d": 1 ,\n}, }'
+
+    assert json.loads(repair_json(text)) == {"a": [1, 2], "b": "x, ]", "c": {"d": 1}}
+
+
+def test_repair_is_linear_in_comma_count():
+    text = "[" + ", ".join(["1"] * 200_000) + ",]"
+
+    start = time.perf_counter()
+    repaired = repair_json(text)
+
+    assert time.perf_counter() - start < 2
+    assert len(json.loads(repaired)) == 200_000
+
+
+def test_extract_json_ignores_fences_and_prose():
+    text = 'Here you go:\n```json\n["What is a closure?", "Tell me about a conflict.",]\n```'
+
+    assert extract_json(text) == ["What is a closure?", "Tell me about a conflict."]
+
+
+def test_extract_json_reports_truncation():
+    with pytest.raises(ResponseParseError, match="truncated"):
+        extract_json('["one", "tw')
+
+
+def test_reask_receives_the_broken_response():
+    prompts = []
+
+    async def reask(prompt):
+        prompts.append(prompt)
+        return '["fixed"]'
+
+    result = asyncio.run(parse_with_reask('["broken', List[str], reask, attempts=1))
+
+    assert result == ["fixed"]
+    assert '["broken' in prompts[0]
+
+
+def test_array_stream_emits_items_across_chunk_boundaries():
+    parser = JsonArrayStream()
+
+    first = parser.feed('```json\n["a, [b]", {"q": "c')
+    second = parser.feed('"}, "d",]')
+
+    assert first == ["a, [b]"]
+    assert second == [{"q": "c"}, "d"]
+    assert parser.complete and parser.errors == 0
@@ -0,0 +1,147 @@
+import asyncio
+import io
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import s3_service
+
+
+class FailingClient:
+    def __init__(self):
+        self.aborted = False
+
+    def create_multipart_upload(self, **kwargs):
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, **kwargs):
+        raise ConnectionError("part upload failed")
+
+    def abort_multipart_upload(self, **kwargs):
+        self.aborted = True
+        raise ConnectionError("abort failed")
+
+
+MP4_HEAD = b"\x00\x00\x00\x18ftypisom\x00\x00\x02\x00isomiso2"
+WEBM_HEAD = b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01\x42\x82\x84webm"
+
+
+async def _chunks(head: bytes = MP4_HEAD):
+    yield head
+    yield b"x" * 1024
+
+
+def test_stream_upload_keeps_original_error_when_abort_fails(monkeypatch):
+    client = FailingClient()
+
+    async def s3_client():
+        return client
+
+    monkeypatch.setattr(s3_service, "s3_client", s3_client)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(s3_service.upload_video_stream(_chunks(), "user"))
+
+    assert error.value.status_code == 500
+    assert client.aborted
+    assert str(error.value.__cause__) == "part upload failed"
+
+
+class RecordingClient:
+    """Stands in for boto3, keeping uploaded objects in memory."""
+
+    def __init__(self, objects=None, parts=None):
+        self.objects = dict(objects or {})
+        self.parts = parts or []
+        self.calls = []
+
+    def __getattr__(self, name):
+        def call(**kwargs):
+            self.calls.append((name, kwargs))
+            return {}
+
+        return call
+
+    def create_multipart_upload(self, **kwargs):
+        self.calls.append(("create_multipart_upload", kwargs))
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, **kwargs):
+        return {"ETag": f"etag-{kwargs['PartNumber']}"}
+
+    def get_paginator(self, name):
+        client = self
+
+        class Paginator:
+            def paginate(self, **kwargs):
+                return [{"Parts": client.parts}]
+
+        return Paginator()
+
+    def head_object(self, Bucket, Key):
+        return {"ContentLength": len(self.objects[Key]), "ETag": '"abc"'}
+
+    def get_object(self, Bucket, Key, Range):
+        end = int(Range.split("-")[1])
+        return {"Body": io.BytesIO(self.objects[Key][: end + 1])}
+
+
+def _use(monkeypatch, client):
+    async def s3_client():
+        return client
+
+    monkeypatch.setattr(s3_service, "s3_client", s3_client)
+
+
+def test_stream_upload_stores_the_sniffed_type(monkeypatch):
+    client = RecordingClient()
+    _use(monkeypatch, client)
+
+    uploaded = asyncio.run(s3_service.upload_video_stream(_chunks(WEBM_HEAD), "user"))
+
+    created = dict(client.calls)["create_multipart_upload"]
+    assert uploaded["mime_type"] == created["ContentType"] == "video/webm"
+    assert created["Key"].endswith(".webm")
+    assert uploaded["video_url"].endswith(created["Key"])
+
+
+def test_stream_upload_rejects_data_that_is_not_video(monkeypatch):
+    client = RecordingClient()
+    _use(monkeypatch, client)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(s3_service.upload_video_stream(_chunks(b"not a video" * 100), "user"))
+
+    assert error.value.status_code == 400
+    assert not client.calls
+
+
+def test_direct_upload_is_checked_before_it_is_accepted(monkeypatch):
+    body = MP4_HEAD + b"x" * 100
+    client = RecordingClient(objects={"k": body})
+    _use(monkeypatch, client)
+
+    assert asyncio.run(s3_service.complete_direct_upload("k", len(body), etag="abc"))["mime_type"] == "video/mp4"
+    assert "put_object_acl" in dict(client.calls)
+
+    for size, etag in ((len(body) + 1, None), (len(body), "other")):
+        client.calls.clear()
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(s3_service.complete_direct_upload("k", size, etag=etag))
+        assert error.value.status_code == 400
+        assert [name for name, _ in client.calls] == ["delete_object"]
+
+
+def test_direct_multipart_upload_with_unknown_parts_is_aborted(monkeypatch):
+    client = RecordingClient(parts=[{"PartNumber": 1, "ETag": '"a"', "Size": 10}])
+    _use(monkeypatch, client)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(
+            s3_service.complete_direct_upload(
+                "k", 10, "upload-1", [{"part_number": 1, "etag": "forged"}]
+            )
+        )
+
+    assert error.value.status_code == 400
+    assert [name for name, _ in client.calls] == ["abort_multipart_upload"]
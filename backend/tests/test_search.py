@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime, timezone
+
+from app.repositories.search_repository import SearchRepository
+from app.routes.interview import _snippet
+
+TEXT = "I started with " + "background " * 20 + "then scaled the Kafka consumers " + "and more " * 20
+
+
+def test_short_text_is_returned_whole():
+    assert _snippet("Scaled the Kafka consumers", "kafka", width=100) == "Scaled the Kafka consumers"
+
+
+def test_window_centres_on_first_matching_term():
+    snippet = _snippet(TEXT, "kafka", width=60)
+
+    assert snippet.startswith("...") and snippet.endswith("...")
+    assert "Kafka" in snippet
+    assert len(snippet) <= 60 + 6
+
+
+def test_excluded_and_missing_terms_do_not_move_the_window():
+    assert _snippet(TEXT, "-started kafka", width=60) == _snippet(TEXT, "kafka", width=60)
+    assert _snippet(TEXT, "redis kafka", width=60) == _snippet(TEXT, "kafka", width=60)
+
+
+def test_phrase_quotes_are_ignored():
+    assert _snippet(TEXT, '"kafka consumers"', width=60) == _snippet(TEXT, "kafka", width=60)
+
+
+def test_no_match_starts_at_the_beginning():
+    snippet = _snippet(TEXT, "redis", width=60)
+
+    assert snippet.startswith("I started with")
+    assert snippet.endswith("...")
+
+
+def test_match_near_the_end_has_no_trailing_ellipsis():
+    text = "filler " * 30 + "final words on Kafka"
+
+    snippet = _snippet(text, "kafka", width=40)
+
+    assert snippet.startswith("...")
+    assert snippet.endswith("Kafka")
+
+
+def _analytics(*answers: str) -> dict:
+    return {
+        "questions": [{"question": f"q{i}", "answer": answer} for i, answer in enumerate(answers)],
+        "overall_score": 70,
+    }
+
+
+def test_rerecording_a_session_drops_answers_it_no_longer_has(mongo_db):
+    repository = SearchRepository(mongo_db)
+
+    def record(session_id: str, analytics: dict):
+        asyncio.run(
+            repository.record(
+                session_id, "a@example.com", "Engineer", "easy", analytics, datetime.now(timezone.utc)
+            )
+        )
+
+    record("s1", _analytics("kafka", "redis", "postgres"))
+    record("s2", _analytics("kafka"))
+    record("s1", _analytics("kafka", ""))
+
+    ids = [entry["_id"] for entry in asyncio.run(mongo_db.search_entries.find({}).to_list(None))]
+    assert sorted(ids) == ["s1:0", "s1:feedback", "s2:0", "s2:feedback"]
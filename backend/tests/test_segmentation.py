@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import vertex_service
+from app.services.segmentation_service import segments_from_timestamps
+
+
+def test_timestamps_are_clamped_to_the_recording():
+    assert segments_from_timestamps([-1.5, 10, 99], 3, 60.0) == [(0.0, 10), (10, 60.0), (60.0, 60.0)]
+
+
+def test_timestamps_collapsing_after_clamping_are_ignored():
+    assert segments_from_timestamps([0, 70, 80], 3, 60.0) is None
+
+
+def test_failed_segment_cancels_the_others(monkeypatch):
+    cancelled = []
+
+    async def analyze_segment(video_url, job_description, question, index, segment, mime_type):
+        if index == 0:
+            raise RuntimeError("model down")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+
+    monkeypatch.setattr(vertex_service, "analyze_segment", analyze_segment)
+    monkeypatch.setattr(vertex_service, "SEGMENT_MAX_ATTEMPTS", 1)
+
+    async def analyze():
+        with pytest.raises(HTTPException):
+            await vertex_service.analyze_video_segments(
+                "https://example.com/v.mp4", "Engineer", ["q1", "q2", "q3"],
+                segments=[[0, 5], [5, 10], [10, None]],
+            )
+        await asyncio.sleep(0)
+
+    asyncio.run(analyze())
+
+    assert sorted(cancelled) == [1, 2]
@@ -0,0 +1,121 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.interview import InterviewSession
+from app.repositories import session_repository
+from app.repositories.session_repository import (
+    ANALYZING,
+    DONE,
+    FAILED,
+    IN_FLIGHT_STATES,
+    UPLOADED,
+    UPLOADING,
+    SessionRepository,
+)
+from app.routes import interview
+
+
+def _new_session(repository: SessionRepository) -> str:
+    session = InterviewSession(
+        user_id="a@example.com",
+        job_description="Engineer",
+        difficulty="easy",
+        num_questions=1,
+        questions=["q1"],
+    )
+    return asyncio.run(repository.create(session))
+
+
+def _state(repository: SessionRepository, session_id: str) -> str:
+    return asyncio.run(repository.find_for_user(session_id, "a@example.com"))["state"]
+
+
+def test_only_one_request_claims_an_upload(mongo_db):
+    repository = SessionRepository(mongo_db)
+    session_id = _new_session(repository)
+
+    first = asyncio.run(repository.claim_upload(session_id, "a@example.com", "key-1"))
+    second = asyncio.run(repository.claim_upload(session_id, "a@example.com", "key-2"))
+
+    assert first["state"] == "created"
+    assert second is None
+    assert _state(repository, session_id) == UPLOADING
+
+
+def test_stale_in_flight_session_can_be_reclaimed(monkeypatch, mongo_db):
+    repository = SessionRepository(mongo_db)
+    session_id = _new_session(repository)
+    asyncio.run(repository.claim_upload(session_id, "a@example.com", None))
+    asyncio.run(repository.set_state(session_id, ANALYZING))
+
+    monkeypatch.setattr(
+        session_repository,
+        "_now",
+        lambda: datetime.now(timezone.utc) + timedelta(seconds=session_repository.SESSION_STALE_SECONDS + 1),
+    )
+
+    assert asyncio.run(repository.claim_upload(session_id, "a@example.com", None))["state"] == ANALYZING
+
+
+def test_late_transitions_do_not_reopen_a_done_session(mongo_db):
+    repository = SessionRepository(mongo_db)
+    session_id = _new_session(repository)
+    asyncio.run(repository.claim_upload(session_id, "a@example.com", None))
+    analytics = {"questions": [], "overall_score": 7.0}
+    asyncio.run(repository.set_analysis(session_id, "https://example.com/v.mp4", analytics))
+
+    for state in (UPLOADED, ANALYZING, FAILED):
+        assert not asyncio.run(repository.set_state(session_id, state, expected=IN_FLIGHT_STATES))
+
+    assert _state(repository, session_id) == DONE
+
+
+def test_list_page_follows_the_before_cursor(mongo_db):
+    repository = SessionRepository(mongo_db)
+    created = [_new_session(repository) for _ in range(5)]
+
+    first = asyncio.run(repository.list_page("a@example.com", 2))
+    second = asyncio.run(repository.list_page("a@example.com", 2, before=str(first[-1]["_id"])))
+    last = asyncio.run(repository.list_page("a@example.com", 2, before=str(second[-1]["_id"])))
+
+    pages = [[str(s["_id"]) for s in page] for page in (first, second, last)]
+    assert pages == [created[4:2:-1], created[2:0:-1], created[:1]]
+    assert "questions" not in first[0]
+    assert asyncio.run(repository.list_page("b@example.com", 2)) == []
+
+
+def test_upload_that_lost_its_claim_does_not_overwrite_the_new_one(monkeypatch, mongo_db):
+    repository = SessionRepository(mongo_db)
+    session_id = _new_session(repository)
+    submitted = []
+
+    async def submit(*args, **kwargs):
+        submitted.append(args)
+
+    async def slow_upload():
+        # The upload outlives SESSION_STALE_SECONDS and a retry takes the session over
+        with monkeypatch.context() as stale:
+            stale.setattr(
+                session_repository,
+                "_now",
+                lambda: datetime.now(timezone.utc) + timedelta(seconds=session_repository.SESSION_STALE_SECONDS + 1),
+            )
+            assert await repository.claim_upload(session_id, "a@example.com", "retry")
+        return {"video_url": "https://example.com/first.mp4", "mime_type": "video/mp4"}
+
+    monkeypatch.setattr(interview, "_submit_analysis", submit)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(
+            interview._start_upload(repository, "a@example.com", session_id, "first", None, slow_upload)
+        )
+
+    session = asyncio.run(repository.find_for_user(session_id, "a@example.com"))
+    assert error.value.status_code == 409
+    assert not submitted
+    assert session["state"] == UPLOADING
+    assert session["idempotency_key"] == "retry"
+    assert session["video_url"] is None
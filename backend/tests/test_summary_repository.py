@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime, timezone
+
+from app.models.interview import InterviewSession
+from app.repositories import summary_repository
+from app.repositories import session_repository
+from app.repositories.session_repository import SessionRepository
+from app.repositories.summary_repository import SummaryRepository
+from app.routes import interview
+
+USER = "a@example.com"
+NOW = datetime.now(timezone.utc)
+
+
+def _analytics(score: float) -> dict:
+    return {"questions": [], "overall_score": score, "communication": {"score": score / 10}}
+
+
+def _analyzed_session(sessions: SessionRepository, score=None) -> str:
+    session = InterviewSession(
+        user_id=USER, job_description="Engineer", difficulty="easy", num_questions=1, questions=["q1"]
+    )
+    session_id = asyncio.run(sessions.create(session))
+    if score is not None:
+        asyncio.run(sessions.set_analysis(session_id, "https://example.com/v.mp4", _analytics(score)))
+    return session_id
+
+
+def test_an_analysis_is_counted_once(mongo_db):
+    summaries = SummaryRepository(mongo_db)
+
+    assert asyncio.run(summaries.record_analysis(USER, "s1", _analytics(80), NOW))
+    assert not asyncio.run(summaries.record_analysis(USER, "s1", _analytics(80), NOW))
+    assert asyncio.run(summaries.record_analysis(USER, "s2", _analytics(60), NOW))
+
+    summary = asyncio.run(summaries.get(USER))
+    assert summary["analyzed_count"] == 2
+    assert summary["average_overall_score"] == 70
+    assert [r["session_id"] for r in summary["communication_trend"]] == ["s1", "s2"]
+
+
+def test_recent_sessions_keep_only_the_newest(monkeypatch, mongo_db):
+    monkeypatch.setattr(summary_repository, "RECENT_SESSIONS", 3)
+    summaries = SummaryRepository(mongo_db)
+
+    for index in range(5):
+        asyncio.run(summaries.record_session(USER))
+        asyncio.run(summaries.record_analysis(USER, f"s{index}", _analytics(10 * index), NOW))
+
+    summary = asyncio.run(summaries.get(USER))
+    assert summary["session_count"] == 5
+    assert summary["average_overall_score"] == 20
+    assert summary["rolling_average_overall_score"] == 30
+    assert [r["session_id"] for r in summary["communication_trend"]] == ["s2", "s3", "s4"]
+
+
+def test_rebuild_counts_existing_sessions(monkeypatch, mongo_db):
+    monkeypatch.setattr(summary_repository, "RECENT_SESSIONS", 2)
+    sessions = SessionRepository(mongo_db)
+    summaries = SummaryRepository(mongo_db)
+    analyzed = [_analyzed_session(sessions, score) for score in (50, 70, 90)]
+    _analyzed_session(sessions)
+
+    asyncio.run(summaries.rebuild(mongo_db.sessions))
+    # Sessions the rebuild counted are not counted again when their job replays
+    assert not asyncio.run(summaries.record_analysis(USER, analyzed[0], _analytics(50), NOW))
+
+    summary = asyncio.run(summaries.get(USER))
+    assert summary["session_count"] == 4
+    assert summary["analyzed_count"] == 3
+    assert summary["average_overall_score"] == 70
+    assert [r["session_id"] for r in summary["communication_trend"]] == analyzed[1:]
+
+
+def test_retried_job_records_a_stored_analysis_without_reanalyzing(monkeypatch, mongo_db):
+    async def analyze(**kwargs):
+        raise AssertionError("the stored analysis must be reused")
+
+    monkeypatch.setattr(interview, "get_database", lambda: mongo_db)
+    monkeypatch.setattr(interview, "analyze_video_segments", analyze)
+    session_id = _analyzed_session(SessionRepository(mongo_db), 80)
+    job = {
+        "user_id": USER,
+        "payload": {"session_id": session_id, "job_description": "Engineer", "questions": ["q1"]},
+    }
+
+    async def progress(stage, result=None):
+        pass
+
+    result = asyncio.run(interview.process_video_job(job, progress))
+
+    assert result["analytics"]["overall_score"] == 80
+    assert asyncio.run(SummaryRepository(mongo_db).get(USER))["analyzed_count"] == 1
+    assert asyncio.run(mongo_db.session_results.find_one({"_id": session_id}))["overall_score"] == 80
+
+
+def test_replayed_recording_keeps_the_original_analysis_time(monkeypatch, mongo_db):
+    analyzed_at = datetime(2025, 6, 30, 23, 0, tzinfo=timezone.utc)
+    monkeypatch.setattr(interview, "get_database", lambda: mongo_db)
+    with monkeypatch.context() as then:
+        then.setattr(session_repository, "_now", lambda: analyzed_at)
+        session_id = _analyzed_session(SessionRepository(mongo_db), 80)
+    job = {
+        "user_id": USER,
+        "payload": {"session_id": session_id, "job_description": "Engineer", "questions": ["q1"]},
+    }
+
+    async def progress(stage, result=None):
+        pass
+
+    # A retry or backfill long after the analysis must not move the session to a new cohort
+    asyncio.run(interview.process_video_job(job, progress))
+    asyncio.run(interview.process_video_job(job, progress))
+
+    result = asyncio.run(mongo_db.session_results.find_one({"_id": session_id}))
+    summary = asyncio.run(SummaryRepository(mongo_db).get(USER))
+    assert result["cohort"] == "2025-06"
+    assert result["analyzed_at"].replace(tzinfo=timezone.utc) == analyzed_at
+    assert summary["communication_trend"][0]["analyzed_at"].startswith("2025-06-30T23:00")
@@ -0,0 +1,51 @@
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.main import app
+from app.utils import telemetry
+
+client = TestClient(app)
+
+
+def _root_latency(monkeypatch) -> dict:
+    """Count, sum and +Inf bucket of the latency histogram for GET / as served at /metrics."""
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    labels = {"method": "GET", "route": "/", "status": "200"}
+    return {
+        sample.name.removeprefix("http_request_duration_seconds_"): sample.value
+        for family in text_string_to_metric_families(response.text)
+        if family.name == "http_request_duration_seconds"
+        for sample in family.samples
+        if labels.items() <= sample.labels.items() and sample.labels.get("le") in (None, "+Inf")
+    }
+
+
+def test_request_is_counted_and_timed_at_metrics(monkeypatch):
+    before = _root_latency(monkeypatch)
+
+    assert client.get("/").status_code == 200
+
+    after = _root_latency(monkeypatch)
+    assert after["count"] == before.get("count", 0) + 1
+    assert after["bucket"] == before.get("bucket", 0) + 1
+    assert after["sum"] > before.get("sum", 0)
+
+
+def test_profiling_is_off_unless_enabled(monkeypatch):
+    monkeypatch.setattr(telemetry, "PROFILING_ENABLED", False)
+    response = client.get("/", params={"profile": "1"})
+
+    assert response.json() == {"message": "AI Mock Interview Platform"}
+
+
+def test_enabled_profiling_only_profiles_requests_that_ask(monkeypatch):
+    monkeypatch.setattr(telemetry, "PROFILING_ENABLED", True)
+
+    plain = client.get("/")
+    profiled = client.get("/", params={"profile": "1"})
+
+    assert plain.json() == {"message": "AI Mock Interview Platform"}
+    assert profiled.headers["content-type"].startswith("text/html")
+    assert "pyinstrument" in profiled.text.lower()
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useContext } from "react";
+import React, { useState, useEffect, useContext, useCallback } from "react";
 import {
   Card,
   Typography,
@@ -46,13 +46,15 @@ const { Sider, Content } = Layout;
 const Dashboard = ({ setAuth }) => {
   const [sessions, setSessions] = useState([]);
   const [selectedSessionId, setSelectedSessionId] = useState(null);
+  const [sessionDetails, setSessionDetails] = useState({});
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(false);
   const [drawerVisible, setDrawerVisible] = useState(false);
   const navigate = useNavigate();
   const { isDarkMode } = useContext(ThemeContext);
 
-  useEffect(() => {
-    const fetchSessions = async () => {
+  const fetchSessions = useCallback(
+    async (cursor = null) => {
       setLoading(true);
       try {
         const token = localStorage.getItem("token");
@@ -66,14 +68,14 @@ const Dashboard = ({ setAuth }) => {
           `${process.env.REACT_APP_API_URL}/interview/dashboard`,
           {
             headers: { Authorization: `Bearer ${token}` },
+            params: cursor ? { cursor } : {},
           }
         );
-        const sortedSessions = (response.data.sessions || []).sort(
-          (a, b) => new Date(b.created_at) - new Date(a.created_at)
-        );
-        setSessions(sortedSessions);
-        if (sortedSessions.length > 0) {
-          setSelectedSessionId(sortedSessions[0].session_id);
+        const page = response.data.sessions || [];
+        setSessions((prev) => (cursor ? [...prev, ...page] : page));
+        setNextCursor(response.data.next_cursor || null);
+        if (!cursor && page.length > 0) {
+          setSelectedSessionId(page[0].session_id);
         }
       } catch (error) {
         console.error("Dashboard fetch error:", error);
@@ -90,13 +92,54 @@ const Dashboard = ({ setAuth }) => {
       } finally {
         setLoading(false);
       }
-    };
+    },
+    [navigate, setAuth]
+  );
+
+  useEffect(() => {
     fetchSessions();
-  }, [navigate, setAuth]);
+  }, [fetchSessions]);
 
-  const selectedSession = sessions.find(
-    (s) => s.session_id === selectedSessionId
-  );
+  useEffect(() => {
+    if (!selectedSessionId || sessionDetails[selectedSessionId]) {
+      return;
+    }
+    const fetchSessionDetail = async () => {
+      try {
+        const token = localStorage.getItem("token");
+        const response = await axios.get(
+          `${process.env.REACT_APP_API_URL}/interview/sessions/${selectedSessionId}`,
+          { headers: { Authorization: `Bearer ${token}` } }
+        );
+        setSessionDetails((prev) => ({
+          ...prev,
+          [selectedSessionId]: response.data,
+        }));
+      } catch (error) {
+        console.error("Session detail fetch error:", error);
+        message.error(
+          error.response?.data?.detail || "Failed to load session details"
+        );
+      }
+    };
+    fetchSessionDetail();
+  }, [selectedSessionId, sessionDetails]);
+
+  const selectedSession =
+    sessionDetails[selectedSessionId] ||
+    sessions.find((s) => s.session_id === selectedSessionId);
+
+  const renderLoadMore = () =>
+    nextCursor && (
+      <Button
+        block
+        type="link"
+        loading={loading}
+        onClick={() => fetchSessions(nextCursor)}
+      >
+        Load more
+      </Button>
+    );
 
   const renderScoreChart = (analytics) => {
     if (!analytics?.questions?.length) {
@@ -508,6 +551,7 @@ const Dashboard = ({ setAuth }) => {
               </Menu.Item>
             ))}
           </Menu>
+          {renderLoadMore()}
         </div>
       </Sider>
       <Drawer
@@ -546,6 +590,7 @@ const Dashboard = ({ setAuth }) => {
             </Menu.Item>
           ))}
         </Menu>
+        {renderLoadMore()}
       </Drawer>
       <Content style={{ padding: "16px", background: "transparent" }}>
         <div className="container">
@@ -584,7 +629,7 @@ const Dashboard = ({ setAuth }) => {
               </Button>
             </div>
           </div>
-          {loading ? (
+          {loading && sessions.length === 0 ? (
             <Spin style={{ display: "block", margin: "40px auto" }} />
           ) : sessions.length === 0 ? (
             <Card
@@ -28,6 +28,8 @@ const Interview = () => {
   const canvasRef = useRef(null);
   const mediaRecorderRef = useRef(null);
   const recordedChunks = useRef([]);
+  const recordingStartedAt = useRef(null);
+  const questionTimestamps = useRef([]);
   const { isDarkMode } = useContext(ThemeContext);
 
   useEffect(() => {
@@ -161,6 +163,8 @@ const Interview = () => {
           }
         };
         mediaRecorderRef.current.start();
+        recordingStartedAt.current = Date.now();
+        questionTimestamps.current = [0];
         setRecording(true);
         console.log("Recording started, recording state:", true);
       } else {
@@ -175,6 +179,31 @@ const Interview = () => {
     }
   };
 
+  // Streams per-question results; EventSource reconnects on its own and the
+  // server replays stored progress, so a dropped connection loses nothing
+  const waitForAnalysis = (sessionId, token) =>
+    new Promise((resolve, reject) => {
+      const source = new EventSource(
+        `${process.env.REACT_APP_API_URL}/interview/sessions/${sessionId}/events?token=${encodeURIComponent(token)}`
+      );
+      source.addEventListener("status", (event) => {
+        const data = JSON.parse(event.data);
+        console.log("Analysis status:", data.status, data.stage);
+      });
+      source.addEventListener("question", (event) => {
+        const { index } = JSON.parse(event.data);
+        message.info(`Question ${index + 1} analyzed`);
+      });
+      source.addEventListener("complete", (event) => {
+        source.close();
+        resolve(JSON.parse(event.data));
+      });
+      source.addEventListener("failed", (event) => {
+        source.close();
+        reject(new Error(JSON.parse(event.data).detail));
+      });
+    });
+
   const stopRecording = async () => {
     if (mediaRecorderRef.current && stream) {
       console.log("Stopping recording...");
@@ -189,6 +218,10 @@ const Interview = () => {
           const formData = new FormData();
           formData.append("file", blob, "interview.webm");
           formData.append("session_id", sessionId);
+          formData.append(
+            "question_timestamps",
+            questionTimestamps.current.map((t) => t.toFixed(2)).join(",")
+          );
 
           try {
             const token = localStorage.getItem("token");
@@ -199,16 +232,24 @@ const Interview = () => {
                 headers: {
                   Authorization: `Bearer ${token}`,
                   "Content-Type": "multipart/form-data",
+                  "Idempotency-Key": `${sessionId}-upload`,
                 },
               }
             );
-            message.success("Video uploaded and analyzed successfully");
             console.log("Upload response:", response.data);
-            resolve(response.data);
+            message.info("Video uploaded. Analysis in progress...");
+            const result = await waitForAnalysis(
+              response.data.session_id,
+              token
+            );
+            message.success("Video uploaded and analyzed successfully");
+            resolve(result);
           } catch (error) {
             console.error("Upload error:", error);
             message.error(
-              error.response?.data?.detail || "Failed to upload video"
+              error.response?.data?.detail ||
+                error.message ||
+                "Failed to upload video"
             );
             reject(error);
           }
@@ -247,6 +288,9 @@ const Interview = () => {
   const handleNextQuestion = async () => {
     console.log("Next question, current index:", currentQuestionIndex);
     if (currentQuestionIndex < questions.length - 1) {
+      questionTimestamps.current.push(
+        (Date.now() - recordingStartedAt.current) / 1000
+      );
       setCurrentQuestionIndex(currentQuestionIndex + 1);
     } else {
       setLoading(true);